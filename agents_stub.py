@@ -8,17 +8,21 @@ This updated stub supports:
 - Typed output extraction (output_type, final_output_as)
 - Pydantic model validation
 - Enhanced prompt parsing for customer details
+- Run lifecycle hooks (RunHooks) mirroring the SDK callback surface
+- Streaming runs (Runner.run_streamed) with incremental progress events
 """
 
 from __future__ import annotations
 
 import asyncio
 import json
-import re
+import os
 from dataclasses import dataclass, field
-from datetime import date, datetime
+from datetime import date
 from typing import Any, Callable, Dict, Iterable, Optional, Type, TypeVar
 
+from booking_extractor import BookingExtraction, extract_booking
+
 try:
     from pydantic import BaseModel
 except ImportError:
@@ -51,6 +55,11 @@ class Agent:
     handoffs: Optional[list[Agent]] = None
     handoff_description: Optional[str] = None
     output_type: Optional[Type[BaseModel]] = None
+    model: Optional[str] = None
+
+
+class ModelBehaviorError(Exception):
+    """The model produced something unexpected, e.g. output that fails its output type (as in the SDK)."""
 
 
 @dataclass
@@ -59,6 +68,69 @@ class HostedMCPTool:
     tool_config: Dict[str, Any]
 
 
+@dataclass
+class Usage:
+    """Model usage accumulated over a run (mirrors ``agents.usage.Usage``)."""
+    requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    total_tokens: int = 0
+
+    def add(self, other: Usage) -> None:
+        self.requests += other.requests
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.total_tokens += other.total_tokens
+
+
+@dataclass
+class RunContextWrapper:
+    """Context handed to hooks, carrying the user context and run usage."""
+    context: Any = None
+    usage: Usage = field(default_factory=Usage)
+
+
+@dataclass
+class ModelResponse:
+    """Result of one simulated model turn, passed to ``on_llm_end``."""
+    output: list[Any]
+    usage: Usage
+    response_id: Optional[str] = None
+
+
+class RunHooks:
+    """
+    Lifecycle callbacks for a run, matching ``agents.RunHooks``.
+
+    Subclass and override the methods you need. The stub treats each step of
+    its deterministic workflow (choose availability, choose booking, produce
+    output) as one model turn so LLM-level hooks fire at realistic points.
+    """
+
+    async def on_llm_start(
+        self, context: RunContextWrapper, agent: Agent, system_prompt: Optional[str], input_items: list[Any]
+    ) -> None:
+        pass
+
+    async def on_llm_end(self, context: RunContextWrapper, agent: Agent, response: ModelResponse) -> None:
+        pass
+
+    async def on_agent_start(self, context: RunContextWrapper, agent: Agent) -> None:
+        pass
+
+    async def on_agent_end(self, context: RunContextWrapper, agent: Agent, output: Any) -> None:
+        pass
+
+    async def on_handoff(self, context: RunContextWrapper, from_agent: Agent, to_agent: Agent) -> None:
+        pass
+
+    async def on_tool_start(self, context: RunContextWrapper, agent: Agent, tool: Any) -> None:
+        pass
+
+    async def on_tool_end(self, context: RunContextWrapper, agent: Agent, tool: Any, result: str) -> None:
+        pass
+
+
 @dataclass
 class RunnerResult:
     """Result from running an agent with typed output support."""
@@ -84,67 +156,280 @@ class RunnerResult:
             raise ValueError(f"Could not validate output as {model_class.__name__}") from exc
 
 
+@dataclass
+class RunItem:
+    """An item produced during a run (tool call, tool output, handoff, message)."""
+    agent: Agent
+    type: str
+    raw_item: Any = None
+    output: Any = None
+
+
+@dataclass
+class ToolCall:
+    """Raw payload of a tool call item, exposing ``name`` like the SDK's."""
+    name: str
+    arguments: str
+
+
+@dataclass
+class RunItemStreamEvent:
+    """Streaming event wrapping a ``RunItem`` (mirrors ``agents.RunItemStreamEvent``)."""
+    name: str
+    item: RunItem
+    type: str = "run_item_stream_event"
+
+
+@dataclass
+class AgentUpdatedStreamEvent:
+    """Streaming event announcing a new active agent."""
+    new_agent: Agent
+    type: str = "agent_updated_stream_event"
+
+
+@dataclass
+class _RunState:
+    """Per-run plumbing shared by the blocking and streaming entry points."""
+    hooks: RunHooks
+    wrapper: RunContextWrapper
+    events: Optional[asyncio.Queue] = None
+
+    def emit(self, event: Any) -> None:
+        if self.events is not None:
+            self.events.put_nowait(event)
+
+
+class RunResultStreaming(RunnerResult):
+    """
+    Result of ``Runner.run_streamed``.
+
+    Iterate ``stream_events()`` to receive progress as it happens; once the
+    stream is exhausted ``final_output`` holds the same value ``Runner.run``
+    would have returned.
+    """
+
+    _DONE = object()
+
+    def __init__(self, output_type: Optional[Type[BaseModel]], events: asyncio.Queue, task: asyncio.Task):
+        super().__init__(final_output="", _output_type=output_type)
+        self.is_complete = False
+        self._events = events
+        self._task = task
+
+    async def stream_events(self):
+        """Yield stream events until the run finishes, then re-raise any run error."""
+        while True:
+            event = await self._events.get()
+            if event is RunResultStreaming._DONE:
+                break
+            yield event
+        self.is_complete = True
+        self.final_output = (await self._task).final_output
+
+
 class Runner:
     """Minimal harness that deterministically calls tool functions."""
 
+    # Date that relative prompt dates resolve against. Pinned (overridable via
+    # SMARTER_DOG_REFERENCE_DATE) so stub runs stay deterministic and line up
+    # with the sample ledger.
+    reference_date: date = date.fromisoformat(os.environ.get("SMARTER_DOG_REFERENCE_DATE", "2024-07-01"))
+
     @staticmethod
-    async def run(agent: Agent, prompt: str) -> RunnerResult:
+    async def run(
+        agent: Agent,
+        prompt: str,
+        *,
+        context: Any = None,
+        hooks: Optional[RunHooks] = None,
+    ) -> RunnerResult:
         """
         Run an agent with the given prompt.
 
         Supports handoffs by checking if the agent has handoff agents configured.
+        When ``hooks`` is given, its callbacks fire around each simulated model
+        turn and tool invocation, as they would with the real SDK.
+        """
+        state = _RunState(hooks or RunHooks(), RunContextWrapper(context=context))
+        output = await Runner._run_agent(agent, prompt, state)
+        return RunnerResult(final_output=output, _output_type=agent.output_type)
+
+    @staticmethod
+    def run_streamed(
+        agent: Agent,
+        prompt: str,
+        *,
+        context: Any = None,
+        hooks: Optional[RunHooks] = None,
+    ) -> RunResultStreaming:
+        """
+        Start a run in streaming mode (mirrors ``Runner.run_streamed``).
+
+        Returns immediately; the run proceeds in a background task and its
+        progress is delivered through ``RunResultStreaming.stream_events()``:
+        agent changes, tool calls and outputs (availability, booking), the
+        handoff to the Sheet Logger and the logger's final message.
         """
+        events: asyncio.Queue = asyncio.Queue()
+        state = _RunState(hooks or RunHooks(), RunContextWrapper(context=context), events)
+
+        async def drive() -> RunnerResult:
+            try:
+                output = await Runner._run_agent(agent, prompt, state)
+                return RunnerResult(final_output=output, _output_type=agent.output_type)
+            finally:
+                events.put_nowait(RunResultStreaming._DONE)
+
+        task = asyncio.get_running_loop().create_task(drive())
+        return RunResultStreaming(agent.output_type, events, task)
+
+    @staticmethod
+    async def _run_agent(agent: Agent, prompt: str, state: _RunState) -> str:
+        """Run one agent, firing agent hooks and dispatching on its name."""
+        await state.hooks.on_agent_start(state.wrapper, agent)
+        state.emit(AgentUpdatedStreamEvent(new_agent=agent))
         # Handle different agent names (original and refactored)
         if agent.name in ("Smarter Dog", "Smarter Dog Grooming"):
-            booking_json = await Runner._handle_booking_request(agent, prompt)
-            return RunnerResult(
-                final_output=booking_json,
-                _output_type=agent.output_type
-            )
-        if agent.name == "Sheet Logger":
-            status_json = await Runner._handle_sheet_logging(prompt)
-            return RunnerResult(
-                final_output=status_json,
-                _output_type=agent.output_type
-            )
-        raise RuntimeError(f"Unsupported agent '{agent.name}'.")
+            output = await Runner._handle_booking_request(agent, prompt, state)
+        elif agent.name == "Sheet Logger":
+            output = await Runner._handle_sheet_logging(prompt)
+            await Runner._model_turn(agent, [prompt], output, state)
+            state.emit(RunItemStreamEvent("message_output_created", RunItem(agent, "message_output_item", output=output)))
+        else:
+            raise RuntimeError(f"Unsupported agent '{agent.name}'.")
+        await state.hooks.on_agent_end(state.wrapper, agent, output)
+        return output
+
+    @staticmethod
+    async def _model_turn(agent: Agent, items: list[str], decision: str, state: _RunState) -> None:
+        """
+        Fire LLM hooks for one deterministic "model" decision.
+
+        ``items`` is the conversation the model would see and ``decision`` what
+        it would emit (tool arguments or final output). Token counts are
+        estimated at four characters per token so accounting code sees
+        realistic, growing per-turn usage.
+        """
+        await state.hooks.on_llm_start(state.wrapper, agent, agent.instructions, list(items))
+        input_tokens = Runner._estimate_tokens(agent.instructions, *items)
+        output_tokens = Runner._estimate_tokens(decision)
+        usage = Usage(
+            requests=1,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=input_tokens + output_tokens,
+        )
+        state.wrapper.usage.add(usage)
+        await state.hooks.on_llm_end(state.wrapper, agent, ModelResponse(output=[decision], usage=usage))
+
+    @staticmethod
+    def _estimate_tokens(*texts: str) -> int:
+        return max(1, sum(len(text) for text in texts) // 4)
 
     @staticmethod
-    async def _handle_booking_request(agent: Agent, prompt: str) -> str:
+    def _tool_name(tool: Any) -> str:
+        return getattr(tool, "name", None) or getattr(tool, "__name__", "tool")
+
+    @staticmethod
+    def _fill_from_customer(request: Dict[str, str], missing: list[str], customer: Dict[str, Any]) -> None:
+        """Complete ``request`` from a ``lookup_customer`` match, as the model would after confirming."""
+        request["customer_name"] = customer["customer_name"]
+        request["contact_number"] = customer["contact_number"]
+        dogs = customer["dogs"]
+        if "dog_name" not in missing:
+            dogs = [dog for dog in dogs if dog["dog_name"].casefold() == request["dog_name"].casefold()]
+        if len(dogs) == 1:
+            request["dog_name"] = dogs[0]["dog_name"]
+            if "dog_size" in missing:
+                request["dog_size"] = dogs[0]["dog_size"]
+
+    @staticmethod
+    async def _call_tool(agent: Agent, tool: ToolCallable, state: _RunState, **kwargs: Any) -> Any:
+        """Invoke a tool callable with tool hooks and stream events around it."""
+        name = Runner._tool_name(tool)
+        call = ToolCall(name=name, arguments=json.dumps(kwargs))
+        state.emit(RunItemStreamEvent("tool_called", RunItem(agent, "tool_call_item", raw_item=call)))
+        await state.hooks.on_tool_start(state.wrapper, agent, tool)
+        result = tool(**kwargs)
+        await state.hooks.on_tool_end(state.wrapper, agent, tool, json.dumps(result))
+        state.emit(
+            RunItemStreamEvent("tool_output", RunItem(agent, "tool_call_output_item", raw_item=call, output=result))
+        )
+        # Yield so streaming consumers see each step as it happens.
+        await asyncio.sleep(0)
+        return result
+
+    @staticmethod
+    async def _hand_off(agent: Agent, booking: Dict[str, Any], state: _RunState) -> None:
+        """Hand a confirmed booking to the Sheet Logger, if one is configured."""
+        target = next((handoff for handoff in agent.handoffs or [] if handoff.name == "Sheet Logger"), None)
+        if target is None:
+            return
+        state.emit(RunItemStreamEvent("handoff_requested", RunItem(agent, "handoff_call_item", raw_item=target.name)))
+        await state.hooks.on_handoff(state.wrapper, agent, target)
+        state.emit(RunItemStreamEvent("handoff_occured", RunItem(agent, "handoff_output_item", output=target.name)))
+        await Runner._run_agent(target, f"Booking payload:\n{json.dumps(booking)}", state)
+
+    @staticmethod
+    async def _handle_booking_request(agent: Agent, prompt: str, state: _RunState) -> str:
         """Handle booking requests with enhanced customer detail extraction."""
-        request = Runner._parse_booking_prompt(prompt)
-        tools = list(agent.tools)
-        if len(tools) < 2:
+        extraction = extract_booking(prompt, Runner.reference_date)
+        request = Runner._parse_booking_prompt(prompt, extraction)
+        tools = {Runner._tool_name(tool): tool for tool in agent.tools}
+        get_available, book = tools.get("get_available_slots"), tools.get("book_grooming_appointment")
+        if get_available is None or book is None:
             raise RuntimeError("Booking agent requires availability and booking tools.")
-
-        get_available, book = tools[0], tools[1]
+        lookup = tools.get("lookup_customer")
+        transcript = [prompt]
+
+        # Returning customer: fill the details they did not restate from the registry
+        missing = [name for name in ("dog_name", "dog_size", "customer_name") if extraction.get(name) is None]
+        phone = extraction.get("contact_number")
+        if lookup is not None and missing and (phone or extraction.get("customer_name")):
+            lookup_args = {"contact_number": phone or "", "customer_name": "" if phone else request["customer_name"]}
+            await Runner._model_turn(agent, transcript, json.dumps(lookup_args), state)
+            found = await Runner._call_tool(agent, lookup, state, **lookup_args)
+            transcript.append(json.dumps(found))
+            if len(found["matches"]) == 1:
+                Runner._fill_from_customer(request, missing, found["matches"][0])
 
         # Call availability tool
-        availability = get_available(
-            requested_date=request["requested_date"],
-            dog_size=request["dog_size"],
-        )
+        availability_args = {"requested_date": request["requested_date"], "dog_size": request["dog_size"]}
+        await Runner._model_turn(agent, transcript, json.dumps(availability_args), state)
+        availability = await Runner._call_tool(agent, get_available, state, **availability_args)
+        transcript.append(json.dumps(availability))
 
         # Select slot (prefer requested, fallback to first available)
         slot = request["requested_time"]
         if slot not in availability["available_slots"]:
             alternatives = availability["available_slots"]
             if not alternatives:
-                raise RuntimeError("No slots available; booking cannot be completed.")
-            slot = alternatives[0]
+                # Day fully booked: join the requested slot's waitlist when the agent offers one
+                book = tools.get("join_waitlist")
+                if book is None:
+                    raise RuntimeError("No slots available; booking cannot be completed.")
+            else:
+                slot = alternatives[0]
 
         # Call booking tool
-        booking = book(
-            dog_name=request["dog_name"],
-            dog_size=request["dog_size"],
-            requested_date=request["requested_date"],
-            requested_time=slot,
-            customer_name=request["customer_name"],
-            contact_number=request["contact_number"],
-        )
+        booking_args = {
+            "dog_name": request["dog_name"],
+            "dog_size": request["dog_size"],
+            "requested_date": request["requested_date"],
+            "requested_time": slot,
+            "customer_name": request["customer_name"],
+            "contact_number": request["contact_number"],
+        }
+        await Runner._model_turn(agent, transcript, json.dumps(booking_args), state)
+        booking = await Runner._call_tool(agent, book, state, **booking_args)
+        transcript.append(json.dumps(booking))
 
-        await asyncio.sleep(0)
-        return json.dumps(booking)
+        # Hand a confirmed booking off to the sheet logger, then produce it as final output
+        output = json.dumps(booking)
+        await Runner._model_turn(agent, transcript, output, state)
+        if booking.get("status") == "Booked":
+            await Runner._hand_off(agent, booking, state)
+        return output
 
     @staticmethod
     async def _handle_sheet_logging(prompt: str) -> str:
@@ -165,77 +450,46 @@ class Runner:
         return json.dumps({"status": "success", "details": details})
 
     @staticmethod
-    def _parse_booking_prompt(prompt: str) -> Dict[str, str]:
+    def _parse_booking_prompt(prompt: str, extraction: Optional[BookingExtraction] = None) -> Dict[str, str]:
         """
         Extract booking details from the request prompt.
 
-        Supports parsing:
-        - Dog name (e.g., "book Luna")
-        - Dog size (small/medium/large)
-        - Date (e.g., "July 17th")
-        - Time (e.g., "10:30")
-        - Customer name (e.g., "Customer name is Sarah Chen")
-        - Phone number (e.g., "phone number is 555-0123")
+        Delegates to the single-pass extractor in ``booking_extractor``, which
+        understands ISO, numeric and spelled-out dates, weekdays ("next
+        Tuesday"), 12- and 24-hour times and international phone numbers.
+        Relative dates resolve against ``Runner.reference_date``.
 
         Falls back to defaults when parts are missing.
         """
-        # Extract dog name
-        dog_name = Runner._match_or_default(r"book (\w+)", prompt, default="Doggo")
-
-        # Extract dog size
-        size = Runner._match_or_default(r"a (small|medium|large) dog", prompt, default="medium")
-
-        # Extract time
-        time_match = Runner._match_or_default(r"at (\d{1,2}:\d{2})", prompt, default="09:00")
-
-        # Extract date
-        date_text = Runner._match_or_default(
-            r"for ([A-Za-z]+\s+\d{1,2}(?:st|nd|rd|th)?)",
-            prompt,
-            default="July 10th",
+        reference = Runner.reference_date
+        if extraction is None:
+            extraction = extract_booking(prompt, reference)
+        return extraction.as_request(
+            {
+                "dog_name": "Doggo",
+                "dog_size": "medium",
+                "requested_date": reference.isoformat(),
+                "requested_time": "09:00",
+                "customer_name": "Smarter Dog Customer",
+                "contact_number": "N/A",
+            }
         )
-        parsed_date = Runner._parse_month_day(date_text)
-
-        # Extract customer name (enhanced)
-        customer_name = Runner._match_or_default(
-            r"[Cc]ustomer name is ([A-Za-z\s]+?)(?:,|\.|$)",
-            prompt,
-            default="Smarter Dog Customer"
-        )
-        customer_name = customer_name.strip()
-
-        # Extract phone number (enhanced)
-        contact_number = Runner._match_or_default(
-            r"phone number is ([\d\-]+)",
-            prompt,
-            default="N/A"
-        )
-
-        return {
-            "dog_name": dog_name,
-            "dog_size": size,
-            "requested_date": parsed_date,
-            "requested_time": time_match,
-            "customer_name": customer_name,
-            "contact_number": contact_number,
-        }
-
-    @staticmethod
-    def _match_or_default(pattern: str, text: str, default: str) -> str:
-        """Match regex pattern in text, return default if not found."""
-        match = re.search(pattern, text, re.IGNORECASE)
-        return match.group(1) if match else default
-
-    @staticmethod
-    def _parse_month_day(value: str) -> str:
-        """Parse month/day text into ISO date format."""
-        cleaned = re.sub(r"(st|nd|rd|th)", "", value)
-        current_year = 2024
-        try:
-            parsed = datetime.strptime(f"{cleaned} {current_year}", "%B %d %Y")
-        except ValueError:
-            parsed = datetime(current_year, 7, 10)
-        return parsed.date().isoformat()
 
 
-__all__ = ["Agent", "HostedMCPTool", "Runner", "RunnerResult", "function_tool"]
+__all__ = [
+    "Agent",
+    "AgentUpdatedStreamEvent",
+    "HostedMCPTool",
+    "ModelBehaviorError",
+    "ModelResponse",
+    "RunContextWrapper",
+    "RunHooks",
+    "RunItem",
+    "RunItemStreamEvent",
+    "RunResultStreaming",
+    "Runner",
+    "RunnerResult",
+    "ToolCall",
+    "Usage",
+    "function_tool",
+]
@@ -0,0 +1,250 @@
+"""
+Batch booking CLI for overnight partner files.
+
+Streams a JSONL file of booking requests, processes them with bounded
+parallelism and appends one JSON result per input line to an output JSONL
+file as soon as it is known.
+
+Each input line is either:
+- a structured request with the ``BookingRequest`` fields (dog_name,
+  dog_size, requested_date, requested_time, customer_name, contact_number,
+  optionally location)
+- a free-text request: ``{"prompt": "..."}``
+
+An optional ``id`` field is echoed back in the result. A ``location`` on a
+free-text line applies when the prompt takes the fast path; the agent picks
+the location from the prompt itself.
+
+Routing:
+- fast path: structured requests, and prompts the extractor reads with full
+  confidence, go straight to ``commit_booking`` without a model call
+- agent: everything else, plus fast-path prompts whose slot turned out to be
+  full (the agent can pick the nearest alternative), runs through the
+  grooming agent
+
+Results are written in input order. At most ``--concurrency`` requests are
+held in memory at once, so memory stays flat however large the input is.
+A checkpoint file records the input byte offset and output size after every
+``--checkpoint-every`` results; ``--resume`` truncates the output back to the
+checkpoint and continues from the recorded input offset after a crash.
+
+Usage:
+    python batch_bookings.py partner.jsonl results.jsonl --concurrency 16
+    python batch_bookings.py partner.jsonl results.jsonl --resume
+    python batch_bookings.py partner.jsonl results.jsonl --metrics-file batch.prom
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import time
+from collections import deque
+from typing import Any, Optional
+
+from pydantic import ValidationError
+
+import booking_core
+import metrics
+import token_accounting
+from booking_extractor import extract_booking
+from booking_models import BookingRequest, BookingResponse
+
+FAST_PATH_CONFIDENCE = 0.8
+
+
+@functools.lru_cache(maxsize=None)
+def _grooming_agent() -> Any:
+    """Build the grooming agent on first use; this is what imports the Agents SDK."""
+    import smarter_dog_refactored as sd
+
+    return sd.create_grooming_agent(sd.create_sheet_logger_agent())
+
+
+# ============================================================================
+# Checkpointing
+# ============================================================================
+
+
+def _checkpoint_path(output_path: str) -> str:
+    return f"{output_path}.checkpoint"
+
+
+def read_checkpoint(output_path: str) -> dict:
+    """Load the checkpoint for ``output_path`` (a fresh one if none exists)."""
+    try:
+        with open(_checkpoint_path(output_path), encoding="utf-8") as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return {"input_offset": 0, "output_offset": 0, "records": 0}
+
+
+def write_checkpoint(output_path: str, checkpoint: dict) -> None:
+    """Atomically replace the checkpoint so a crash never leaves it half-written."""
+    path = _checkpoint_path(output_path)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as handle:
+        json.dump(checkpoint, handle)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temporary, path)
+
+
+# ============================================================================
+# Routing
+# ============================================================================
+
+
+async def process_record(record: dict, agent: Any = None) -> dict:
+    """Book one request via the fast path or the agent and describe the outcome.
+
+    Structured requests never touch the agent workflow. ``agent`` defaults to
+    a shared grooming agent built the first time a prompt needs it.
+    """
+    result: dict = {"id": record.get("id")}
+    prompt = record.get("prompt")
+
+    if prompt is None:
+        try:
+            request = BookingRequest.model_validate(record)
+        except ValidationError as exc:
+            return {**result, "route": "fast", "status": "error", "error": f"Invalid request: {exc.errors(include_url=False, include_input=False)}"}
+        try:
+            booking = booking_core.commit_booking(**request.model_dump())
+        except ValueError as exc:
+            return {**result, "route": "fast", "status": "error", "error": str(exc)}
+        return {**result, "route": "fast", "status": "ok", "booking": booking}
+
+    # Deferred so structured-only batches never load the Agents SDK.
+    import smarter_dog_refactored as sd
+
+    # The stub pins a reference date for relative dates; the real SDK has none.
+    extraction = extract_booking(prompt, getattr(sd.Runner, "reference_date", None))
+    if extraction.is_complete(FAST_PATH_CONFIDENCE):
+        fields = extraction.as_request({})
+        try:
+            booking = booking_core.commit_booking(**fields, location=record.get("location", ""))
+        except ValueError:
+            # Closed day or full slot: let the agent negotiate an alternative.
+            pass
+        else:
+            return {**result, "route": "fast", "status": "ok", "booking": booking}
+
+    try:
+        run = await sd.run_agent(agent or _grooming_agent(), prompt)
+        booking = run.final_output_as(BookingResponse).model_dump()
+    except Exception as exc:  # noqa: BLE001 - a failed request must not stop the batch
+        return {**result, "route": "agent", "status": "error", "error": str(exc)}
+    return {**result, "route": "agent", "status": "ok", "booking": booking}
+
+
+async def _process_line(line: bytes, line_number: int, agent: Any = None) -> dict:
+    """Parse one input line and process it, reporting malformed lines as errors."""
+    try:
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError("expected a JSON object")
+    except ValueError as exc:
+        return {"line": line_number, "route": None, "status": "error", "error": f"Malformed line: {exc}"}
+    return {"line": line_number, **await process_record(record, agent)}
+
+
+# ============================================================================
+# Pipeline
+# ============================================================================
+
+
+async def run_batch(
+    input_path: str,
+    output_path: str,
+    concurrency: int = 8,
+    checkpoint_every: int = 100,
+    resume: bool = False,
+) -> dict:
+    """Process ``input_path`` into ``output_path`` and return run statistics.
+
+    Work is kept in a window of at most ``concurrency`` in-flight requests.
+    The oldest request is always awaited first, so results are written in
+    input order and the checkpoint can be a single pair of byte offsets.
+    """
+    resume = resume and os.path.exists(output_path)
+    checkpoint = read_checkpoint(output_path) if resume else {"input_offset": 0, "output_offset": 0, "records": 0}
+    loop = asyncio.get_running_loop()
+    stats = {"processed": 0, "ok": 0, "error": 0, "fast": 0, "agent": 0, "resumed_from": checkpoint["records"]}
+    started = time.perf_counter()
+
+    with open(input_path, "rb") as source, open(output_path, "r+b" if resume else "wb") as sink:
+        source.seek(checkpoint["input_offset"])
+        sink.seek(checkpoint["output_offset"])
+        sink.truncate()
+
+        input_offset = checkpoint["input_offset"]
+        records = checkpoint["records"]
+        window: deque = deque()
+
+        def fill() -> None:
+            nonlocal input_offset
+            while len(window) < concurrency:
+                line = source.readline()
+                if not line:
+                    return
+                input_offset += len(line)
+                if not line.strip():
+                    window.append((input_offset, None))
+                    continue
+                line_number = records + len(window) + 1
+                window.append((input_offset, loop.create_task(_process_line(line, line_number))))
+
+        fill()
+        while window:
+            end_offset, task = window.popleft()
+            if task is not None:
+                result = await task
+                sink.write(json.dumps(result, default=str).encode("utf-8") + b"\n")
+                stats["processed"] += 1
+                stats[result["status"]] += 1
+                if result["route"]:
+                    stats[result["route"]] += 1
+            records += 1
+            if records % checkpoint_every == 0:
+                sink.flush()
+                write_checkpoint(
+                    output_path, {"input_offset": end_offset, "output_offset": sink.tell(), "records": records}
+                )
+            fill()
+
+        sink.flush()
+        write_checkpoint(output_path, {"input_offset": input_offset, "output_offset": sink.tell(), "records": records})
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    stats["model_usage"] = token_accounting.USAGE.report()["per_successful_booking"]
+    return stats
+
+
+def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Process a JSONL file of booking requests.")
+    parser.add_argument("input", help="Input JSONL file of booking requests")
+    parser.add_argument("output", help="Output JSONL file for results")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum requests in flight")
+    parser.add_argument("--checkpoint-every", type=int, default=100, help="Results between checkpoints")
+    parser.add_argument("--resume", action="store_true", help="Continue from the last checkpoint")
+    parser.add_argument("--metrics-file", help="Write Prometheus latency metrics here when done")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Entry point for the batch booking CLI."""
+    args = _parse_args(argv)
+    stats = asyncio.run(
+        run_batch(args.input, args.output, args.concurrency, args.checkpoint_every, args.resume)
+    )
+    if args.metrics_file:
+        metrics.REGISTRY.write_prometheus(args.metrics_file)
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+Microbenchmarks for the booking hot paths.
+
+Times each hot path in isolation and under thread contention:
+- get_available_slots (via its core, check_availability)
+- book_grooming_appointment (via its core, commit_booking)
+- _resolve_operating_day
+- _bank_holidays_for_year, both cached and cold
+- the stub Runner.run end to end
+- metrics.Histogram.observe_ns, the per-call instrumentation cost
+- synthetic_mix: a ``traffic_gen`` stream of availability checks and
+  bookings (including holiday and closed dates) replayed on the tool cores
+
+Each benchmark runs ``--number`` calls per sample and keeps ``--repeat``
+samples; the median per-call time is the headline figure. Contended variants
+run the same call from ``--threads`` threads released together by a barrier,
+which is what exposes the ledger lock.
+
+Results can be stored as a JSON baseline and later runs compared against it;
+any benchmark slower than the baseline by more than ``--tolerance`` is
+flagged and the process exits non-zero.
+
+Usage:
+    python bench_booking.py --save bench_baseline.json
+    python bench_booking.py --compare bench_baseline.json --tolerance 0.15
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from typing import Callable, Optional
+
+import metrics
+import booking_core
+import smarter_dog_refactored as sd
+import traffic_gen
+
+DEFAULT_TOLERANCE = 0.15
+
+
+@dataclass
+class BenchResult:
+    """Timing summary for one benchmark."""
+
+    name: str
+    threads: int
+    calls: int
+    median_us: float
+    min_us: float
+    max_us: float
+    ops_per_second: float
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+
+def _operating_days(count: int, start: date = date(2025, 1, 6)) -> list[str]:
+    """Return ``count`` consecutive open, non-holiday dates as ISO strings."""
+    days = []
+    day = start
+    while len(days) < count:
+        _, _, is_open = sd._resolve_operating_day(day.isoformat())
+        if is_open and not sd._is_bank_holiday(day):
+            days.append(day.isoformat())
+        day += timedelta(days=1)
+    return days
+
+
+class _Ledger:
+    """Snapshot and restore the shared ledger around benchmarks that mutate it."""
+
+    def __enter__(self) -> _Ledger:
+        self._snapshot = booking_core.STORE.snapshot()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        booking_core.STORE.restore(self._snapshot)
+
+
+def _booking_calls(count: int) -> Callable[[int], dict]:
+    """Build a call that books the i-th of ``count`` distinct slot units."""
+    per_day = len(sd.SLOT_TIMES) * sd.CAPACITY_UNITS
+    days = _operating_days(count // per_day + 1)
+
+    def book(i: int) -> dict:
+        slot = sd.SLOT_TIMES[(i // sd.CAPACITY_UNITS) % len(sd.SLOT_TIMES)]
+        return sd.commit_booking("Luna", "small", days[i // per_day], slot, "Sarah Chen", "555-0123")
+
+    return book
+
+
+# ============================================================================
+# Timing
+# ============================================================================
+
+
+def _summarise(name: str, threads: int, number: int, samples: list[float]) -> BenchResult:
+    per_call = [sample / number * 1_000_000 for sample in samples]
+    median = statistics.median(per_call)
+    return BenchResult(
+        name=name,
+        threads=threads,
+        calls=number * len(samples) * threads,
+        median_us=round(median, 3),
+        min_us=round(min(per_call), 3),
+        max_us=round(max(per_call), 3),
+        ops_per_second=round(threads * 1_000_000 / median, 1),
+    )
+
+
+def time_call(
+    name: str,
+    func: Callable[[int], object],
+    number: int,
+    repeat: int,
+    threads: int = 1,
+    setup: Optional[Callable[[], None]] = None,
+) -> BenchResult:
+    """Time ``func(i)`` for i in range(number), ``repeat`` times, on ``threads`` threads.
+
+    ``setup`` runs before every sample (outside the timed region). With
+    several threads, each sample is the slowest thread's wall time, so the
+    per-call figure includes lock waits.
+    """
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        if threads == 1:
+            started = time.perf_counter()
+            for i in range(number):
+                func(i)
+            samples.append(time.perf_counter() - started)
+            continue
+
+        barrier = threading.Barrier(threads + 1)
+        elapsed = [0.0] * threads
+
+        def run(index: int) -> None:
+            offset = index * number
+            barrier.wait()
+            started = time.perf_counter()
+            for i in range(offset, offset + number):
+                func(i)
+            elapsed[index] = time.perf_counter() - started
+
+        workers = [threading.Thread(target=run, args=(index,)) for index in range(threads)]
+        for worker in workers:
+            worker.start()
+        barrier.wait()
+        for worker in workers:
+            worker.join()
+        samples.append(max(elapsed))
+    return _summarise(name, threads, number, samples)
+
+
+def time_async_call(
+    name: str,
+    func: Callable[[int], object],
+    number: int,
+    repeat: int,
+    setup: Optional[Callable[[], None]] = None,
+) -> BenchResult:
+    """Time an async ``func(i)`` sequentially inside one event loop."""
+
+    async def sample() -> float:
+        if setup:
+            setup()
+        started = time.perf_counter()
+        for i in range(number):
+            await func(i)
+        return time.perf_counter() - started
+
+    async def run_all() -> list[float]:
+        return [await sample() for _ in range(repeat)]
+
+    return _summarise(name, 1, number, asyncio.run(run_all()))
+
+
+# ============================================================================
+# Suite
+# ============================================================================
+
+
+def run_suite(number: int = 2000, repeat: int = 7, threads: int = 4) -> list[BenchResult]:
+    """Run every benchmark and return the results."""
+    results = []
+    days = _operating_days(64)
+    mixed_days = [(date(2024, 1, 1) + timedelta(days=i)).isoformat() for i in range(730)]
+    years = list(range(1990, 2090))
+
+    uncached_holidays = sd._bank_holidays_for_year.__wrapped__
+
+    def availability(i: int) -> dict:
+        return sd.check_availability(days[i % len(days)], "medium")
+
+    results.append(time_call("check_availability", availability, number, repeat))
+    results.append(time_call("check_availability[contended]", availability, number, repeat, threads))
+    results.append(
+        time_call(
+            "resolve_operating_day",
+            lambda i: sd._resolve_operating_day(mixed_days[i % len(mixed_days)]),
+            number,
+            repeat,
+        )
+    )
+    results.append(
+        time_call(
+            "bank_holidays_for_year[cached]",
+            lambda i: sd._bank_holidays_for_year(years[i % len(years)]),
+            number,
+            repeat,
+        )
+    )
+    results.append(
+        time_call(
+            "bank_holidays_for_year[cold]", lambda i: uncached_holidays(years[i % len(years)]), number, repeat
+        )
+    )
+
+    histogram = metrics.MetricsRegistry().histogram("bench_seconds")
+    results.append(time_call("metrics_observe", lambda i: histogram.observe_ns(i * 997), number, repeat))
+
+    with _Ledger() as ledger:
+        book = _booking_calls(number * threads)
+        results.append(time_call("commit_booking", book, number, repeat, setup=ledger.reset))
+        results.append(time_call("commit_booking[contended]", book, number, repeat, threads, setup=ledger.reset))
+
+        agent = sd.create_grooming_agent(sd.create_sheet_logger_agent())
+        per_day = len(sd.SLOT_TIMES) * sd.CAPACITY_UNITS
+        run_days = _operating_days(number // per_day + 1)
+
+        def stub_run(i: int):
+            day = run_days[i // per_day]
+            slot = sd.SLOT_TIMES[(i // sd.CAPACITY_UNITS) % len(sd.SLOT_TIMES)]
+            prompt = (
+                f"Book Luna, a small dog, on {day} at {slot}. "
+                "Customer name is Sarah Chen, phone number is 555-0123."
+            )
+            return sd.Runner.run(agent, prompt)
+
+        events = list(traffic_gen.generate(number))
+
+        def replay(i: int) -> object:
+            try:
+                return traffic_gen.replay(events[i])
+            except ValueError as exc:  # full slots and closed days are part of the mix
+                return exc
+
+        results.append(time_call("synthetic_mix", replay, number, repeat, setup=ledger.reset))
+
+        run_number = max(1, number // 10)
+        results.append(time_async_call("runner_run", stub_run, run_number, repeat, setup=ledger.reset))
+    return results
+
+
+# ============================================================================
+# Baselines
+# ============================================================================
+
+
+def save_baseline(path: str, results: list[BenchResult]) -> None:
+    """Write results plus environment metadata as a JSON baseline."""
+    payload = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": {result.name: asdict(result) for result in results},
+    }
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle, indent=2)
+
+
+def compare_to_baseline(path: str, results: list[BenchResult], tolerance: float) -> list[str]:
+    """Return a description of each benchmark slower than the baseline beyond ``tolerance``."""
+    with open(path, encoding="utf-8") as handle:
+        baseline = json.load(handle)["results"]
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if previous is None:
+            continue
+        ratio = result.median_us / previous["median_us"] if previous["median_us"] else 1.0
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{result.name}: {previous['median_us']:.3f}us -> {result.median_us:.3f}us ({ratio - 1:+.1%})"
+            )
+    return regressions
+
+
+def format_results(results: list[BenchResult]) -> str:
+    lines = [f"{'benchmark':<34}{'threads':>8}{'median us':>12}{'min us':>10}{'ops/s':>14}"]
+    for result in results:
+        lines.append(
+            f"{result.name:<34}{result.threads:>8}{result.median_us:>12.3f}{result.min_us:>10.3f}"
+            f"{result.ops_per_second:>14,.0f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Run the suite, optionally saving or comparing a baseline."""
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the booking hot paths")
+    parser.add_argument("--number", type=int, default=2000, help="Calls per sample")
+    parser.add_argument("--repeat", type=int, default=7, help="Samples per benchmark")
+    parser.add_argument("--threads", type=int, default=4, help="Threads for contended variants")
+    parser.add_argument("--save", metavar="PATH", help="Write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against a JSON baseline")
+    parser.add_argument(
+        "--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown (0.15 = 15%%)"
+    )
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.number, args.repeat, args.threads)
+    print(format_results(results))
+    if args.save:
+        save_baseline(args.save, results)
+        print(f"\nBaseline written to {args.save}")
+    if args.compare:
+        regressions = compare_to_baseline(args.compare, results, args.tolerance)
+        if regressions:
+            print(f"\nRegressions beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions beyond {args.tolerance:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
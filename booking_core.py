@@ -0,0 +1,753 @@
+"""
+Calendar and ledger core of the Smarter Dog booking workflow.
+
+Holds the salon rules (operating days, bank holiday shifts, the Christmas
+shutdown, slot capacity), the in-memory booking ledger, and the plain
+cores behind the agent tools (availability, booking, cancel, reschedule,
+the waitlist and the customer and booking lookups). Every booking is
+assigned a groomer (``groomers``) in the same ledger operation. Confirmed
+bookings are recorded in the customer registry (``customer_registry``);
+capacity freed by a cancel or reschedule goes to the slot's waitlist
+(``waitlist``) before anyone else can take it. Utilization reports read
+rollups the stores keep up to date on every change (``utilization``).
+
+The ledger is partitioned by salon location (``locations``): each location
+has its own rules, booking store, waitlist and locks, and every core takes a
+``location`` (default ``DEFAULT_LOCATION``). The module constants below are
+the default salon's rules.
+
+Imports only the standard library and in-repo stdlib-only modules,
+so workers that never run an agent (``/slots``, ``/bookings``, the batch
+fast path) start without loading the Agents SDK, the stub or Pydantic. Agent
+code lives in ``smarter_dog_refactored``, which re-exports these names.
+"""
+
+from __future__ import annotations
+
+import calendar
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from itertools import accumulate
+from typing import Callable, Literal, Optional
+
+import groomers
+import lock_profiling
+import metrics
+import tracing
+import utilization
+from booking_store import BookingStore, SlotFull
+from customer_registry import CUSTOMERS, normalize_phone
+from locations import Salon, configured_salons
+from waitlist import Promotion, Waitlist, emit
+
+SLOT_TIMES = (
+    "08:30",
+    "09:00",
+    "09:30",
+    "10:00",
+    "10:30",
+    "11:00",
+    "11:30",
+    "12:00",
+    "12:30",
+    "13:00",
+)
+OPEN_WEEKDAYS = {0, 1, 2}
+CAPACITY_UNITS = 2
+DOG_SIZE_UNITS: dict[Literal["small", "medium", "large"], int] = {
+    "small": 1,
+    "medium": 1,
+    "large": 2,
+}
+
+# Consecutive slots each service takes, by dog size.
+SERVICE_SLOTS: dict[str, dict[Literal["small", "medium", "large"], int]] = {
+    "standard": {"small": 1, "medium": 1, "large": 1},
+    "full_groom": {"small": 2, "medium": 2, "large": 3},
+}
+
+# The two groomers that CAPACITY_UNITS stands for; both take every size, every open slot.
+GROOMERS = (
+    groomers.Groomer("groomer-1", "Groomer 1", frozenset(DOG_SIZE_UNITS)),
+    groomers.Groomer("groomer-2", "Groomer 2", frozenset(DOG_SIZE_UNITS)),
+)
+
+DEFAULT_SALON = Salon(
+    "main",
+    "Smarter Dog Grooming",
+    SLOT_TIMES,
+    frozenset(OPEN_WEEKDAYS),
+    CAPACITY_UNITS,
+    dict(DOG_SIZE_UNITS),
+    {service: dict(slots) for service, slots in SERVICE_SLOTS.items()},
+    groomers=GROOMERS,
+)
+
+
+@dataclass
+class Partition:
+    """One location's slice of the ledger: its rules, bookings and waitlist.
+
+    Each ``store.units`` is that location's capacity ledger (date -> slot ->
+    units in use), derived from its records and updated in the same
+    transaction. Always take a lock through its attribute (``store.lock``):
+    lock profiling swaps it in place.
+    """
+
+    salon: Salon
+    store: BookingStore
+    waitlist: Waitlist
+
+
+# Partitions share no locks, so salons never wait on each other; only the
+# customer registry is shared.
+PARTITIONS: dict[str, Partition] = {}
+# Bumped whenever the salon configuration changes, so caches of answers derived from it can tell.
+CONFIG_GENERATION = 0
+
+
+def add_location(salon: Salon) -> Partition:
+    """Create a salon's ledger partition and register its locks for profiling.
+
+    Raises:
+        ValueError: If the location already exists
+    """
+    if salon.location_id in PARTITIONS:
+        raise ValueError(f"Location {salon.location_id!r} already exists")
+    partition = Partition(salon, BookingStore(salon.location_id), Waitlist(salon.location_id))
+    lock_profiling.register(partition.store, "lock", f"bookings.{salon.location_id}")
+    lock_profiling.register(partition.waitlist, "lock", f"waitlist.{salon.location_id}")
+    PARTITIONS[salon.location_id] = partition
+    global CONFIG_GENERATION
+    CONFIG_GENERATION += 1
+    return partition
+
+
+for _salon in configured_salons(DEFAULT_SALON):
+    add_location(_salon)
+
+DEFAULT_LOCATION = next(iter(PARTITIONS))
+# The default location's store and capacity ledger, for single-salon callers.
+STORE = PARTITIONS[DEFAULT_LOCATION].store
+CURRENT_BOOKINGS = STORE.units
+
+# Bookings that predate the record store, so the sample ledger keeps its capacity.
+if PARTITIONS[DEFAULT_LOCATION].salon == DEFAULT_SALON:
+    STORE.reserve("Existing booking", "large", "2024-07-10", "09:00", "Walk-in", "", 2, CAPACITY_UNITS)
+    STORE.reserve("Existing booking", "medium", "2024-07-17", "10:30", "Walk-in", "", 1, CAPACITY_UNITS)
+
+
+def partition_for(location: str = "") -> Partition:
+    """The ledger partition of a location ID; empty means ``DEFAULT_LOCATION``.
+
+    Raises:
+        ValueError: If the location is unknown
+    """
+    partition = PARTITIONS.get(location or DEFAULT_LOCATION)
+    if partition is None:
+        raise ValueError(f"Unknown location {location!r}; choose one of: {', '.join(PARTITIONS)}")
+    return partition
+
+
+# ============================================================================
+# Business Logic Helpers
+# ============================================================================
+
+
+def _parse_date(value: str) -> date:
+    """Parse ISO date string to date object."""
+    return datetime.fromisoformat(value).date()
+
+
+def _last_weekday_of_month(year: int, month: int, weekday: int) -> date:
+    """Find the last occurrence of a weekday in a given month."""
+    last_day = calendar.monthrange(year, month)[1]
+    candidate = date(year, month, last_day)
+    while candidate.weekday() != weekday:
+        candidate -= timedelta(days=1)
+    return candidate
+
+
+@lru_cache(maxsize=None)
+def _bank_holidays_for_year(year: int) -> set[date]:
+    """Calculate UK bank holidays for a given year."""
+    late_may = _last_weekday_of_month(year, 5, 0)  # Spring bank holiday (last Monday in May)
+    late_august = _last_weekday_of_month(year, 8, 0)  # Summer bank holiday (last Monday in Aug)
+    holidays = {late_may, late_august}
+
+    christmas = date(year, 12, 25)
+    holidays.add(christmas)
+    # Substitute Christmas bank holidays when the 25th falls on a weekend.
+    if christmas.weekday() == 5:  # Saturday
+        holidays.add(christmas + timedelta(days=2))
+    elif christmas.weekday() == 6:  # Sunday
+        holidays.add(christmas + timedelta(days=1))
+    return holidays
+
+
+def _is_bank_holiday(day: date) -> bool:
+    """Check if a date is a UK bank holiday."""
+    return day in _bank_holidays_for_year(day.year)
+
+
+def _is_christmas_shutdown(day: date) -> bool:
+    """Check if a date falls within the Christmas shutdown period."""
+    if day.month == 12 and day.day in {24, 25, 26}:
+        return True
+    dec26 = date(day.year, 12, 26)
+    if day <= dec26:
+        return False
+    first_monday = dec26 + timedelta(days=1)
+    while first_monday.weekday() != 0:
+        first_monday += timedelta(days=1)
+    shutdown_window = {first_monday + timedelta(days=i) for i in range(3)}
+    return day in shutdown_window
+
+
+def _shift_bank_holiday(day: date, salon: Salon = DEFAULT_SALON) -> tuple[date, list[str], bool]:
+    """Shift bank holiday bookings to the salon's holiday weekday if they fall on operating days."""
+    shift_to = salon.holiday_shift_weekday
+    if shift_to is not None and day.weekday() in salon.open_weekdays and _is_bank_holiday(day):
+        new_day = day + timedelta(days=(shift_to - day.weekday()) % 7)
+        return new_day, [
+            f"{day.isoformat()} is a bank holiday, booking moved to {new_day.isoformat()}."
+        ], True
+    return day, [], False
+
+
+def _ensure_operating_day(
+    day: date, force_open: bool = False, salon: Salon = DEFAULT_SALON
+) -> tuple[date, list[str]]:
+    """Validate that a day is an operating day for the salon."""
+    if day.isoformat() in salon.closed_dates:
+        return day, [f"{day.isoformat()} is a closure day at {salon.name}."]
+    shutdown = salon.christmas_shutdown and _is_christmas_shutdown(day)
+    if force_open and day.weekday() == salon.holiday_shift_weekday and not shutdown:
+        return day, []
+    if day.weekday() not in salon.open_weekdays:
+        return day, [f"{day.isoformat()} falls on {day.strftime('%A')}, salon closed."]
+    if shutdown:
+        return day, [f"{day.isoformat()} is during the Christmas shutdown."]
+    if salon.holiday_shift_weekday is None and _is_bank_holiday(day):
+        return day, [f"{day.isoformat()} is a bank holiday, salon closed."]
+    return day, []
+
+
+def _resolve_operating_day(requested_date: str, salon: Salon = DEFAULT_SALON) -> tuple[date, list[str], bool]:
+    """Resolve the actual operating day from a requested date, handling holidays and closures."""
+    requested = _parse_date(requested_date)
+    day, notes, force_open = _shift_bank_holiday(requested, salon)
+    operating_day, closure_notes = _ensure_operating_day(day, force_open, salon)
+    combined_notes = [*notes, *closure_notes]
+    is_open = not closure_notes and (force_open or operating_day.weekday() in salon.open_weekdays)
+    return operating_day, combined_notes, is_open
+
+
+def _open_day_key(partition: Partition, requested_date: str, requested_time: str) -> tuple[str, list[str]]:
+    """Resolve a booking request to the operating day it lands on, with any notes.
+
+    Raises:
+        ValueError: If the salon is closed or the time is not one of its slots
+    """
+    operating_day, notes, is_open = _resolve_operating_day(requested_date, partition.salon)
+    if not is_open:
+        raise ValueError(f"Salon closed on {operating_day.isoformat()}")
+    if requested_time not in partition.salon.slot_times:
+        raise ValueError("Requested time is outside operating hours.")
+    return operating_day.isoformat(), notes
+
+
+def _covered_slots(salon: Salon, start: str, slots: int) -> list[str]:
+    """The ``slots`` consecutive slots of an appointment starting at ``start``.
+
+    Raises:
+        ValueError: If the appointment would run past the salon's last slot
+    """
+    first = salon.slot_index[start]
+    covered = list(salon.slot_times[first : first + slots])
+    if len(covered) < slots:
+        raise ValueError(f"A {slots}-slot appointment starting at {start} runs past closing; pick an earlier time.")
+    return covered
+
+
+def _plan_groomer(
+    partition: Partition, day_key: str, dog_size: str, covered: list[str], ignore: Optional[int] = None
+) -> Optional[groomers.Assignment]:
+    """Who would take the dog (see ``groomers.assign``); call with ``partition.store.lock`` held."""
+    store = partition.store
+    return groomers.assign(
+        partition.salon.groomers,
+        store.rota.get(day_key, {}),
+        dog_size,
+        _parse_date(day_key).weekday(),
+        covered,
+        store.get,
+        ignore,
+    )
+
+
+def _has_groomer(partition: Partition, day_key: str, dog_size: str, covered: list[str]) -> bool:
+    """Whether a groomer can be assigned (always, at a salon without groomers); call with the store lock held."""
+    salon = partition.salon
+    return not salon.groomers or groomers.can_assign(
+        salon.groomers,
+        partition.store.rota.get(day_key, {}),
+        dog_size,
+        _parse_date(day_key).weekday(),
+        covered,
+        partition.store.get,
+    )
+
+
+def _staffer(
+    partition: Partition, day_key: str, dog_size: str, ignore: Optional[int] = None
+) -> Optional[Callable[[list[str]], str]]:
+    """The ``staff`` callback for ``BookingStore.reserve``/``move``; None when the salon has no groomers.
+
+    It applies the assignment's repairs and returns the chosen groomer, or
+    raises SlotFull when no groomer can be freed.
+    """
+    if not partition.salon.groomers:
+        return None
+
+    def staff(covered: list[str]) -> str:
+        plan = _plan_groomer(partition, day_key, dog_size, covered, ignore)
+        if plan is None:
+            raise SlotFull(
+                f"No groomer who handles {dog_size} dogs is free at {covered[0]}; "
+                "the slot is fully staffed, pick another time."
+            )
+        for booking_id, groomer_id in plan.repairs:
+            partition.store.reassign(booking_id, groomer_id)
+        return plan.groomer_id
+
+    return staff
+
+
+def _free_starts(partition: Partition, day_key: str, dog_size: str, slots: int) -> list[str]:
+    """Start times where the dog fits in every one of ``slots`` consecutive slots.
+
+    One pass over the day: count the slots without room for its units into a
+    prefix sum, then a window is free exactly when its count is zero. At a
+    salon with groomers, a free window also needs a groomer who can be
+    assigned.
+    """
+    salon = partition.salon
+    limit = salon.capacity_units - salon.units_for(dog_size)
+    starts = range(len(salon.slot_times) - slots + 1)
+    with partition.store.lock:
+        used = partition.store.units.get(day_key, {})
+        blocked = [0, *accumulate(used.get(slot, 0) > limit for slot in salon.slot_times)]
+        free = [start for start in starts if blocked[start + slots] == blocked[start]]
+        if salon.groomers:
+            rota, weekday = partition.store.rota.get(day_key, {}), _parse_date(day_key).weekday()
+            free = [
+                start
+                for start in free
+                if groomers.can_assign(
+                    salon.groomers,
+                    rota,
+                    dog_size,
+                    weekday,
+                    salon.slot_times[start : start + slots],
+                    partition.store.get,
+                )
+            ]
+    return [salon.slot_times[start] for start in free]
+
+
+def _slot_has_capacity(day: date, slot: str, units_needed: int, partition: Optional[Partition] = None) -> bool:
+    """Check if a time slot has sufficient capacity for the booking."""
+    partition = partition or PARTITIONS[DEFAULT_LOCATION]
+    day_key = day.isoformat()
+    with partition.store.lock:
+        used = partition.store.units.get(day_key, {}).get(slot, 0)
+    return used + units_needed <= partition.salon.capacity_units
+
+
+@tracing.traced_tool("get_available_slots")
+@metrics.timed_tool("get_available_slots")
+def check_availability(
+    requested_date: str,
+    dog_size: Literal["small", "medium", "large"],
+    location: str = "",
+    service: str = "standard",
+) -> dict:
+    """List open start times for a date, dog size and service (plain-function core of get_available_slots).
+
+    A start time is listed only when every slot the service covers has room,
+    and a groomer who handles the dog's size can take it.
+
+    Raises:
+        ValueError: If the location or service is unknown
+    """
+    partition = partition_for(location)
+    slots = partition.salon.slots_for(service, dog_size)
+    operating_day, notes, is_open = _resolve_operating_day(requested_date, partition.salon)
+    if not is_open:
+        reasons = notes or [f"{operating_day.isoformat()} is outside operating days."]
+        return {
+            "requested_date": requested_date,
+            "operating_date": operating_day.isoformat(),
+            "available_slots": [],
+            "notes": reasons,
+        }
+
+    with tracing.span("ledger.lock", **{"ledger.operation": "read"}):
+        available = _free_starts(partition, operating_day.isoformat(), dog_size, slots)
+    return {
+        "requested_date": requested_date,
+        "operating_date": operating_day.isoformat(),
+        "available_slots": available,
+        "notes": notes,
+    }
+
+
+@tracing.traced_tool("book_grooming_appointment")
+@metrics.timed_tool("book_grooming_appointment")
+def commit_booking(
+    dog_name: str,
+    dog_size: Literal["small", "medium", "large"],
+    requested_date: str,
+    requested_time: str,
+    customer_name: str,
+    contact_number: str,
+    location: str = "",
+    service: str = "standard",
+) -> dict:
+    """Reserve a slot in the ledger (plain-function core of book_grooming_appointment).
+
+    A multi-slot service claims all of its slots in one ledger operation, or
+    none of them. The booking is assigned a groomer in the same operation,
+    which may hand other bookings to colleagues to free one.
+
+    Callable directly by non-agent entry points, since the decorated tools are
+    not plain callables under the real SDK.
+
+    Raises:
+        ValueError: If the location or service is unknown, the salon is
+            closed, time is invalid, or slot is full or has no free groomer
+    """
+    partition = partition_for(location)
+    day_key, notes = _open_day_key(partition, requested_date, requested_time)
+    covered = _covered_slots(partition.salon, requested_time, partition.salon.slots_for(service, dog_size))
+    with tracing.span("ledger.lock", **{"ledger.operation": "reserve"}):
+        record = partition.store.reserve(
+            dog_name,
+            dog_size,
+            day_key,
+            requested_time,
+            customer_name,
+            contact_number,
+            partition.salon.units_for(dog_size),
+            partition.salon.capacity_units,
+            notes,
+            service,
+            covered,
+            _staffer(partition, day_key, dog_size),
+        )
+    CUSTOMERS.record_booking(customer_name, contact_number, dog_name, dog_size, day_key)
+    return record.to_dict()
+
+
+def _check_owner(store: BookingStore, booking_id: int, contact_number: str) -> None:
+    """Refuse to touch a booking made with a different phone number, when one is given.
+
+    Call with ``store.lock`` held, so the booking cannot change hands before it is modified.
+    """
+    record = store.get(booking_id)
+    if record is None:
+        raise ValueError(f"No booking with ID {booking_id}.")
+    if contact_number and normalize_phone(contact_number) != normalize_phone(record.contact_number):
+        raise ValueError(f"Booking {booking_id} was made with a different phone number.")
+
+
+@tracing.traced_tool("cancel_booking")
+@metrics.timed_tool("cancel_booking")
+def release_booking(booking_id: int, contact_number: str = "", location: str = "") -> dict:
+    """Cancel a booking and free its slot (plain-function core of cancel_booking).
+
+    Raises:
+        ValueError: If the location is unknown, there is no such booking, or
+            ``contact_number`` does not match it
+    """
+    partition = partition_for(location)
+    with tracing.span("ledger.lock", **{"ledger.operation": "cancel"}), partition.store.lock:
+        _check_owner(partition.store, booking_id, contact_number)
+        record = partition.store.cancel(booking_id)
+        cancelled = record.to_dict(status="Cancelled")
+        promotions = _promote_waitlist(partition, record.date, record.slots)
+    emit(promotions)
+    return cancelled
+
+
+@tracing.traced_tool("reschedule_booking")
+@metrics.timed_tool("reschedule_booking")
+def move_booking(
+    booking_id: int, requested_date: str, requested_time: str, contact_number: str = "", location: str = ""
+) -> dict:
+    """Move a booking to a new date and time (plain-function core of reschedule_booking).
+
+    The booking keeps its service and length, and is assigned a groomer for
+    the new slots. The new slots are claimed and the old ones released in one
+    ledger operation; if a new slot is full (or has no free groomer) the
+    booking stays where it was.
+
+    Raises:
+        ValueError: If the location is unknown, there is no such booking,
+            ``contact_number`` does not match it, the salon is closed, the
+            time is invalid, or the slot is full
+    """
+    partition = partition_for(location)
+    day_key, notes = _open_day_key(partition, requested_date, requested_time)
+    store = partition.store
+    with tracing.span("ledger.lock", **{"ledger.operation": "move"}), store.lock:
+        _check_owner(store, booking_id, contact_number)
+        record = store.get(booking_id)
+        old_date, old_slots = record.date, record.slots
+        covered = _covered_slots(partition.salon, requested_time, len(record.slots))
+        staff = _staffer(partition, day_key, record.dog_size, ignore=booking_id)
+        record = store.move(
+            booking_id, day_key, requested_time, partition.salon.capacity_units, notes, covered, staff
+        )
+        moved = record.to_dict()
+        promotions = _promote_waitlist(partition, old_date, old_slots)
+    emit(promotions)
+    return moved
+
+
+def _promote_waitlist(partition: Partition, day_key: str, freed: list[str]) -> list[Promotion]:
+    """Book waiting entries into freed slots, longest waiting first fit.
+
+    Candidates start at a freed slot, or early enough that their service runs
+    into one. Call with ``partition.store.lock`` held, so nobody else can
+    claim the freed units first.
+    """
+    salon, store = partition.salon, partition.store
+    capacity = salon.capacity_units
+    positions = [salon.slot_index[slot] for slot in freed]
+    starts = salon.slot_times[max(0, min(positions) - salon.longest_service + 1) : max(positions) + 1]
+
+    def fits(start: str, dog_size: str, slots: int) -> bool:
+        used = store.units.get(day_key, {})
+        units = salon.units_for(dog_size)
+        first = salon.slot_index[start]
+        covered = list(salon.slot_times[first : first + slots])
+        return (
+            len(covered) == slots
+            and all(used.get(slot, 0) + units <= capacity for slot in covered)
+            and _has_groomer(partition, day_key, dog_size, covered)
+        )
+
+    promotions = []
+    while True:
+        entry = partition.waitlist.pop_fitting(day_key, starts, fits)
+        if entry is None:
+            return promotions
+        record = store.reserve(
+            entry.dog_name,
+            entry.dog_size,
+            day_key,
+            entry.time,
+            entry.customer_name,
+            entry.contact_number,
+            entry.units,
+            capacity,
+            [*entry.notes, f"Booked from the waitlist (waitlist ID {entry.entry_id})."],
+            entry.service,
+            _covered_slots(salon, entry.time, entry.slots),
+            _staffer(partition, day_key, entry.dog_size),
+        )
+        CUSTOMERS.record_booking(entry.customer_name, entry.contact_number, entry.dog_name, entry.dog_size, day_key)
+        promotions.append(Promotion(entry, record.to_dict()))
+
+
+@tracing.traced_tool("join_waitlist")
+@metrics.timed_tool("join_waitlist")
+def enqueue_waitlist(
+    dog_name: str,
+    dog_size: Literal["small", "medium", "large"],
+    requested_date: str,
+    requested_time: str,
+    customer_name: str,
+    contact_number: str,
+    location: str = "",
+    service: str = "standard",
+) -> dict:
+    """Wait for a full slot (plain-function core of join_waitlist).
+
+    If the slot (every slot, for a long service) has room by the time the
+    request arrives, it is booked straight away and returned with status
+    ``Booked``; otherwise the entry is queued and returned with status
+    ``Waitlisted`` and its ``waitlist_id``.
+
+    Raises:
+        ValueError: If the location or service is unknown, the salon is
+            closed or the time is invalid
+    """
+    partition = partition_for(location)
+    day_key, notes = _open_day_key(partition, requested_date, requested_time)
+    salon = partition.salon
+    units, slots = salon.units_for(dog_size), salon.slots_for(service, dog_size)
+    covered = _covered_slots(salon, requested_time, slots)
+    with tracing.span("ledger.lock", **{"ledger.operation": "waitlist"}), partition.store.lock:
+        used = partition.store.units.get(day_key, {})
+        if all(used.get(slot, 0) + units <= salon.capacity_units for slot in covered) and _has_groomer(
+            partition, day_key, dog_size, covered
+        ):
+            return commit_booking(
+                dog_name, dog_size, requested_date, requested_time, customer_name, contact_number, location, service
+            )
+        entry, position = partition.waitlist.add(
+            dog_name, dog_size, day_key, requested_time, customer_name, contact_number, units, notes, service, slots
+        )
+    return entry.to_dict(position)
+
+
+@tracing.traced_tool("lookup_customer")
+@metrics.timed_tool("lookup_customer")
+def find_customers(contact_number: str = "", customer_name: str = "") -> dict:
+    """Look up returning customers by phone, else by name (plain-function core of lookup_customer)."""
+    matches = CUSTOMERS.lookup(contact_number, customer_name)
+    notes = [] if matches else ["No returning customer found; ask for the full booking details."]
+    return {"matches": matches, "notes": notes}
+
+
+@tracing.traced_tool("list_bookings")
+@metrics.timed_tool("list_bookings")
+def find_bookings(
+    dog_name: str = "", contact_number: str = "", start_date: str = "", end_date: str = "", location: str = ""
+) -> dict:
+    """List stored bookings by dog, customer phone and/or date range (plain-function core of list_bookings).
+
+    Searches one location, or every location when ``location`` is empty.
+
+    Raises:
+        ValueError: If no filter is given, a date is not ISO or the location is unknown
+    """
+    # Parsed, so a non-ISO date is rejected instead of compared as a string against ISO ones.
+    start_date = _parse_date(start_date).isoformat() if start_date else ""
+    end_date = _parse_date(end_date).isoformat() if end_date else ""
+    stores = [partition_for(location).store] if location else [partition.store for partition in PARTITIONS.values()]
+    # Narrow with the most selective index, then filter on the remaining criteria.
+    if dog_name:
+        records = [record for store in stores for record in store.for_dog(dog_name)]
+    elif contact_number:
+        records = [record for store in stores for record in store.for_customer(contact_number)]
+    elif start_date or end_date:
+        start, end = start_date or "0000-01-01", end_date or "9999-12-31"
+        records = [record for store in stores for record in store.between(start, end)]
+    else:
+        raise ValueError("Give a dog name, a contact number or a date range.")
+    if len(stores) > 1:
+        records.sort(key=lambda record: (record.date, record.time, record.location, record.booking_id))
+    phone_key = normalize_phone(contact_number)
+    matches = [
+        record.to_dict()
+        for record in records
+        if (not contact_number or normalize_phone(record.contact_number) == phone_key)
+        and (not start_date or record.date >= start_date)
+        and (not end_date or record.date <= end_date)
+    ]
+    return {"bookings": matches}
+
+
+def _period_days(period: str, day: str) -> tuple[str, date, date]:
+    """The key and first and last day of the ``period`` ("day", "week" or "month") containing ``day``.
+
+    Raises:
+        ValueError: If the period is unknown or the date is not ISO
+    """
+    if period not in utilization.PERIODS:
+        raise ValueError(f"Unknown period {period!r}; choose one of: {', '.join(utilization.PERIODS)}")
+    when = _parse_date(day)
+    key = utilization.period_keys(when.isoformat())[utilization.PERIODS.index(period)]
+    if period == "day":
+        return key, when, when
+    if period == "week":
+        first = when - timedelta(days=when.weekday())
+        return key, first, first + timedelta(days=6)
+    first = when.replace(day=1)
+    return key, first, first.replace(day=calendar.monthrange(when.year, when.month)[1])
+
+
+@lru_cache(maxsize=1024)
+def _operating_days_between(salon: Salon, first: date, last: date) -> int:
+    """Days from ``first`` to ``last`` the salon can take bookings, shifted bank holidays included."""
+    days = set()
+    day = first
+    while day <= last:
+        operating_day, _, is_open = _resolve_operating_day(day.isoformat(), salon)
+        if is_open and first <= operating_day <= last:
+            days.add(operating_day)
+        day += timedelta(days=1)
+    return len(days)
+
+
+def utilization_report(day: str, period: str = "day", location: str = "") -> dict:
+    """Utilization of the day, ISO week or month containing ``day``, by dog size.
+
+    Reads the store's incrementally maintained rollups; the capacity of a
+    period (operating days x slots x capacity units) is cached per salon, so
+    a report costs the same whatever the ledger size. Utilization is the
+    share of capacity unit-slots in use.
+
+    Raises:
+        ValueError: If the location or period is unknown, or the date is not ISO
+    """
+    partition = partition_for(location)
+    salon = partition.salon
+    key, first, last = _period_days(period, day)
+    capacity = _operating_days_between(salon, first, last) * len(salon.slot_times) * salon.capacity_units
+    with partition.store.lock:
+        by_size = partition.store.rollups.get(period, key)
+    for totals in by_size.values():
+        totals["utilization"] = round(totals["unit_slots"] / capacity, 4) if capacity else 0.0
+    unit_slots = sum(totals["unit_slots"] for totals in by_size.values())
+    return {
+        "location": salon.location_id,
+        "period": period,
+        "key": key,
+        "first_day": first.isoformat(),
+        "last_day": last.isoformat(),
+        "capacity_unit_slots": capacity,
+        "unit_slots": unit_slots,
+        "bookings": sum(totals["bookings"] for totals in by_size.values()),
+        "utilization": round(unit_slots / capacity, 4) if capacity else 0.0,
+        "by_size": by_size,
+    }
+
+
+def snapshot_ledgers() -> tuple[dict[str, tuple], tuple]:
+    """Every location's bookings and waitlist, and the customer registry, for ``restore_ledgers``."""
+    partitions = {
+        location: (partition.store.snapshot(), partition.waitlist.snapshot())
+        for location, partition in list(PARTITIONS.items())
+    }
+    return partitions, CUSTOMERS.snapshot()
+
+
+def restore_ledgers(snapshot: tuple[dict[str, tuple], tuple]) -> None:
+    """Return the locations in a ``snapshot_ledgers()`` and the customer registry to it."""
+    partitions, customers = snapshot
+    for location, (bookings, waiting) in partitions.items():
+        partition = PARTITIONS[location]
+        partition.store.restore(bookings)
+        partition.waitlist.restore(waiting)
+    CUSTOMERS.restore(customers)
+
+
+def verify_ledgers() -> dict[str, list[str]]:
+    """Recompute every location's derived indexes (units, rota, rollups) from its records.
+
+    Returns the differences per location, leaving out locations with none.
+    Each check holds that location's store lock for a full pass over its
+    records, so run it periodically, not per request.
+    """
+    problems = {}
+    for location, partition in list(PARTITIONS.items()):
+        found = partition.store.verify()
+        if found:
+            problems[location] = found
+    return problems
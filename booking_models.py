@@ -0,0 +1,77 @@
+"""
+Pydantic models for booking tool parameters and outputs.
+
+Kept apart from the agent module so request validation (the HTTP service,
+the batch CLI) can use them without importing the Agents SDK.
+"""
+
+from __future__ import annotations
+
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class SlotAvailabilityRequest(BaseModel):
+    """Request parameters for checking slot availability."""
+
+    requested_date: str = Field(
+        ...,
+        description="Date in ISO format (YYYY-MM-DD) for which to check availability",
+    )
+    dog_size: Literal["small", "medium", "large"] = Field(
+        ..., description="Size of the dog: small, medium, or large"
+    )
+    location: str = Field("", description="Salon location ID; empty for the default salon")
+    service: str = Field("standard", description="Service, which sets how many consecutive slots are needed")
+
+
+class SlotAvailabilityResponse(BaseModel):
+    """Response containing available time slots for grooming."""
+
+    requested_date: str = Field(..., description="Original requested date")
+    operating_date: str = Field(..., description="Actual operating date after adjustments")
+    available_slots: list[str] = Field(..., description="List of available time slots")
+    notes: list[str] = Field(default_factory=list, description="Additional notes or warnings")
+
+
+class BookingRequest(BaseModel):
+    """Request parameters for booking a grooming appointment."""
+
+    dog_name: str = Field(..., description="Name of the dog")
+    dog_size: Literal["small", "medium", "large"] = Field(
+        ..., description="Size of the dog: small, medium, or large"
+    )
+    requested_date: str = Field(..., description="Requested date in ISO format (YYYY-MM-DD)")
+    requested_time: str = Field(..., description="Requested time slot (e.g., '09:00')")
+    customer_name: str = Field(..., description="Name of the customer")
+    contact_number: str = Field(..., description="Customer contact phone number")
+    location: str = Field("", description="Salon location ID; empty for the default salon")
+    service: str = Field("standard", description="Service, e.g. 'standard' or 'full_groom'")
+
+
+class BookingResponse(BaseModel):
+    """Confirmed booking details."""
+
+    dog_name: str
+    dog_size: Literal["small", "medium", "large"]
+    date: str
+    time: str
+    customer: str
+    phone: str
+    status: Literal["Booked", "Waitlisted", "Failed"]
+    notes: list[str] = Field(default_factory=list)
+    booking_id: Optional[int] = Field(None, description="Booking store ID, for cancelling or rescheduling")
+    waitlist_id: Optional[int] = Field(None, description="Waitlist entry ID, when the slot was full")
+    location: Optional[str] = Field(None, description="Salon location ID of the booking")
+    service: Optional[str] = Field(None, description="Booked service")
+    slots: list[str] = Field(default_factory=list, description="Every slot the appointment covers")
+    groomer: Optional[str] = Field(None, description="ID of the groomer assigned to the dog")
+
+
+class SheetLogResponse(BaseModel):
+    """Response from sheet logging operation."""
+
+    status: Literal["success", "error"]
+    details: str
+
@@ -0,0 +1,658 @@
+"""
+Long-lived asyncio HTTP service for the Smarter Dog booking workflow.
+
+Lets the web widget and phone integration talk to one process instead of
+spawning a script per request. Built on ``asyncio.start_server`` with no
+third-party dependencies.
+
+Endpoints:
+- GET  /health                          liveness probe
+- GET  /locations                       salon locations and their slot grids
+- GET  /slots?date=YYYY-MM-DD&size=...&service=...  get_available_slots
+- POST /bookings  (BookingRequest JSON) book_grooming_appointment
+- GET  /bookings?dog=...&phone=...&from=YYYY-MM-DD&to=YYYY-MM-DD  list_bookings
+- DELETE /bookings/<id>?phone=...       cancel_booking
+- PATCH  /bookings/<id> {"date": ..., "time": ..., "phone": ...}  reschedule_booking
+- POST /waitlist  (BookingRequest JSON) join_waitlist: 202 when queued, 201 if the slot had room
+- GET  /waitlist?date=YYYY-MM-DD&time=HH:MM  entries waiting for a date or slot
+- DELETE /waitlist/<id>                 leave the waitlist
+- GET  /utilization?date=YYYY-MM-DD&period=day|week|month  utilization by dog size
+- POST /chat      {"message": "..."}    free-text turn with the grooming agent, on the
+  small or large model tier (see model_tiers)
+- GET  /metrics                         Prometheus text exposition of latency metrics
+- GET  /usage                           model turns, tokens and cost per booking, response cache hits
+- GET  /debug/locks                     ledger lock contention report
+- POST /debug/locks {"enabled": bool, "reset": bool}  switch lock profiling
+- GET  /debug/ledger                    latest periodic ledger verification (drift check)
+- POST /export {"format": "parquet"|"arrow", "full": bool}  columnar ledger export
+  into ``--export-dir`` (see ledger_export)
+
+Every ledger endpoint takes a salon ``location`` (query parameter, or JSON
+field for POST/PATCH); without one it uses the default location.
+
+Behaviour:
+- HTTP/1.1 keep-alive with an idle timeout per connection
+- Requests go through a bounded queue served by a fixed worker pool; when the
+  queue is full the server answers 503 with Retry-After instead of piling up
+- SIGINT/SIGTERM trigger a graceful shutdown: stop accepting, finish queued
+  work (up to a drain timeout), then close idle connections
+- Every ``--verify-interval`` seconds the derived ledger indexes (units,
+  groomer rota, utilization rollups) are recomputed from the booking records
+  off the event loop; any drift is logged on ``smarter_dog.server``
+- /chat answers repeated informational questions from ``response_cache``
+  without a model call; the response says which in ``X-Cache: hit|miss``
+- ``X-Smarter-Dog-Profile: 1`` on a /chat request profiles that run; the
+  response carries the profile ID in ``X-Profile-Id`` (see request_profiling)
+
+Usage:
+    python booking_server.py --port 8080 --workers 8 --queue-size 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import signal
+import time
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from pydantic import ValidationError
+
+import booking_core
+import ledger_export
+import lock_profiling
+import metrics
+import request_profiling
+import response_cache
+import token_accounting
+from booking_models import BookingRequest, SlotAvailabilityRequest
+
+LOGGER = logging.getLogger("smarter_dog.server")
+
+MAX_HEADER_BYTES = 16 * 1024
+ROUTED_PATHS = frozenset(
+    {
+        "/health",
+        "/metrics",
+        "/usage",
+        "/debug/locks",
+        "/debug/ledger",
+        "/export",
+        "/locations",
+        "/slots",
+        "/bookings",
+        "/waitlist",
+        "/utilization",
+        "/chat",
+    }
+)
+
+
+@dataclass
+class ServerConfig:
+    """Tunables for the booking service."""
+
+    host: str = "127.0.0.1"
+    port: int = 8080
+    workers: int = 8
+    queue_size: int = 64
+    keepalive_timeout: float = 15.0
+    drain_timeout: float = 10.0
+    max_body_bytes: int = 64 * 1024
+    export_dir: Optional[str] = None  # where POST /export writes; None disables it
+    verify_interval: float = 300.0  # seconds between ledger verifications; 0 disables them
+
+
+@dataclass
+class HttpRequest:
+    """A parsed HTTP request."""
+
+    method: str
+    path: str
+    query: dict[str, list[str]]
+    headers: dict[str, str]
+    body: bytes
+    keep_alive: bool
+
+
+class HttpError(Exception):
+    """Raised by handlers to produce an error response."""
+
+    def __init__(self, status: HTTPStatus, message: str, details: Any = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.details = details
+
+    def payload(self) -> dict:
+        return {"error": self.message, **({"details": self.details} if self.details is not None else {})}
+
+
+# ============================================================================
+# HTTP Wire Helpers
+# ============================================================================
+
+
+async def read_request(reader: asyncio.StreamReader, max_body_bytes: int) -> Optional[HttpRequest]:
+    """Read one request from ``reader``; return None when the peer closed cleanly."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as exc:
+        if exc.partial.strip():
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Truncated request") from exc
+        return None
+    except asyncio.LimitOverrunError as exc:
+        raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Headers too large") from exc
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError as exc:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Malformed request line") from exc
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    raw_length = headers.get("content-length", "") or "0"
+    if not (raw_length.isascii() and raw_length.isdigit()):  # also rejects signs, so never negative
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    length = int(raw_length)
+    if length > max_body_bytes:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Body too large")
+    body = await reader.readexactly(length) if length else b""
+
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+    parts = urlsplit(target)
+    return HttpRequest(method.upper(), parts.path, parse_qs(parts.query), headers, body, keep_alive)
+
+
+def render_response(
+    status: HTTPStatus, payload: Any, keep_alive: bool, extra_headers: Optional[dict[str, str]] = None
+) -> bytes:
+    """Serialise a response with framing headers; ``str`` payloads are sent as plain text."""
+    if isinstance(payload, str):
+        body = payload.encode("utf-8")
+        content_type = "text/plain; version=0.0.4; charset=utf-8"
+    else:
+        body = json.dumps(payload, default=str).encode("utf-8")
+        content_type = "application/json"
+    headers = {
+        "Content-Type": content_type,
+        "Content-Length": str(len(body)),
+        "Connection": "keep-alive" if keep_alive else "close",
+        **(extra_headers or {}),
+    }
+    head = f"HTTP/1.1 {status.value} {status.phrase}\r\n" + "".join(
+        f"{name}: {value}\r\n" for name, value in headers.items()
+    )
+    return head.encode("latin-1") + b"\r\n" + body
+
+
+def _json_body(request: HttpRequest) -> dict:
+    try:
+        payload = json.loads(request.body or b"{}")
+    except json.JSONDecodeError as exc:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {exc}") from exc
+    if not isinstance(payload, dict):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Expected a JSON object")
+    return payload
+
+
+def _validation_details(exc: ValidationError) -> list[dict]:
+    return exc.errors(include_url=False, include_input=False)
+
+
+# ============================================================================
+# Endpoint Handlers
+# ============================================================================
+
+
+class BookingService:
+    """Routes requests to the booking core and the grooming agent."""
+
+    def __init__(self, export_dir: Optional[str] = None) -> None:
+        self._workflow: Any = None
+        self.export_dir = export_dir
+        self.last_verification: dict = {"checked_at": None, "problems": {}}
+
+    @property
+    def workflow(self) -> Any:
+        """The tiered agent workflow, built on the first /chat so startup skips the Agents SDK."""
+        if self._workflow is None:
+            import smarter_dog_refactored as sd
+
+            self._workflow = sd.TieredWorkflow()
+        return self._workflow
+
+    async def handle(self, request: HttpRequest) -> tuple:
+        """Return ``(status, payload)`` or ``(status, payload, extra_headers)``."""
+        route = (request.method, request.path)
+        if route == ("GET", "/health"):
+            return HTTPStatus.OK, {"status": "ok"}
+        if route == ("GET", "/metrics"):
+            return HTTPStatus.OK, metrics.REGISTRY.render_prometheus()
+        if route == ("GET", "/usage"):
+            return HTTPStatus.OK, {**token_accounting.USAGE.report(), "response_cache": response_cache.CACHE.stats()}
+        if route == ("GET", "/debug/locks"):
+            return HTTPStatus.OK, {"enabled": lock_profiling.is_enabled(), "locks": lock_profiling.report()}
+        if route == ("POST", "/debug/locks"):
+            return HTTPStatus.OK, self.switch_lock_profiling(request)
+        if route == ("GET", "/debug/ledger"):
+            return HTTPStatus.OK, self.last_verification
+        if route == ("GET", "/utilization"):
+            return HTTPStatus.OK, self.utilization(request)
+        if route == ("POST", "/export"):
+            # Writing files can take a while; keep the event loop serving other requests.
+            return HTTPStatus.OK, await asyncio.to_thread(self.export, request)
+        if route == ("GET", "/locations"):
+            return HTTPStatus.OK, self.locations()
+        if route == ("GET", "/slots"):
+            return HTTPStatus.OK, self.slots(request)
+        if route == ("POST", "/bookings"):
+            return HTTPStatus.CREATED, self.book(request)
+        if route == ("GET", "/bookings"):
+            return HTTPStatus.OK, self.list_bookings(request)
+        if route == ("POST", "/waitlist"):
+            entry = self.join_waitlist(request)
+            return (HTTPStatus.ACCEPTED if entry["status"] == "Waitlisted" else HTTPStatus.CREATED), entry
+        if route == ("GET", "/waitlist"):
+            return HTTPStatus.OK, self.waiting(request)
+        if route == ("POST", "/chat"):
+            payload, headers = await self.chat(request)
+            return HTTPStatus.OK, payload, headers
+        if request.path.startswith("/bookings/"):
+            if request.method == "DELETE":
+                return HTTPStatus.OK, self.cancel(request)
+            if request.method == "PATCH":
+                return HTTPStatus.OK, self.reschedule(request)
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f"{request.method} not allowed on {request.path}")
+        if request.path.startswith("/waitlist/"):
+            if request.method == "DELETE":
+                return HTTPStatus.OK, self.leave_waitlist(request)
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f"{request.method} not allowed on {request.path}")
+        if request.path in ROUTED_PATHS:
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f"{request.method} not allowed on {request.path}")
+        raise HttpError(HTTPStatus.NOT_FOUND, f"No route for {request.path}")
+
+    def switch_lock_profiling(self, request: HttpRequest) -> dict:
+        payload = _json_body(request)
+        if payload.get("reset"):
+            lock_profiling.reset()
+        if "enabled" in payload:
+            lock_profiling.enable() if payload["enabled"] else lock_profiling.disable()
+        return {"enabled": lock_profiling.is_enabled()}
+
+    async def verify_periodically(self, interval: float) -> None:
+        """Check every location's derived indexes against its records every ``interval`` seconds."""
+        while True:
+            await asyncio.sleep(interval)
+            problems = await asyncio.to_thread(booking_core.verify_ledgers)
+            self.last_verification = {"checked_at": time.time(), "problems": problems}
+            for location, found in problems.items():
+                LOGGER.warning("ledger drift at %s: %d difference(s), first: %s", location, len(found), found[0])
+
+    def utilization(self, request: HttpRequest) -> dict:
+        params = {key: values[0] for key, values in request.query.items()}
+        if "date" not in params:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Query parameter 'date' is required")
+        try:
+            return booking_core.utilization_report(
+                params["date"], params.get("period", "day"), params.get("location", "")
+            )
+        except ValueError as exc:
+            raise self._ledger_error(exc) from exc
+
+    def export(self, request: HttpRequest) -> dict:
+        if self.export_dir is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, "Export is not configured; start the service with --export-dir")
+        payload = _json_body(request)
+        fmt, full = payload.get("format", "parquet"), payload.get("full", False)
+        if not isinstance(fmt, str) or not isinstance(full, bool):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Field 'format' must be a string and 'full' a boolean")
+        try:
+            return ledger_export.export(self.export_dir, fmt, full)
+        except ValueError as exc:
+            raise HttpError(HTTPStatus.BAD_REQUEST, str(exc)) from exc
+        except RuntimeError as exc:
+            raise HttpError(HTTPStatus.NOT_IMPLEMENTED, str(exc)) from exc
+
+    def slots(self, request: HttpRequest) -> dict:
+        params = {key: values[0] for key, values in request.query.items()}
+        try:
+            query = SlotAvailabilityRequest(
+                requested_date=params.get("date", ""),
+                dog_size=params.get("size", ""),
+                location=params.get("location", ""),
+                service=params.get("service", "standard"),
+            )
+            return booking_core.check_availability(
+                query.requested_date, query.dog_size, query.location, query.service
+            )
+        except ValidationError as exc:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Invalid query", _validation_details(exc)) from exc
+        except ValueError as exc:
+            raise self._query_error(exc) from exc
+
+    def list_bookings(self, request: HttpRequest) -> dict:
+        params = {key: values[0] for key, values in request.query.items()}
+        try:
+            return booking_core.find_bookings(
+                params.get("dog", ""),
+                params.get("phone", ""),
+                params.get("from", ""),
+                params.get("to", ""),
+                params.get("location", ""),
+            )
+        except ValueError as exc:
+            raise self._query_error(exc) from exc
+
+    def book(self, request: HttpRequest) -> dict:
+        try:
+            booking = BookingRequest.model_validate(_json_body(request))
+        except ValidationError as exc:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Invalid booking", _validation_details(exc)) from exc
+        try:
+            return booking_core.commit_booking(**booking.model_dump())
+        except ValueError as exc:
+            status = HTTPStatus.CONFLICT if isinstance(exc, booking_core.SlotFull) else HTTPStatus.UNPROCESSABLE_ENTITY
+            raise HttpError(status, str(exc)) from exc
+
+    def join_waitlist(self, request: HttpRequest) -> dict:
+        try:
+            booking = BookingRequest.model_validate(_json_body(request))
+        except ValidationError as exc:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Invalid booking", _validation_details(exc)) from exc
+        try:
+            return booking_core.enqueue_waitlist(**booking.model_dump())
+        except ValueError as exc:
+            raise HttpError(HTTPStatus.UNPROCESSABLE_ENTITY, str(exc)) from exc
+
+    def waiting(self, request: HttpRequest) -> dict:
+        params = {key: values[0] for key, values in request.query.items()}
+        if not params.get("date"):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Query parameter 'date' is required")
+        try:
+            partition = booking_core.partition_for(params.get("location", ""))
+        except ValueError as exc:
+            raise HttpError(HTTPStatus.NOT_FOUND, str(exc)) from exc
+        entries = partition.waitlist.waiting(params["date"], params.get("time"))
+        return {"waiting": [entry.to_dict() for entry in entries]}
+
+    def leave_waitlist(self, request: HttpRequest) -> dict:
+        entry_id = self._path_id(request, "/waitlist/")
+        try:
+            partition = booking_core.partition_for(request.query.get("location", [""])[0])
+            return partition.waitlist.remove(entry_id).to_dict()
+        except ValueError as exc:
+            raise HttpError(HTTPStatus.NOT_FOUND, str(exc)) from exc
+
+    def locations(self) -> dict:
+        return {
+            "default": booking_core.DEFAULT_LOCATION,
+            "locations": [
+                {
+                    "location_id": location_id,
+                    "name": partition.salon.name,
+                    "slot_times": list(partition.salon.slot_times),
+                    "open_weekdays": sorted(partition.salon.open_weekdays),
+                    "capacity_units": partition.salon.capacity_units,
+                    "services": partition.salon.services,
+                    "groomers": [
+                        {
+                            "groomer_id": groomer.groomer_id,
+                            "name": groomer.name,
+                            "sizes": sorted(groomer.sizes),
+                            "shifts": {str(weekday): list(shift) for weekday, shift in groomer.shifts.items()},
+                        }
+                        for groomer in partition.salon.groomers
+                    ],
+                }
+                for location_id, partition in booking_core.PARTITIONS.items()
+            ],
+        }
+
+    @staticmethod
+    def _path_id(request: HttpRequest, prefix: str) -> int:
+        raw = request.path.removeprefix(prefix)
+        if not raw.isdigit():
+            raise HttpError(HTTPStatus.NOT_FOUND, f"No route for {request.path}")
+        return int(raw)
+
+    @staticmethod
+    def _query_error(exc: ValueError) -> HttpError:
+        message = str(exc)
+        status = HTTPStatus.NOT_FOUND if message.startswith("Unknown location") else HTTPStatus.BAD_REQUEST
+        return HttpError(status, message)
+
+    @staticmethod
+    def _ledger_error(exc: ValueError) -> HttpError:
+        message = str(exc)
+        if message.startswith(("No booking", "Unknown location")):
+            return HttpError(HTTPStatus.NOT_FOUND, message)
+        status = HTTPStatus.CONFLICT if isinstance(exc, booking_core.SlotFull) else HTTPStatus.UNPROCESSABLE_ENTITY
+        return HttpError(status, message)
+
+    def cancel(self, request: HttpRequest) -> dict:
+        booking_id = self._path_id(request, "/bookings/")
+        phone = request.query.get("phone", [""])[0]
+        location = request.query.get("location", [""])[0]
+        try:
+            return booking_core.release_booking(booking_id, phone, location)
+        except ValueError as exc:
+            raise self._ledger_error(exc) from exc
+
+    def reschedule(self, request: HttpRequest) -> dict:
+        booking_id = self._path_id(request, "/bookings/")
+        payload = _json_body(request)
+        fields = {name: payload.get(name, "") for name in ("date", "time", "phone", "location")}
+        if not all(isinstance(value, str) for value in fields.values()) or not (fields["date"] and fields["time"]):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Fields 'date' and 'time' are required strings")
+        try:
+            return booking_core.move_booking(
+                booking_id, fields["date"], fields["time"], fields["phone"], fields["location"]
+            )
+        except ValueError as exc:
+            raise self._ledger_error(exc) from exc
+
+    async def chat(self, request: HttpRequest) -> tuple[Any, dict[str, str]]:
+        message = _json_body(request).get("message")
+        if not isinstance(message, str) or not message.strip():
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Field 'message' is required")
+        profile = request_profiling.header_requests_profile(request.headers)
+        try:
+            # The first /chat builds the workflow, loading the Agents SDK.
+            result = await self.workflow.run(message, profile=profile, cache=response_cache.CACHE)
+        except token_accounting.BudgetExceeded as exc:
+            raise HttpError(HTTPStatus.TOO_MANY_REQUESTS, str(exc)) from exc
+        except (RuntimeError, ValueError) as exc:
+            raise HttpError(HTTPStatus.UNPROCESSABLE_ENTITY, str(exc)) from exc
+        profile_id = request_profiling.current_profile_id()
+        headers = {"X-Profile-Id": profile_id} if profile_id else {}
+        headers["X-Cache"] = "hit" if getattr(result, "cached", False) else "miss"
+        output = result.final_output
+        if isinstance(output, str):
+            try:
+                return json.loads(output), headers
+            except json.JSONDecodeError:
+                return {"reply": output}, headers
+        return (output.model_dump() if hasattr(output, "model_dump") else output), headers
+
+
+# ============================================================================
+# Server
+# ============================================================================
+
+
+class BookingServer:
+    """Keep-alive HTTP server with a bounded request queue and graceful shutdown."""
+
+    def __init__(self, config: ServerConfig, service: Optional[BookingService] = None):
+        self.config = config
+        self.service = service or BookingService(config.export_dir)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=config.queue_size)
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._workers: list[asyncio.Task] = []
+        self._idle: set[asyncio.StreamWriter] = set()
+        self._connections: set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+        self._background: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.config.workers)]
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.config.host, self.config.port, limit=MAX_HEADER_BYTES
+        )
+        if self.config.verify_interval > 0:
+            self._background.append(
+                asyncio.create_task(self.service.verify_periodically(self.config.verify_interval))
+            )
+
+    @property
+    def port(self) -> int:
+        """The bound port (useful when configured with port 0)."""
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_until_stopped(self) -> None:
+        await self._stopping.wait()
+        await self._shutdown()
+
+    def stop(self) -> None:
+        """Request a graceful shutdown (safe to call from a signal handler)."""
+        self._stopping.set()
+
+    async def _shutdown(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+        try:
+            await asyncio.wait_for(self.queue.join(), self.config.drain_timeout)
+        except asyncio.TimeoutError:
+            pass
+        for writer in list(self._idle):
+            writer.close()
+        if self._connections:
+            # Let connections that were mid-request write their responses.
+            await asyncio.wait(set(self._connections), timeout=1.0)
+        for task in [*self._workers, *self._connections, *self._background]:
+            task.cancel()
+        await asyncio.gather(*self._workers, *self._connections, *self._background, return_exceptions=True)
+
+    async def _worker(self) -> None:
+        while True:
+            request, future = await self.queue.get()
+            try:
+                if not future.cancelled():
+                    future.set_result(await self.service.handle(request))
+            except Exception as exc:  # noqa: BLE001 - surfaced to the connection as a response
+                if not future.cancelled():
+                    future.set_exception(exc)
+            finally:
+                self.queue.task_done()
+
+    async def _dispatch(self, request: HttpRequest) -> tuple[HTTPStatus, Any, dict[str, str]]:
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((request, future))
+        except asyncio.QueueFull:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Server busy, retry shortly"}, {"Retry-After": "1"}
+        try:
+            status, payload, *headers = await future
+        except HttpError as exc:
+            return exc.status, exc.payload(), {}
+        except Exception:  # noqa: BLE001 - never leak internals to clients
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}, {}
+        return status, payload, headers[0] if headers else {}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while not self._stopping.is_set():
+                self._idle.add(writer)
+                try:
+                    request = await asyncio.wait_for(
+                        read_request(reader, self.config.max_body_bytes), self.config.keepalive_timeout
+                    )
+                except HttpError as exc:
+                    writer.write(render_response(exc.status, exc.payload(), keep_alive=False))
+                    await writer.drain()
+                    break
+                except (asyncio.TimeoutError, ConnectionError):
+                    break
+                finally:
+                    self._idle.discard(writer)
+                if request is None:
+                    break
+
+                status, payload, headers = await self._dispatch(request)
+                keep_alive = request.keep_alive and not self._stopping.is_set()
+                writer.write(render_response(status, payload, keep_alive, headers))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+
+async def serve(config: ServerConfig) -> None:
+    """Run the server until SIGINT/SIGTERM, then shut down gracefully."""
+    server = BookingServer(config)
+    await server.start()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, server.stop)
+        except NotImplementedError:  # Windows event loops lack signal handlers
+            pass
+    print(f"Smarter Dog booking service listening on http://{config.host}:{server.port}")
+    await server.serve_until_stopped()
+    print("Shut down cleanly.")
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Entry point for the booking service."""
+    defaults = ServerConfig()
+    parser = argparse.ArgumentParser(description="Smarter Dog booking HTTP service")
+    parser.add_argument("--host", default=defaults.host)
+    parser.add_argument("--port", type=int, default=defaults.port)
+    parser.add_argument("--workers", type=int, default=defaults.workers, help="Concurrent request handlers")
+    parser.add_argument("--queue-size", type=int, default=defaults.queue_size, help="Pending requests before 503")
+    parser.add_argument("--keepalive-timeout", type=float, default=defaults.keepalive_timeout)
+    parser.add_argument("--drain-timeout", type=float, default=defaults.drain_timeout)
+    parser.add_argument("--export-dir", help="Directory for POST /export (columnar ledger export)")
+    parser.add_argument(
+        "--verify-interval",
+        type=float,
+        default=defaults.verify_interval,
+        help="Seconds between ledger drift checks (0 disables)",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    asyncio.run(
+        serve(
+            ServerConfig(
+                host=args.host,
+                port=args.port,
+                workers=args.workers,
+                queue_size=args.queue_size,
+                keepalive_timeout=args.keepalive_timeout,
+                drain_timeout=args.drain_timeout,
+                export_dir=args.export_dir,
+                verify_interval=args.verify_interval,
+            )
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
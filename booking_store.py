@@ -0,0 +1,413 @@
+"""
+Booking record store with secondary indexes, one per salon location.
+
+Keeps every confirmed booking (dog, customer, phone, notes) rather than just
+the capacity units per slot, and answers "what is Luna booked for?" without
+scanning the spreadsheet.
+
+Indexes, all maintained under the store lock together with the records:
+- booking ID -> record
+- date -> booking IDs, plus a sorted list of dates for range queries
+  (bisect to the first date, then walk forward)
+- customer (normalised contact number) -> booking IDs
+- dog name (case-folded) -> booking IDs
+- ``units``: date -> slot -> capacity units in use. This is the ledger the
+  availability check reads (``booking_core.CURRENT_BOOKINGS`` is the default
+  location's), derived from the records: every change to a record updates it
+  in the same critical section, and ``verify()`` recomputes it from scratch.
+- ``rota``: date -> (groomer_id, slot) -> booking ID, for bookings assigned a
+  groomer (see ``groomers``), derived and verified the same way.
+- ``rollups``: unit-slots and bookings per day, week and month by dog size
+  (see ``utilization``), derived and verified the same way.
+- ``changed``: date -> ``sequence`` number of the day's latest change, so an
+  incremental export (``ledger_export``) can find the days changed since its
+  last run. Sequences restart with every store, so ``epoch`` (random per
+  store) tells an exporter whether its saved sequence still applies.
+
+A booking can cover several consecutive slots (a long service); it holds
+its units in every one of them, and claims or releases them all at once.
+
+Index values are sets, so cancelling or moving a booking is O(1) like
+adding one. Query results are sorted by date and time.
+"""
+
+from __future__ import annotations
+
+import bisect
+import copy
+import uuid
+from dataclasses import dataclass, field
+from threading import RLock
+from typing import Callable, Iterable, Optional, Sequence
+
+from customer_registry import normalize_phone
+from utilization import Rollups
+
+
+class SlotFull(ValueError):
+    """Raised when a booking cannot fit: no units to spare in a slot, or no groomer free for it."""
+
+
+@dataclass
+class BookingRecord:
+    """One confirmed booking."""
+
+    booking_id: int
+    dog_name: str
+    dog_size: str
+    date: str
+    time: str
+    customer_name: str
+    contact_number: str
+    units: int
+    notes: list[str] = field(default_factory=list)
+    location: str = ""
+    service: str = "standard"
+    slots: list[str] = field(default_factory=list)  # every slot covered, starting at ``time``
+    groomer: str = ""  # groomer_id, when the salon schedules groomers
+
+    def __post_init__(self) -> None:
+        if not self.slots:
+            self.slots = [self.time]
+
+    def to_dict(self, status: str = "Booked") -> dict:
+        """The booking in ``BookingResponse`` shape."""
+        return {
+            "booking_id": self.booking_id,
+            "dog_name": self.dog_name,
+            "dog_size": self.dog_size,
+            "date": self.date,
+            "time": self.time,
+            "customer": self.customer_name,
+            "phone": self.contact_number,
+            "status": status,
+            "notes": list(self.notes),
+            "location": self.location,
+            "service": self.service,
+            "slots": list(self.slots),
+            "groomer": self.groomer,
+        }
+
+
+class BookingStore:
+    """One location's booking records, their indexes and the derived per-slot units.
+
+    ``lock`` guards everything. Take it through the attribute on every use:
+    lock profiling swaps it in place.
+    """
+
+    def __init__(self, location_id: str = "") -> None:
+        self.location_id = location_id
+        self.lock = RLock()
+        self.units: dict[str, dict[str, int]] = {}
+        self.rota: dict[str, dict[tuple[str, str], int]] = {}
+        self.rollups = Rollups()
+        self.sequence = 0  # bumped by every change
+        self.epoch = uuid.uuid4().hex  # identifies this store's numbering of ``sequence``
+        self.changed: dict[str, int] = {}
+        self._records: dict[int, BookingRecord] = {}
+        self._next_id = 1
+        self._rebuild()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def reserve(
+        self,
+        dog_name: str,
+        dog_size: str,
+        date: str,
+        time: str,
+        customer_name: str,
+        contact_number: str,
+        units: int,
+        capacity: int,
+        notes: Iterable[str] = (),
+        service: str = "standard",
+        covered: Optional[Sequence[str]] = None,
+        staff: Optional[Callable[[list[str]], str]] = None,
+    ) -> BookingRecord:
+        """Store a booking if every slot it covers has ``units`` to spare under ``capacity``.
+
+        ``covered`` lists the consecutive slots a long service takes,
+        starting with ``time``; by default the booking takes ``time`` only.
+        ``staff(covered)``, called with the lock held once the capacity check
+        passes, returns the groomer to assign (it may ``reassign`` others to
+        free one, or raise if nobody can take the dog).
+
+        Raises:
+            SlotFull: If any covered slot is full
+            ValueError: From ``staff`` (nothing is stored either way)
+        """
+        covered = list(covered or [time])
+        with self.lock:
+            slots = self.units.get(date, {})
+            if any(slots.get(slot, 0) + units > capacity for slot in covered):
+                raise SlotFull("Requested slot is full; pick another time.")
+            groomer = staff(covered) if staff else ""
+            record = BookingRecord(
+                self._next_id,
+                dog_name,
+                dog_size,
+                date,
+                time,
+                customer_name,
+                contact_number,
+                units,
+                list(notes),
+                self.location_id,
+                service,
+                covered,
+                groomer,
+            )
+            self._next_id += 1
+            self._records[record.booking_id] = record
+            self._index(record)
+            self._claim(record)
+            return record
+
+    def cancel(self, booking_id: int) -> BookingRecord:
+        """Remove a booking and release its units.
+
+        Raises:
+            ValueError: If there is no such booking
+        """
+        with self.lock:
+            record = self._records.pop(booking_id, None)
+            if record is None:
+                raise ValueError(f"No booking with ID {booking_id}.")
+            self._unindex(record)
+            self._release(record)
+            return record
+
+    def move(
+        self,
+        booking_id: int,
+        date: str,
+        time: str,
+        capacity: int,
+        notes: Iterable[str] = (),
+        covered: Optional[Sequence[str]] = None,
+        staff: Optional[Callable[[list[str]], str]] = None,
+    ) -> BookingRecord:
+        """Move a booking to other slots in one step.
+
+        Claiming the new slots and releasing the old ones happen in a single
+        critical section, so no reader sees the booking counted twice or not
+        at all. The new slots may overlap the old ones (a long service moved
+        by half an hour). Moving to the slots it already has only replaces
+        the notes. ``staff`` picks the groomer for the new slots, as for
+        ``reserve``; it should treat the booking's own rota entries as free.
+
+        Raises:
+            SlotFull: If a new slot is full (the booking is left where it was)
+            ValueError: If there is no such booking, or from ``staff``
+        """
+        covered = list(covered or [time])
+        with self.lock:
+            record = self._records.get(booking_id)
+            if record is None:
+                raise ValueError(f"No booking with ID {booking_id}.")
+            if (record.date, record.slots) != (date, covered):
+                slots = self.units.get(date, {})
+                own = set(record.slots) if record.date == date else set()
+                for slot in covered:
+                    used = slots.get(slot, 0) - (record.units if slot in own else 0)
+                    if used + record.units > capacity:
+                        raise SlotFull("Requested slot is full; pick another time.")
+                groomer = staff(covered) if staff else record.groomer
+                self._release(record)
+                if record.date != date:
+                    self._unindex(record)
+                    record.date = date
+                    self._index(record)
+                record.time, record.slots, record.groomer = covered[0], covered, groomer
+                self._claim(record)
+            record.notes = list(notes)
+            self._touch(record.date)
+            return record
+
+    def reassign(self, booking_id: int, groomer: str) -> BookingRecord:
+        """Hand a booking to another groomer; the caller checks they are free.
+
+        Raises:
+            ValueError: If there is no such booking
+        """
+        with self.lock:
+            record = self._records.get(booking_id)
+            if record is None:
+                raise ValueError(f"No booking with ID {booking_id}.")
+            self._release(record)
+            record.groomer = groomer
+            self._claim(record)
+            return record
+
+    def _touch(self, date: str) -> None:
+        self.sequence += 1
+        self.changed[date] = self.sequence
+
+    def _claim(self, record: BookingRecord) -> None:
+        self._touch(record.date)
+        self.rollups.apply(record, 1)
+        slots = self.units.setdefault(record.date, {})
+        for slot in record.slots:
+            slots[slot] = slots.get(slot, 0) + record.units
+        if record.groomer:
+            rota = self.rota.setdefault(record.date, {})
+            for slot in record.slots:
+                rota[(record.groomer, slot)] = record.booking_id
+
+    def _release(self, record: BookingRecord) -> None:
+        self._touch(record.date)
+        self.rollups.apply(record, -1)
+        slots = self.units[record.date]
+        for slot in record.slots:
+            remaining = slots[slot] - record.units
+            if remaining:
+                slots[slot] = remaining
+            else:
+                del slots[slot]
+        if not slots:
+            del self.units[record.date]
+        if record.groomer:
+            rota = self.rota[record.date]
+            for slot in record.slots:
+                del rota[(record.groomer, slot)]
+            if not rota:
+                del self.rota[record.date]
+
+    def _unindex(self, record: BookingRecord) -> None:
+        # Emptied date sets stay, and their date stays in the sorted list; range scans skip them.
+        self._by_date[record.date].discard(record.booking_id)
+        phone_key = normalize_phone(record.contact_number)
+        if phone_key:
+            self._discard(self._by_customer, phone_key, record.booking_id)
+        self._discard(self._by_dog, record.dog_name.casefold(), record.booking_id)
+
+    @staticmethod
+    def _discard(index: dict[str, set[int]], key: str, booking_id: int) -> None:
+        ids = index[key]
+        ids.discard(booking_id)
+        if not ids:
+            del index[key]
+
+    def _index(self, record: BookingRecord) -> None:
+        ids = self._by_date.get(record.date)
+        if ids is None:
+            ids = self._by_date[record.date] = set()
+            bisect.insort(self._dates, record.date)
+        ids.add(record.booking_id)
+        phone_key = normalize_phone(record.contact_number)
+        if phone_key:
+            self._by_customer.setdefault(phone_key, set()).add(record.booking_id)
+        self._by_dog.setdefault(record.dog_name.casefold(), set()).add(record.booking_id)
+
+    def _rebuild(self) -> None:
+        """Recompute every index and the units from the records."""
+        self._by_date: dict[str, set[int]] = {}
+        self._dates: list[str] = []
+        self._by_customer: dict[str, set[int]] = {}
+        self._by_dog: dict[str, set[int]] = {}
+        self.units.clear()
+        self.rota.clear()
+        self.rollups.clear()
+        for record in self._records.values():
+            self._index(record)
+            self._claim(record)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def get(self, booking_id: int) -> Optional[BookingRecord]:
+        return self._records.get(booking_id)
+
+    def _sorted(self, ids: Iterable[int]) -> list[BookingRecord]:
+        records = [self._records[booking_id] for booking_id in ids]
+        records.sort(key=lambda record: (record.date, record.time, record.booking_id))
+        return records
+
+    def on_date(self, date: str) -> list[BookingRecord]:
+        with self.lock:
+            return self._sorted(self._by_date.get(date, ()))
+
+    def between(self, start: str, end: str) -> list[BookingRecord]:
+        """Bookings dated ``start`` to ``end`` inclusive (ISO dates)."""
+        with self.lock:
+            ids: list[int] = []
+            for index in range(bisect.bisect_left(self._dates, start), len(self._dates)):
+                day = self._dates[index]
+                if day > end:
+                    break
+                ids.extend(self._by_date[day])
+            return self._sorted(ids)
+
+    def for_customer(self, contact_number: str) -> list[BookingRecord]:
+        with self.lock:
+            return self._sorted(self._by_customer.get(normalize_phone(contact_number), ()))
+
+    def for_dog(self, dog_name: str) -> list[BookingRecord]:
+        with self.lock:
+            return self._sorted(self._by_dog.get(dog_name.casefold(), ()))
+
+    def changed_since(self, sequence: int) -> tuple[int, list[str]]:
+        """The current ``sequence`` and the dates changed after ``sequence``, in order."""
+        with self.lock:
+            return self.sequence, sorted(day for day, changed in self.changed.items() if changed > sequence)
+
+    # ------------------------------------------------------------------
+    # Consistency and test support
+    # ------------------------------------------------------------------
+
+    def verify(self) -> list[str]:
+        """Compare the units ledger, rota and rollups with ones recomputed from the records; returns the differences."""
+        problems = []
+        with self.lock:
+            expected: dict[tuple[str, str], int] = {}
+            expected_rota: dict[tuple[str, str, str], int] = {}
+            for record in self._records.values():
+                for slot in record.slots:
+                    key = (record.date, slot)
+                    expected[key] = expected.get(key, 0) + record.units
+                    if record.groomer:
+                        holder = expected_rota.setdefault((record.date, record.groomer, slot), record.booking_id)
+                        if holder != record.booking_id:
+                            problems.append(
+                                f"{record.date} {slot}: groomer {record.groomer} "
+                                f"has bookings {holder} and {record.booking_id}"
+                            )
+            actual = {(day, slot): used for day, slots in self.units.items() for slot, used in slots.items() if used}
+            problems.extend(self.rollups.diff(self._records.values()))
+            actual_rota = {
+                (day, *key): booking_id for day, rota in self.rota.items() for key, booking_id in rota.items()
+            }
+        problems.extend(
+            f"{day} {slot}: ledger has {actual.get((day, slot), 0)} units, records add up to {expected.get((day, slot), 0)}"
+            for day, slot in sorted(set(expected) | set(actual))
+            if expected.get((day, slot), 0) != actual.get((day, slot), 0)
+        )
+        problems.extend(
+            f"{day} {slot}: rota gives groomer {groomer} booking {actual_rota.get((day, groomer, slot))}, "
+            f"records say {expected_rota.get((day, groomer, slot))}"
+            for day, groomer, slot in sorted(set(expected_rota) | set(actual_rota))
+            if expected_rota.get((day, groomer, slot)) != actual_rota.get((day, groomer, slot))
+        )
+        return problems
+
+    def snapshot(self) -> tuple[dict[int, BookingRecord], int]:
+        with self.lock:
+            return copy.deepcopy(self._records), self._next_id
+
+    def restore(self, snapshot: tuple[dict[int, BookingRecord], int]) -> None:
+        """Return to a ``snapshot()``; ``units`` is refilled in place, so aliases stay valid."""
+        records, next_id = snapshot
+        with self.lock:
+            for record in [*self._records.values(), *records.values()]:
+                self._touch(record.date)
+            self._records = copy.deepcopy(records)
+            self._next_id = next_id
+            self._rebuild()
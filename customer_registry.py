@@ -0,0 +1,147 @@
+"""
+Customer and dog registry for returning customers.
+
+Every confirmed booking upserts its customer and dog here, so a returning
+customer can be recognised from a phone number (or name) and booked with a
+single confirmation instead of restating every detail.
+
+Indexes:
+- primary: normalised contact number -> customer (a dict, so O(1) at any
+  size)
+- secondary: normalised customer name -> contact numbers, since several
+  customers can share a name
+
+Phone numbers are normalised to their digits, with an international
+``+44`` / ``0044`` prefix folded into the national leading ``0``, so
+"+44 7700 900123", "07700 900123" and "07700-900-123" are one customer.
+Names are case-folded with whitespace collapsed.
+
+The registry is in memory, like the booking ledger. Its lock is registered
+with ``lock_profiling`` as ``customers``.
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+import lock_profiling
+
+
+def normalize_phone(raw: str) -> str:
+    """Reduce a phone number to the digits that identify it."""
+    digits = "".join(char for char in raw if char.isdigit())
+    if raw.lstrip().startswith("+44"):
+        return "0" + digits[2:]
+    if digits.startswith("0044"):
+        return "0" + digits[4:]
+    return digits
+
+
+def normalize_name(name: str) -> str:
+    return " ".join(name.casefold().split())
+
+
+@dataclass
+class Dog:
+    name: str
+    size: str
+
+
+@dataclass
+class Customer:
+    """A customer, their dogs and a short booking history."""
+
+    customer_id: int
+    name: str
+    phone: str
+    dogs: dict[str, Dog] = field(default_factory=dict)  # keyed by case-folded dog name
+    bookings: int = 0
+    last_booking: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "customer_name": self.name,
+            "contact_number": self.phone,
+            "dogs": [{"dog_name": dog.name, "dog_size": dog.size} for dog in self.dogs.values()],
+            "bookings": self.bookings,
+            "last_booking": self.last_booking,
+        }
+
+
+class CustomerRegistry:
+    """Thread-safe customer store indexed by phone and by name."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._by_phone: dict[str, Customer] = {}
+        self._by_name: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_phone)
+
+    def record_booking(
+        self, customer_name: str, contact_number: str, dog_name: str, dog_size: str, booked_date: str
+    ) -> Optional[Customer]:
+        """Add or update the customer behind a confirmed booking.
+
+        Returns None (and stores nothing) when the contact number has no
+        digits, since such a customer could never be looked up again.
+        """
+        phone_key = normalize_phone(contact_number)
+        if not phone_key:
+            return None
+        name_key = normalize_name(customer_name)
+        with self._lock:
+            customer = self._by_phone.get(phone_key)
+            if customer is None:
+                customer = Customer(len(self._by_phone), customer_name, contact_number)
+                self._by_phone[phone_key] = customer
+                self._by_name.setdefault(name_key, set()).add(phone_key)
+            elif normalize_name(customer.name) != name_key:
+                # The latest booking's name wins; move the name index entry with it.
+                old_key = normalize_name(customer.name)
+                self._by_name[old_key].discard(phone_key)
+                if not self._by_name[old_key]:
+                    del self._by_name[old_key]
+                self._by_name.setdefault(name_key, set()).add(phone_key)
+                customer.name = customer_name
+            customer.dogs[dog_name.casefold()] = Dog(dog_name, dog_size)
+            customer.bookings += 1
+            if customer.last_booking is None or booked_date > customer.last_booking:
+                customer.last_booking = booked_date
+            return customer
+
+    def lookup(self, contact_number: str = "", customer_name: str = "") -> list[dict]:
+        """Customers matching a phone number, else a name; snapshots safe to serialise."""
+        with self._lock:
+            if contact_number:
+                customer = self._by_phone.get(normalize_phone(contact_number))
+                matches = [customer] if customer else []
+            elif customer_name:
+                keys = self._by_name.get(normalize_name(customer_name), ())
+                matches = [self._by_phone[key] for key in sorted(keys)]
+            else:
+                matches = []
+            return [customer.to_dict() for customer in matches]
+
+    def snapshot(self) -> tuple[dict[str, Customer], dict[str, set[str]]]:
+        with self._lock:
+            return copy.deepcopy((self._by_phone, self._by_name))
+
+    def restore(self, snapshot: tuple[dict[str, Customer], dict[str, set[str]]]) -> None:
+        """Return to a ``snapshot()``."""
+        by_phone, by_name = copy.deepcopy(snapshot)
+        with self._lock:
+            self._by_phone, self._by_name = by_phone, by_name
+
+    def reset(self) -> None:
+        with self._lock:
+            self._by_phone.clear()
+            self._by_name.clear()
+
+
+CUSTOMERS = CustomerRegistry()
+lock_profiling.register(CUSTOMERS, "_lock", "customers")
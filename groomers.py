@@ -0,0 +1,180 @@
+"""
+Groomers, their shifts and skills, and the assignment of dogs to them.
+
+``CAPACITY_UNITS`` bounds how many dogs fit in a slot; the groomers decide
+who takes each one. A salon lists its groomers (``locations.Salon.groomers``),
+each with the dog sizes they handle and optional weekly shifts, and every
+booking is assigned one groomer for all the slots it covers.
+
+Assignment runs inside the booking transaction, so it has to be cheap:
+- greedy: of the qualified groomers on shift and free for every covered
+  slot, take the least loaded that day, preferring the one with the fewest
+  skills so all-rounders stay free for the dogs only they can take
+- local repair: when no qualified groomer is free, try to free one by
+  handing each booking in their way to another groomer who can take it,
+  who may in turn hand one of theirs on (an augmenting path, searched
+  depth first up to ``REPAIR_DEPTH`` hand-overs deep and at most
+  ``REPAIR_BUDGET`` hand-overs tried, so a hopeless search gives up fast)
+
+Both steps read the day's rota, ``(groomer_id, slot) -> booking_id``, which
+``booking_store`` keeps next to the capacity units. With a handful of
+groomers and ~10 slots a day an assignment costs a few microseconds.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional, Sequence
+
+from booking_store import BookingRecord
+
+# A day's rota: (groomer_id, slot) -> booking_id of the dog they are grooming.
+Rota = dict[tuple[str, str], int]
+
+# Longest chain of hand-overs local repair tries, and how many it tries in all per assignment.
+REPAIR_DEPTH = 3
+REPAIR_BUDGET = 48
+
+
+@dataclass(frozen=True)
+class Groomer:
+    """A groomer, the dog sizes they handle and when they work."""
+
+    groomer_id: str
+    name: str
+    sizes: frozenset[str]
+    # Weekday -> (first slot, end) of the shift; they take slots starting in [first, end).
+    # Empty means every slot of every day the salon is open.
+    shifts: dict[int, tuple[str, str]] = field(default_factory=dict, hash=False)
+
+    def can_take(self, dog_size: str, weekday: int, covered: Sequence[str]) -> bool:
+        """Whether they handle ``dog_size`` and are on shift for every covered slot."""
+        if dog_size not in self.sizes:
+            return False
+        if not self.shifts:
+            return True
+        shift = self.shifts.get(weekday)
+        return shift is not None and shift[0] <= covered[0] and covered[-1] < shift[1]
+
+
+@dataclass(frozen=True)
+class Assignment:
+    """The groomer for a new booking, and the existing bookings handed to others to free them."""
+
+    groomer_id: str
+    repairs: tuple[tuple[int, str], ...] = ()  # (booking_id, new groomer_id), in the order to apply them
+
+
+def groomer_from_dict(raw: dict) -> Groomer:
+    """Build a groomer from its JSON form, e.g.
+    ``{"groomer_id": "amy", "name": "Amy", "sizes": ["small", "medium"], "shifts": {"0": ["08:30", "11:00"]}}``.
+
+    Raises:
+        ValueError: If the entry has no groomer_id or sizes, or a malformed shift
+    """
+    if not raw.get("groomer_id") or not raw.get("sizes"):
+        raise ValueError("Every groomer needs a groomer_id and the dog sizes they handle")
+    shifts = {}
+    for weekday, window in raw.get("shifts", {}).items():
+        if int(weekday) not in range(7) or len(window) != 2 or window[0] >= window[1]:
+            raise ValueError(f"{raw['groomer_id']}: shifts map a weekday (0-6) to [first slot, end]")
+        shifts[int(weekday)] = (window[0], window[1])
+    return Groomer(raw["groomer_id"], raw.get("name", raw["groomer_id"]), frozenset(raw["sizes"]), shifts)
+
+
+def assign(
+    groomers: Iterable[Groomer],
+    rota: Rota,
+    dog_size: str,
+    weekday: int,
+    covered: Sequence[str],
+    booked: Callable[[int], BookingRecord],
+    ignore: Optional[int] = None,
+) -> Optional[Assignment]:
+    """Pick a groomer for a dog taking ``covered`` slots; None if nobody can be freed.
+
+    ``booked`` looks up the bookings on the rota; ``ignore`` is a booking
+    whose own rota entries count as free for the dog being placed (one being
+    moved). They are never offered to a handed-over booking: the move
+    releases them after the repairs are applied.
+    """
+    groomers = list(groomers)
+    overlay: dict[tuple[str, str], Optional[int]] = {}  # hand-overs tried so far
+    budget = REPAIR_BUDGET
+
+    def holder(groomer_id: str, slot: str, moving_free: bool = True) -> Optional[int]:
+        key = (groomer_id, slot)
+        booking_id = overlay[key] if key in overlay else rota.get(key)
+        return None if moving_free and booking_id == ignore else booking_id
+
+    def free_up(groomer: Groomer, slots: Sequence[str], depth: int, chain: frozenset[str]) -> Optional[list]:
+        """Hand the bookings holding ``groomer`` in ``slots`` to others; the hand-overs, innermost first."""
+        nonlocal budget
+        repairs: list[tuple[int, str]] = []
+        for booking_id in sorted({holder(groomer.groomer_id, slot) for slot in slots} - {None}):
+            record = booked(booking_id)
+            for other in groomers:
+                if other.groomer_id in chain or not other.can_take(record.dog_size, weekday, record.slots):
+                    continue
+                if ignore is not None and any(
+                    holder(other.groomer_id, slot, moving_free=False) == ignore for slot in record.slots
+                ):
+                    continue
+                if budget <= 0:
+                    return None
+                budget -= 1
+                saved = dict(overlay)
+                if any(holder(other.groomer_id, slot) is not None for slot in record.slots):
+                    deeper = free_up(other, record.slots, depth - 1, chain | {other.groomer_id}) if depth else None
+                    if deeper is None:
+                        overlay.clear()
+                        overlay.update(saved)
+                        continue
+                    repairs.extend(deeper)
+                for slot in record.slots:
+                    overlay[(groomer.groomer_id, slot)] = None
+                    overlay[(other.groomer_id, slot)] = booking_id
+                repairs.append((booking_id, other.groomer_id))
+                break
+            else:
+                return None
+        return repairs
+
+    qualified = [groomer for groomer in groomers if groomer.can_take(dog_size, weekday, covered)]
+    free = [groomer for groomer in qualified if all(holder(groomer.groomer_id, slot) is None for slot in covered)]
+    if len(free) == 1:
+        return Assignment(free[0].groomer_id)
+    load = Counter(groomer_id for groomer_id, _ in rota)
+
+    def rank(groomer: Groomer) -> tuple:
+        return load[groomer.groomer_id], len(groomer.sizes), groomer.groomer_id
+
+    if free:
+        return Assignment(min(free, key=rank).groomer_id)
+    qualified.sort(key=rank)
+
+    # Local repair: free a qualified groomer by handing the bookings in the way to others.
+    for groomer in qualified:
+        overlay.clear()
+        repairs = free_up(groomer, covered, REPAIR_DEPTH - 1, frozenset({groomer.groomer_id}))
+        if repairs is not None:
+            return Assignment(groomer.groomer_id, tuple(repairs))
+    return None
+
+
+def can_assign(
+    groomers: Iterable[Groomer],
+    rota: Rota,
+    dog_size: str,
+    weekday: int,
+    covered: Sequence[str],
+    booked: Callable[[int], BookingRecord],
+) -> bool:
+    """Whether ``assign`` would find a groomer; cheaper when someone is simply free."""
+    for groomer in groomers:
+        if groomer.can_take(dog_size, weekday, covered) and all(
+            (groomer.groomer_id, slot) not in rota for slot in covered
+        ):
+            return True
+    return assign(groomers, rota, dog_size, weekday, covered, booked) is not None
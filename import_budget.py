@@ -0,0 +1,109 @@
+"""
+Cold-start import budget for the worker entry points.
+
+Imports each module in a fresh interpreter under ``python -X importtime``
+and checks two things:
+- the module's cumulative import time (best of ``--runs`` cold starts, to
+  ride out scheduler noise) stays under its budget
+- none of its forbidden modules were imported: the calendar/ledger core must
+  not pull in the Agents SDK, the stub or Pydantic, and the service and batch
+  entry points must not load the agent workflow until a request needs it
+  (nor the service pyarrow, until an export runs)
+
+Budgets are deliberately loose multiples of what a dev laptop measures; the
+forbidden-module check is what catches a stray top-level import.
+
+Exits non-zero when any check fails, so it can run as a CI step.
+
+Usage:
+    python import_budget.py
+    python import_budget.py booking_core --budget-ms 40 --runs 9
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Optional
+
+AGENT_MODULES = ("smarter_dog_refactored", "agents", "agents_stub", "openai")
+
+
+@dataclass(frozen=True)
+class ImportBudget:
+    module: str
+    budget_ms: float
+    forbidden: tuple[str, ...]
+
+
+BUDGETS = {
+    budget.module: budget
+    for budget in (
+        ImportBudget("booking_core", 75.0, (*AGENT_MODULES, "pydantic", "asyncio")),
+        ImportBudget("booking_server", 350.0, (*AGENT_MODULES, "pyarrow")),
+        ImportBudget("batch_bookings", 350.0, AGENT_MODULES),
+    )
+}
+
+
+def measure(module: str) -> tuple[float, set[str]]:
+    """Import ``module`` in a fresh interpreter; return its cumulative ms and every module imported."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        check=True,
+    )
+    cumulative_us = None
+    imported = set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        imported.add(name)
+        if name == module:
+            cumulative_us = int(cumulative)
+    if cumulative_us is None:
+        raise RuntimeError(f"{module} did not show up in -X importtime output")
+    return cumulative_us / 1000, imported
+
+
+def check(budget: ImportBudget, runs: int) -> tuple[float, list[str]]:
+    """Best cumulative import time over ``runs`` cold starts, and the forbidden modules seen."""
+    best = float("inf")
+    seen: set[str] = set()
+    for _ in range(runs):
+        elapsed, imported = measure(budget.module)
+        best = min(best, elapsed)
+        seen |= imported
+    leaked = sorted(name for name in seen if name.split(".")[0] in budget.forbidden)
+    return best, leaked
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check cold-start import time of the worker entry points.")
+    parser.add_argument("modules", nargs="*", help=f"Modules to check (default: {', '.join(BUDGETS)})")
+    parser.add_argument("--budget-ms", type=float, help="Override the budget of every checked module")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts per module; the best one counts")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for module in args.modules or list(BUDGETS):
+        budget = BUDGETS.get(module, ImportBudget(module, 100.0, ()))
+        limit = args.budget_ms if args.budget_ms is not None else budget.budget_ms
+        elapsed, leaked = check(budget, args.runs)
+        ok = elapsed <= limit and not leaked
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {module:<20} {elapsed:8.1f} ms (budget {limit:.0f} ms)")
+        if leaked:
+            print(f"     imports forbidden modules: {', '.join(leaked)}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""
+Columnar export of the booking ledger for analytics.
+
+Writes every location's booking records and capacity grid as Parquet (or
+Arrow IPC) files, partitioned Hive-style by location and month, so analysts
+can load them with pandas, DuckDB or Spark instead of scraping the sheet::
+
+    <out>/bookings/location=main/month=2024-07/part-000003.parquet
+    <out>/capacity/location=main/month=2024-07/part-000003.parquet
+
+- bookings: one row per booking (ID, date, time, dog, service, covered
+  slots, units, groomer, customer, notes)
+- capacity: one row per slot of every exported day, zeros included, with
+  the units in use, the salon's capacity and how many groomers are busy
+
+Exports are incremental. Each booking store numbers its changes and keeps
+the latest one per day; the state file ``<out>/_export_state.json`` records
+the run number and, per location, the change number exported up to and the
+store's ``epoch``. Change numbers restart with the process, so a location
+whose epoch differs (the service restarted) is exported in full. A run
+writes only the days changed since, each one whole: all of its bookings and
+its full capacity grid, so a day whose bookings were all cancelled still
+shows up (as zero units). Every row carries its ``export_run``, and a day's
+current state is in the newest run whose capacity rows include it; readers
+keep, per (location, date), the rows of the highest ``export_run``.
+``full=True`` re-exports every day.
+
+Memory stays flat: rows are built ``chunk_days`` days at a time and written
+as one record batch before the next chunk is read. Each day is read under its
+store's lock, so it is internally consistent; days changed while the export
+runs are picked up by the next run. Part files are written under a temporary
+name and renamed when complete, and the state is saved last, so a failed run
+leaves the previous state and is simply repeated by the next one. Runs in
+one process are serialised, so concurrent requests never share a run number
+or overwrite each other's state.
+
+pyarrow is optional and only imported by ``export``, so the service starts
+without it.
+
+Usage (the ledger lives in the serving process):
+    python booking_server.py --export-dir exports/
+    python ledger_export.py --server http://127.0.0.1:8080
+    python ledger_export.py --server http://127.0.0.1:8080 --format arrow --full
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import urllib.error
+import urllib.request
+from collections import Counter
+from datetime import date
+from itertools import groupby
+from typing import Any, Iterable, Optional
+
+import booking_core
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+STATE_FILE = "_export_state.json"
+
+_EXPORT_LOCK = threading.Lock()  # one run at a time: each reads and replaces the state file
+
+
+def _arrow() -> Any:
+    """Import pyarrow on first use.
+
+    Raises:
+        RuntimeError: If pyarrow is not installed
+    """
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as exc:
+        raise RuntimeError("Columnar export needs pyarrow: pip install pyarrow") from exc
+    return pyarrow
+
+
+def _schemas(pa: Any) -> dict[str, Any]:
+    return {
+        "bookings": pa.schema(
+            [
+                ("location", pa.string()),
+                ("export_run", pa.int64()),
+                ("booking_id", pa.int64()),
+                ("date", pa.date32()),
+                ("time", pa.string()),
+                ("dog_name", pa.string()),
+                ("dog_size", pa.string()),
+                ("service", pa.string()),
+                ("slots", pa.list_(pa.string())),
+                ("units", pa.int32()),
+                ("groomer", pa.string()),
+                ("customer_name", pa.string()),
+                ("contact_number", pa.string()),
+                ("notes", pa.list_(pa.string())),
+            ]
+        ),
+        "capacity": pa.schema(
+            [
+                ("location", pa.string()),
+                ("export_run", pa.int64()),
+                ("date", pa.date32()),
+                ("slot", pa.string()),
+                ("units_used", pa.int32()),
+                ("capacity_units", pa.int32()),
+                ("groomers_busy", pa.int32()),
+            ]
+        ),
+    }
+
+
+def read_state(out_dir: str) -> dict:
+    """The export state of ``out_dir`` (a fresh one if it has never been exported to)."""
+    try:
+        with open(os.path.join(out_dir, STATE_FILE), encoding="utf-8") as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return {"run": 0, "format": None, "locations": {}, "epochs": {}}
+
+
+def write_state(out_dir: str, state: dict) -> None:
+    """Atomically replace the state file."""
+    path = os.path.join(out_dir, STATE_FILE)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as handle:
+        json.dump(state, handle, indent=2)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temporary, path)
+
+
+def _day_rows(partition: booking_core.Partition, day: str, run: int) -> tuple[list[dict], list[dict]]:
+    """One day's booking and capacity rows, read under the store lock."""
+    store, salon = partition.store, partition.salon
+    location, when = salon.location_id, date.fromisoformat(day)
+    with store.lock:
+        bookings = [
+            {
+                "location": location,
+                "export_run": run,
+                "booking_id": record.booking_id,
+                "date": when,
+                "time": record.time,
+                "dog_name": record.dog_name,
+                "dog_size": record.dog_size,
+                "service": record.service,
+                "slots": list(record.slots),
+                "units": record.units,
+                "groomer": record.groomer,
+                "customer_name": record.customer_name,
+                "contact_number": record.contact_number,
+                "notes": list(record.notes),
+            }
+            for record in store.on_date(day)
+        ]
+        used = store.units.get(day, {})
+        busy = Counter(slot for _, slot in store.rota.get(day, {}))
+        capacity = [
+            {
+                "location": location,
+                "export_run": run,
+                "date": when,
+                "slot": slot,
+                "units_used": used.get(slot, 0),
+                "capacity_units": salon.capacity_units,
+                "groomers_busy": busy[slot],
+            }
+            for slot in salon.slot_times
+        ]
+    return bookings, capacity
+
+
+class _PartWriter:
+    """Streams record batches into one part file, renamed into place on ``close``."""
+
+    def __init__(self, pa: Any, fmt: str, path: str, schema: Any) -> None:
+        self.pa, self.path, self.schema = pa, path, schema
+        self.temporary = f"{path}.tmp"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if fmt == "parquet":
+            self._writer = pa.parquet.ParquetWriter(self.temporary, schema, compression="zstd")
+            self._sink = None
+        else:
+            self._sink = pa.OSFile(self.temporary, "wb")
+            self._writer = pa.ipc.new_file(self._sink, schema)
+        self.rows = 0
+
+    def write(self, rows: list[dict]) -> None:
+        if rows:
+            self._writer.write_batch(self.pa.RecordBatch.from_pylist(rows, schema=self.schema))
+            self.rows += len(rows)
+
+    def close(self) -> None:
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+        os.replace(self.temporary, self.path)
+
+
+def _part_path(out_dir: str, table: str, location: str, month: str, run: int, fmt: str) -> str:
+    return os.path.join(out_dir, table, f"location={location}", f"month={month}", f"part-{run:06d}{FORMATS[fmt]}")
+
+
+def _chunks(days: Iterable[str], size: int) -> Iterable[list[str]]:
+    chunk: list[str] = []
+    for day in days:
+        chunk.append(day)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def export(out_dir: str, fmt: str = "parquet", full: bool = False, chunk_days: int = 7) -> dict:
+    """Export the days changed since the last run into ``out_dir``; returns a summary.
+
+    Raises:
+        ValueError: If the format is unknown, or differs from earlier runs
+            into ``out_dir`` without ``full``
+        RuntimeError: If pyarrow is not installed
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; choose one of: {', '.join(FORMATS)}")
+    with _EXPORT_LOCK:
+        return _export(out_dir, fmt, full, chunk_days)
+
+
+def _export(out_dir: str, fmt: str, full: bool, chunk_days: int) -> dict:
+    state = read_state(out_dir)
+    if state["format"] not in (None, fmt) and not full:
+        raise ValueError(f"{out_dir} holds a {state['format']} export; pass full to switch formats")
+    pa = _arrow()
+    schemas = _schemas(pa)
+    os.makedirs(out_dir, exist_ok=True)
+    run = state["run"] + 1
+    summary = {"run": run, "format": fmt, "days": 0, "bookings": 0, "files": []}
+    sequences = dict(state["locations"]) if not full else {}
+    epochs = dict(state.get("epochs", {}))
+
+    for location, partition in list(booking_core.PARTITIONS.items()):
+        store = partition.store
+        if epochs.get(location) != store.epoch:
+            sequences.pop(location, None)  # a different store numbered those changes: export it all
+        sequence, days = store.changed_since(sequences.get(location, 0))
+        for month, month_days in groupby(days, key=lambda day: day[:7]):
+            writers = {
+                table: _PartWriter(pa, fmt, _part_path(out_dir, table, location, month, run, fmt), schema)
+                for table, schema in schemas.items()
+            }
+            for chunk in _chunks(month_days, chunk_days):
+                bookings: list[dict] = []
+                capacity: list[dict] = []
+                for day in chunk:
+                    day_bookings, day_capacity = _day_rows(partition, day, run)
+                    bookings.extend(day_bookings)
+                    capacity.extend(day_capacity)
+                writers["bookings"].write(bookings)
+                writers["capacity"].write(capacity)
+                summary["days"] += len(chunk)
+            for writer in writers.values():
+                writer.close()
+                summary["files"].append(os.path.relpath(writer.path, out_dir))
+            summary["bookings"] += writers["bookings"].rows
+        sequences[location] = sequence
+        epochs[location] = store.epoch
+
+    write_state(out_dir, {"run": run, "format": fmt, "locations": sequences, "epochs": epochs})
+    return summary
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Ask a running booking service to export its ledger."""
+    parser = argparse.ArgumentParser(description="Export the booking ledger as Parquet or Arrow IPC files.")
+    parser.add_argument("--server", default="http://127.0.0.1:8080", help="Booking service started with --export-dir")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="parquet")
+    parser.add_argument("--full", action="store_true", help="Re-export every day, not just the changed ones")
+    args = parser.parse_args(argv)
+
+    body = json.dumps({"format": args.format, "full": args.full}).encode()
+    request = urllib.request.Request(
+        f"{args.server.rstrip('/')}/export", data=body, headers={"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            summary = json.load(response)
+    except urllib.error.HTTPError as exc:
+        print(f"Export failed: {exc.code} {exc.read().decode(errors='replace')}", file=sys.stderr)
+        return 1
+    print(
+        f"Run {summary['run']}: {summary['days']} day(s), {summary['bookings']} booking(s), "
+        f"{len(summary['files'])} file(s) as {summary['format']}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,404 @@
+"""
+Concurrent load harness for the Smarter Dog booking workflow.
+
+Drives many ``Runner.run`` calls against the grooming agent and reports how the
+system holds up:
+- Throughput (completed runs per second)
+- p50/p95/p99 end-to-end latency
+- Tool-call counts per tool, collected through ``RunHooks``
+- Ledger conflict rate (runs that lost a slot to capacity limits)
+- With ``--stream``, time to first event separately from total run time
+- With ``--lock-profile``, ledger lock waits, holds and top call sites
+- Model turns, tokens and cost per successful booking (``token_accounting``)
+
+Two scheduling modes are supported:
+- closed: a fixed pool of workers, each sending its next request as soon as
+  the previous one completes (measures capacity)
+- open: requests arrive on a Poisson schedule at a fixed rate regardless of
+  completions; latency includes time spent queued behind the concurrency
+  limit (measures behaviour at a given offered load)
+
+The harness runs against the stub by default. ``--model-latency-ms`` turns the
+stub into a local model stand-in by charging a delay on every model turn. With
+the real SDK installed, point OPENAI_BASE_URL at a local OpenAI-compatible
+server to exercise a real model loop without leaving the machine.
+
+The shared booking store is snapshotted before the run and restored after it.
+
+Usage:
+    python load_harness.py --requests 500 --concurrency 32
+    python load_harness.py --mode open --rate 200 --duration 10 --json
+    python load_harness.py --synthetic --corpus-size 2000 --requests 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Iterator, Optional
+
+import booking_core
+import lock_profiling
+import smarter_dog_refactored as sd
+import token_accounting
+import traffic_gen
+
+DOG_NAMES = ("Luna", "Bella", "Max", "Charlie", "Daisy", "Milo", "Coco", "Rosie", "Teddy", "Bailey")
+CUSTOMERS = (
+    ("Sarah Chen", "555-0123"),
+    ("Tom Hughes", "555-0199"),
+    ("Priya Patel", "555-0147"),
+    ("Owen Davies", "555-0175"),
+    ("Grace Kim", "555-0110"),
+)
+SIZE_WEIGHTS = (("small", 4), ("medium", 4), ("large", 2))
+MONTH_NAMES = ("July", "August", "September", "October", "November")
+
+
+# ============================================================================
+# Prompt Corpus
+# ============================================================================
+
+
+def _ordinal(day: int) -> str:
+    """Render a day of month with its English ordinal suffix."""
+    suffix = "th" if 11 <= day <= 13 else {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+    return f"{day}{suffix}"
+
+
+def build_corpus(size: int, seed: int = 7) -> list[str]:
+    """Generate a deterministic corpus of natural-language booking prompts.
+
+    Dates are drawn from the salon's operating weekdays in the second half of
+    2024 so that the stub's prompt parser and the seeded ledger line up.
+    """
+    rng = random.Random(seed)
+    sizes = [name for name, weight in SIZE_WEIGHTS for _ in range(weight)]
+    days = []
+    for month_index, month in enumerate(MONTH_NAMES, start=7):
+        for day in range(1, 29):
+            if date(2024, month_index, day).weekday() in sd.OPEN_WEEKDAYS:
+                days.append(f"{month} {_ordinal(day)}")
+
+    prompts = []
+    for _ in range(size):
+        customer, phone = rng.choice(CUSTOMERS)
+        prompts.append(
+            f"I'd like to book {rng.choice(DOG_NAMES)}, a {rng.choice(sizes)} dog, "
+            f"for {rng.choice(days)} at {rng.choice(sd.SLOT_TIMES)}. "
+            f"Customer name is {customer}, phone number is {phone}. "
+            "If that slot is unavailable, pick the closest alternative."
+        )
+    return prompts
+
+
+def load_corpus(path: str) -> list[str]:
+    """Read prompts from a text file (one per line) or JSONL with a ``prompt`` field."""
+    prompts = []
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                prompts.append(json.loads(line)["prompt"])
+            else:
+                prompts.append(line)
+    if not prompts:
+        raise ValueError(f"Corpus file {path} contains no prompts.")
+    return prompts
+
+
+# ============================================================================
+# Hooks and Statistics
+# ============================================================================
+
+
+class LoadHooks(sd.RunHooks):
+    """Counts tool invocations and optionally simulates model latency per turn."""
+
+    def __init__(self, tool_calls: Counter, model_latency: float = 0.0, rng: Optional[random.Random] = None):
+        self.tool_calls = tool_calls
+        self.model_latency = model_latency
+        self.rng = rng or random.Random()
+
+    async def on_llm_start(self, context: Any, agent: Any, system_prompt: Any, input_items: Any) -> None:
+        if self.model_latency:
+            # Log-normal jitter keeps the median at the configured latency with a realistic tail.
+            await asyncio.sleep(self.model_latency * self.rng.lognormvariate(0.0, 0.35))
+
+    async def on_tool_end(self, context: Any, agent: Any, tool: Any, result: str) -> None:
+        self.tool_calls[getattr(tool, "name", None) or getattr(tool, "__name__", repr(tool))] += 1
+
+
+@dataclass
+class LoadReport:
+    """Aggregated results of a load run."""
+
+    mode: str
+    requests: int
+    concurrency: int
+    wall_seconds: float
+    stream: bool = False
+    latencies: list[float] = field(default_factory=list)
+    first_event_latencies: list[float] = field(default_factory=list)
+    succeeded: int = 0
+    conflicts: int = 0
+    errors: Counter = field(default_factory=Counter)
+    tool_calls: Counter = field(default_factory=Counter)
+
+    @property
+    def throughput(self) -> float:
+        """Completed runs per second of wall-clock time."""
+        return len(self.latencies) / self.wall_seconds if self.wall_seconds else 0.0
+
+    @property
+    def conflict_rate(self) -> float:
+        """Fraction of runs rejected because the ledger had no capacity left."""
+        return self.conflicts / self.requests if self.requests else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Nearest-rank end-to-end latency percentile in seconds."""
+        return _percentile(self.latencies, q)
+
+    def as_dict(self) -> dict:
+        """Serialise the report for JSON output."""
+        return {
+            "mode": self.mode,
+            "requests": self.requests,
+            "concurrency": self.concurrency,
+            "wall_seconds": round(self.wall_seconds, 6),
+            "throughput_rps": round(self.throughput, 2),
+            "latency_ms": {
+                f"p{q}": round(self.percentile(q) * 1000, 3) for q in (50, 95, 99)
+            },
+            **(
+                {
+                    "first_event_ms": {
+                        f"p{q}": round(_percentile(self.first_event_latencies, q) * 1000, 3)
+                        for q in (50, 95, 99)
+                    }
+                }
+                if self.stream
+                else {}
+            ),
+            "succeeded": self.succeeded,
+            "conflicts": self.conflicts,
+            "conflict_rate": round(self.conflict_rate, 4),
+            "errors": dict(self.errors),
+            "tool_calls": dict(self.tool_calls),
+        }
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of ``values`` (0.0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def _is_conflict(exc: Exception) -> bool:
+    """Tell capacity rejections apart from genuine failures."""
+    return isinstance(exc, booking_core.SlotFull) or "No slots available" in str(exc)
+
+
+# ============================================================================
+# Load Generation
+# ============================================================================
+
+
+async def _run_one(
+    agent: Any,
+    prompt: str,
+    hooks: LoadHooks,
+    report: LoadReport,
+    semaphore: asyncio.Semaphore,
+    started: Optional[float] = None,
+) -> None:
+    """Run a single booking under the semaphore and record its outcome."""
+    started = time.perf_counter() if started is None else started
+    first_event = True
+
+    def on_event(_event: Any) -> None:
+        nonlocal first_event
+        if first_event:
+            report.first_event_latencies.append(time.perf_counter() - started)
+            first_event = False
+
+    async with semaphore:
+        try:
+            await sd.run_agent(
+                agent,
+                prompt,
+                hooks=sd.HookChain(hooks, sd.RUN_HOOKS),
+                on_event=on_event if report.stream else None,
+            )
+        except Exception as exc:  # noqa: BLE001 - every failure is a data point here
+            if _is_conflict(exc):
+                report.conflicts += 1
+            else:
+                report.errors[type(exc).__name__] += 1
+        else:
+            report.succeeded += 1
+    report.latencies.append(time.perf_counter() - started)
+
+
+def _cycle(prompts: list[str]) -> Iterator[str]:
+    """Yield prompts round-robin forever."""
+    while True:
+        yield from prompts
+
+
+async def run_closed_loop(
+    agent: Any, prompts: list[str], total: int, concurrency: int, hooks: LoadHooks, stream: bool = False
+) -> LoadReport:
+    """Keep ``concurrency`` requests in flight until ``total`` have completed."""
+    report = LoadReport("closed", total, concurrency, 0.0, stream, tool_calls=hooks.tool_calls)
+    semaphore = asyncio.Semaphore(concurrency)
+    source = _cycle(prompts)
+    remaining = iter(range(total))
+
+    async def worker() -> None:
+        for _ in remaining:
+            await _run_one(agent, next(source), hooks, report, semaphore)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    report.wall_seconds = time.perf_counter() - started
+    return report
+
+
+async def run_open_loop(
+    agent: Any,
+    prompts: list[str],
+    rate: float,
+    duration: float,
+    concurrency: int,
+    hooks: LoadHooks,
+    rng: random.Random,
+    stream: bool = False,
+) -> LoadReport:
+    """Issue requests on a Poisson arrival schedule for ``duration`` seconds."""
+    report = LoadReport("open", 0, concurrency, 0.0, stream, tool_calls=hooks.tool_calls)
+    semaphore = asyncio.Semaphore(concurrency)
+    source = _cycle(prompts)
+    loop = asyncio.get_running_loop()
+    tasks = []
+
+    started = time.perf_counter()
+    next_arrival = started
+    while next_arrival - started < duration:
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # Latency is measured from the scheduled arrival, not the actual send,
+        # so a stalled loop cannot hide queueing delay (coordinated omission).
+        tasks.append(loop.create_task(_run_one(agent, next(source), hooks, report, semaphore, next_arrival)))
+        next_arrival += rng.expovariate(rate)
+    await asyncio.gather(*tasks)
+    report.requests = len(tasks)
+    report.wall_seconds = time.perf_counter() - started
+    return report
+
+
+async def run_load(args: argparse.Namespace) -> LoadReport:
+    """Build agents, run the selected mode and restore the ledgers afterwards.
+
+    Every location's bookings and waitlist and the customer registry are
+    put back, so a run inside a live process or a benchmark leaves no load behind.
+    """
+    if args.corpus:
+        prompts = load_corpus(args.corpus)
+    elif args.synthetic:
+        prompts = traffic_gen.prompts(args.corpus_size, traffic_gen.TrafficProfile(seed=args.seed))
+    else:
+        prompts = build_corpus(args.corpus_size, args.seed)
+    rng = random.Random(args.seed)
+    hooks = LoadHooks(Counter(), args.model_latency_ms / 1000, rng)
+    agent = sd.create_grooming_agent(sd.create_sheet_logger_agent())
+
+    snapshot = booking_core.snapshot_ledgers()
+    try:
+        if args.mode == "open":
+            return await run_open_loop(
+                agent, prompts, args.rate, args.duration, args.concurrency, hooks, rng, args.stream
+            )
+        return await run_closed_loop(agent, prompts, args.requests, args.concurrency, hooks, args.stream)
+    finally:
+        booking_core.restore_ledgers(snapshot)
+
+
+def format_report(report: LoadReport) -> str:
+    """Render a human-readable summary of a load run."""
+    data = report.as_dict()
+    lines = [
+        f"Mode: {data['mode']}  requests={data['requests']}  concurrency={data['concurrency']}",
+        f"  Wall time:   {data['wall_seconds']:.3f}s",
+        f"  Throughput:  {data['throughput_rps']:.2f} runs/s",
+        "  Latency:     "
+        + "  ".join(f"{name}={value:.3f}ms" for name, value in data["latency_ms"].items()),
+    ]
+    if report.stream:
+        lines.append(
+            "  First event: "
+            + "  ".join(f"{name}={value:.3f}ms" for name, value in data["first_event_ms"].items())
+        )
+    lines += [
+        f"  Succeeded:   {data['succeeded']}",
+        f"  Conflicts:   {data['conflicts']} ({data['conflict_rate']:.2%})",
+    ]
+    if data["errors"]:
+        lines.append(f"  Errors:      {json.dumps(data['errors'])}")
+    lines.append(f"  Tool calls:  {json.dumps(data['tool_calls'])}")
+    return "\n".join(lines)
+
+
+def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--mode", choices=("closed", "open"), default="closed")
+    parser.add_argument("--requests", type=int, default=200, help="Total runs in closed-loop mode")
+    parser.add_argument("--concurrency", type=int, default=16, help="Maximum runs in flight")
+    parser.add_argument("--rate", type=float, default=100.0, help="Arrivals per second in open-loop mode")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds of arrivals in open-loop mode")
+    parser.add_argument("--corpus", help="Prompt file (one per line, or JSONL with a 'prompt' field)")
+    parser.add_argument("--corpus-size", type=int, default=500, help="Generated corpus size")
+    parser.add_argument(
+        "--synthetic", action="store_true", help="Generate the corpus with traffic_gen (skewed dates, repeat customers)"
+    )
+    parser.add_argument("--model-latency-ms", type=float, default=0.0, help="Simulated latency per model turn")
+    parser.add_argument("--stream", action="store_true", help="Stream the runs and report time to first event")
+    parser.add_argument("--lock-profile", action="store_true", help="Profile ledger lock contention")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Emit the report as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Entry point for the load harness CLI."""
+    args = _parse_args(argv)
+    if args.lock_profile:
+        lock_profiling.enable()
+    report = asyncio.run(run_load(args))
+    if args.json:
+        data = report.as_dict()
+        data["model_usage"] = token_accounting.USAGE.report()
+        if args.lock_profile:
+            data["locks"] = lock_profiling.report()
+        print(json.dumps(data, indent=2))
+    else:
+        print(format_report(report))
+        print(token_accounting.format_report(token_accounting.USAGE.report()))
+        if args.lock_profile:
+            print(lock_profiling.format_report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Salon locations and their opening rules.
+
+Each ``Salon`` carries what used to be process-wide constants: the slot grid,
+the capacity per slot, the units each dog size takes, the services it offers
+and how many consecutive slots each takes per dog size, its groomers (see
+``groomers``), the operating weekdays and the closures (bank holiday
+handling, the Christmas shutdown, extra closed dates). ``booking_core``
+keeps one ledger partition per salon, so one process can serve many salons.
+
+Locations are read from a JSON file named by SMARTER_DOG_LOCATIONS, a list
+of objects such as::
+
+    [
+      {"location_id": "main", "name": "Smarter Dog Grooming"},
+      {"location_id": "harbour", "name": "Smarter Dog Harbour",
+       "open_weekdays": [3, 4, 5], "capacity_units": 3,
+       "slot_times": ["09:00", "10:00", "11:00", "12:00"],
+       "services": {"standard": {"small": 1, "medium": 1, "large": 1},
+                    "full_groom": {"small": 1, "medium": 2, "large": 2}},
+       "groomers": [
+         {"groomer_id": "amy", "sizes": ["small", "medium", "large"]},
+         {"groomer_id": "ben", "sizes": ["small", "medium"]},
+         {"groomer_id": "cat", "sizes": ["small", "medium"],
+          "shifts": {"3": ["09:00", "11:00"], "4": ["09:00", "12:00"]}}],
+       "closed_dates": ["2024-08-16"]}
+    ]
+
+Omitted fields take the values of the default salon (the original Smarter
+Dog rules, with its two all-round groomers), so a salon with more capacity
+usually lists its own groomers; ``"groomers": []`` turns groomer assignment
+off and leaves only the capacity units. Without the variable, only the
+default salon exists.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field, fields, replace
+from functools import cached_property
+from typing import Optional
+
+from groomers import Groomer, groomer_from_dict
+
+LOCATIONS_ENV = "SMARTER_DOG_LOCATIONS"
+
+
+@dataclass(frozen=True)
+class Salon:
+    """One salon's slot grid, capacity, services, groomers and closures."""
+
+    location_id: str
+    name: str
+    slot_times: tuple[str, ...]
+    open_weekdays: frozenset[int]
+    capacity_units: int
+    dog_size_units: dict[str, int] = field(hash=False)
+    # Service -> dog size -> consecutive slots the appointment takes.
+    services: dict[str, dict[str, int]] = field(hash=False)
+    # Bank holidays on an open weekday move to this weekday of the same week; None closes them.
+    holiday_shift_weekday: Optional[int] = 3
+    christmas_shutdown: bool = True
+    closed_dates: frozenset[str] = frozenset()
+    # Empty: no groomer assignment, capacity units only.
+    groomers: tuple[Groomer, ...] = field(default=(), hash=False)
+
+    def units_for(self, dog_size: str) -> int:
+        """Capacity units a dog of ``dog_size`` takes at this salon."""
+        return self.dog_size_units[dog_size]
+
+    def slots_for(self, service: str, dog_size: str) -> int:
+        """Consecutive slots ``service`` takes for a dog of ``dog_size``.
+
+        Raises:
+            ValueError: If the salon does not offer the service
+        """
+        durations = self.services.get(service)
+        if durations is None:
+            raise ValueError(f"Unknown service {service!r}; choose one of: {', '.join(self.services)}")
+        return durations[dog_size]
+
+    @cached_property
+    def slot_index(self) -> dict[str, int]:
+        """Position of each start time in ``slot_times``."""
+        return {slot: index for index, slot in enumerate(self.slot_times)}
+
+    @cached_property
+    def longest_service(self) -> int:
+        """Most slots any service takes here."""
+        return max(slots for durations in self.services.values() for slots in durations.values())
+
+
+def salon_from_dict(raw: dict, base: Salon) -> Salon:
+    """Build a salon from its JSON form; omitted fields come from ``base``.
+
+    Raises:
+        ValueError: If the entry has no location_id, an unknown field, or an
+            inconsistent slot grid, capacity, services or groomers
+    """
+    known = {item.name for item in fields(Salon)}
+    unknown = sorted(set(raw) - known)
+    if unknown:
+        raise ValueError(f"Unknown location field(s): {', '.join(unknown)}")
+    if not raw.get("location_id"):
+        raise ValueError("Every location needs a location_id")
+    values = dict(raw)
+    for name, convert in (
+        ("slot_times", tuple),
+        ("open_weekdays", frozenset),
+        ("closed_dates", frozenset),
+        ("dog_size_units", dict),
+        ("services", lambda services: {service: dict(slots) for service, slots in services.items()}),
+        ("groomers", lambda groomers: tuple(groomer_from_dict(groomer) for groomer in groomers)),
+    ):
+        if name in values:
+            values[name] = convert(values[name])
+    values.setdefault("name", values["location_id"])
+    salon = replace(base, **values)
+    if not salon.slot_times or list(salon.slot_times) != sorted(set(salon.slot_times)):
+        raise ValueError(f"{salon.location_id}: slot_times must be distinct HH:MM times in order")
+    if salon.capacity_units < max(salon.dog_size_units.values()):
+        raise ValueError(f"{salon.location_id}: capacity_units is too small for the largest dog")
+    for service, durations in salon.services.items():
+        if set(durations) != set(salon.dog_size_units) or min(durations.values()) < 1:
+            raise ValueError(f"{salon.location_id}: service {service!r} needs a slot count of 1+ for every dog size")
+    if salon.groomers:
+        ids = [groomer.groomer_id for groomer in salon.groomers]
+        if len(set(ids)) != len(ids):
+            raise ValueError(f"{salon.location_id}: duplicate groomer_id")
+        handled = set().union(*(groomer.sizes for groomer in salon.groomers))
+        if handled != set(salon.dog_size_units):
+            raise ValueError(f"{salon.location_id}: the groomers must handle every dog size and no others")
+    return salon
+
+
+def load_salons(path: str, base: Salon) -> list[Salon]:
+    """Read the salons in the JSON file at ``path``."""
+    with open(path, encoding="utf-8") as handle:
+        entries = json.load(handle)
+    if not isinstance(entries, list):
+        raise ValueError(f"{path}: expected a JSON list of locations")
+    salons = [salon_from_dict(entry, base) for entry in entries]
+    ids = [salon.location_id for salon in salons]
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"{path}: duplicate location_id")
+    return salons
+
+
+def configured_salons(base: Salon) -> list[Salon]:
+    """Salons from SMARTER_DOG_LOCATIONS, or just ``base`` when it is unset."""
+    path = os.environ.get(LOCATIONS_ENV)
+    return load_salons(path, base) if path else [base]
@@ -0,0 +1,210 @@
+"""
+Runtime-switchable contention profiling for the booking ledger locks.
+
+Ledger code registers each lock it uses by owner and attribute name
+(``register(partition.store, "lock", "bookings.main")``) and always looks the
+lock up through that attribute. ``enable()`` swaps every registered lock for
+an ``InstrumentedLock`` wrapping the *same* underlying lock, and
+``disable()`` swaps the raw lock back. Mutual exclusion is never broken by a
+swap, and while profiling is off callers hit the raw lock directly, so the
+disabled cost is zero.
+
+While enabled, each lock records:
+- acquisitions, and how many had to wait (contended)
+- wait and hold time histograms (also exported through ``metrics.REGISTRY``
+  as smarter_dog_lock_wait_seconds / smarter_dog_lock_hold_seconds)
+- total hold time per call site, to find who keeps the lock longest
+
+Only the outermost acquisition of a reentrant lock is measured. Statistics
+are updated while the lock is still held, so they need no lock of their own.
+
+Usage:
+    SMARTER_DOG_LOCK_PROFILE=1 python booking_server.py
+    python load_harness.py --concurrency 64 --lock-profile
+
+    import lock_profiling
+    lock_profiling.enable()
+    ...
+    print(lock_profiling.format_report())
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from dataclasses import dataclass, field
+from time import perf_counter_ns
+from typing import Any
+
+import metrics
+
+LOCK_WAIT = "smarter_dog_lock_wait_seconds"
+LOCK_HOLD = "smarter_dog_lock_hold_seconds"
+metrics.HELP.setdefault(LOCK_WAIT, "Time spent waiting to acquire a ledger lock (profiling enabled only).")
+metrics.HELP.setdefault(LOCK_HOLD, "Time a ledger lock was held (profiling enabled only).")
+
+
+@dataclass
+class LockStats:
+    """Counters for one named lock, accumulated across enable/disable cycles."""
+
+    name: str
+    acquisitions: int = 0
+    contended: int = 0
+    sites: dict[str, list[int]] = field(default_factory=dict)  # site -> [count, hold_ns]
+
+    def __post_init__(self) -> None:
+        self.wait = metrics.REGISTRY.histogram(LOCK_WAIT, lock=self.name)
+        self.hold = metrics.REGISTRY.histogram(LOCK_HOLD, lock=self.name)
+
+
+class InstrumentedLock:
+    """Context-manager lock wrapper that times waits and holds."""
+
+    def __init__(self, inner: Any, stats: LockStats):
+        self.inner = inner
+        self.stats = stats
+        self._local = threading.local()
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        return self._acquire(blocking, timeout, sys._getframe(1))
+
+    def __enter__(self) -> bool:
+        return self._acquire(True, -1, sys._getframe(1))
+
+    def _acquire(self, blocking: bool, timeout: float, frame: Any) -> bool:
+        local = self._local
+        depth = getattr(local, "depth", 0)
+        if depth:
+            acquired = self.inner.acquire(blocking, timeout)
+            if acquired:
+                local.depth = depth + 1
+            return acquired
+
+        started = perf_counter_ns()
+        contended = not self.inner.acquire(False)
+        if contended and not self.inner.acquire(blocking, timeout):
+            return False
+        acquired_at = perf_counter_ns()
+        stats = self.stats
+        stats.acquisitions += 1
+        if contended:
+            stats.contended += 1
+        stats.wait.observe_ns(acquired_at - started)
+        local.depth = 1
+        local.acquired_at = acquired_at
+        local.site = f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        return True
+
+    def release(self) -> None:
+        local = self._local
+        local.depth -= 1
+        if local.depth == 0:
+            held = perf_counter_ns() - local.acquired_at
+            self.stats.hold.observe_ns(held)
+            site = self.stats.sites.get(local.site)
+            if site is None:
+                self.stats.sites[local.site] = [1, held]
+            else:
+                site[0] += 1
+                site[1] += held
+        self.inner.release()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.release()
+
+
+_TARGETS: list[tuple[Any, str, str]] = []
+_STATS: dict[str, LockStats] = {}
+_SWITCH = threading.Lock()
+_enabled = False
+
+
+def register(owner: Any, attribute: str, name: str) -> None:
+    """Make ``owner.<attribute>`` a lock that ``enable()`` can instrument."""
+    with _SWITCH:
+        _TARGETS.append((owner, attribute, name))
+        if _enabled:
+            _instrument(owner, attribute, name)
+
+
+def _instrument(owner: Any, attribute: str, name: str) -> None:
+    lock = getattr(owner, attribute)
+    if not isinstance(lock, InstrumentedLock):
+        stats = _STATS.setdefault(name, LockStats(name))
+        setattr(owner, attribute, InstrumentedLock(lock, stats))
+
+
+def enable() -> None:
+    """Start profiling every registered lock."""
+    global _enabled
+    with _SWITCH:
+        _enabled = True
+        for owner, attribute, name in _TARGETS:
+            _instrument(owner, attribute, name)
+
+
+def disable() -> None:
+    """Stop profiling; registered locks go back to their raw, zero-overhead form."""
+    global _enabled
+    with _SWITCH:
+        _enabled = False
+        for owner, attribute, _ in _TARGETS:
+            lock = getattr(owner, attribute)
+            if isinstance(lock, InstrumentedLock):
+                setattr(owner, attribute, lock.inner)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """Zero the counters, call sites and wait/hold histograms of every lock."""
+    for stats in list(_STATS.values()):
+        stats.acquisitions = 0
+        stats.contended = 0
+        stats.sites = {}
+        stats.wait.reset()
+        stats.hold.reset()
+
+
+def report(top: int = 5) -> dict[str, dict]:
+    """Per-lock counters, wait/hold percentiles (ms) and the ``top`` call sites by hold time."""
+    result = {}
+    for name, stats in sorted(_STATS.items()):
+        wait_counts, wait_ns = stats.wait.merged()
+        hold_counts, hold_ns = stats.hold.merged()
+        sites = sorted(list(stats.sites.items()), key=lambda item: item[1][1], reverse=True)[:top]
+        result[name] = {
+            "acquisitions": stats.acquisitions,
+            "contended": stats.contended,
+            "contention_rate": round(stats.contended / stats.acquisitions, 4) if stats.acquisitions else 0.0,
+            "wait_total_ms": round(wait_ns / 1e6, 3),
+            "wait_p99_ms": round(stats.wait.percentile(99, wait_counts) * 1000, 4),
+            "hold_total_ms": round(hold_ns / 1e6, 3),
+            "hold_p99_ms": round(stats.hold.percentile(99, hold_counts) * 1000, 4),
+            "top_sites": [
+                {"site": site, "count": count, "hold_ms": round(held / 1e6, 3)} for site, (count, held) in sites
+            ],
+        }
+    return result
+
+
+def format_report(top: int = 5) -> str:
+    lines = []
+    for name, row in report(top).items():
+        lines.append(
+            f"Lock {name}: {row['acquisitions']} acquisitions, {row['contended']} contended "
+            f"({row['contention_rate']:.1%}); wait total {row['wait_total_ms']:.3f} ms, "
+            f"p99 {row['wait_p99_ms']:.4f} ms; hold total {row['hold_total_ms']:.3f} ms, "
+            f"p99 {row['hold_p99_ms']:.4f} ms"
+        )
+        for site in row["top_sites"]:
+            lines.append(f"  {site['hold_ms']:>10.3f} ms  {site['count']:>8}x  {site['site']}")
+    return "\n".join(lines) if lines else "No lock activity recorded."
+
+
+if os.environ.get("SMARTER_DOG_LOCK_PROFILE") == "1":
+    enable()
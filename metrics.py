@@ -0,0 +1,335 @@
+"""
+Low-overhead latency metrics for the Smarter Dog booking workflow.
+
+Histograms use HDR-style log-linear buckets: every power of two is split
+into eight sub-buckets, so a recorded value is off by at most 12.5% while
+one fixed array covers 1ns to ~18 minutes. Each thread writes to its own
+shard, so recording never takes a lock; shards are only summed when the
+metrics are read.
+
+Metric families recorded by the workflow:
+- smarter_dog_tool_duration_seconds{tool, outcome}: tool cores, where
+  outcome is ok, full (``booking_store.SlotFull``), rejected (any other
+  ValueError) or error
+- smarter_dog_run_duration_seconds{agent, outcome}: whole agent runs
+- smarter_dog_agent_duration_seconds{agent}: time each agent held the run
+- smarter_dog_handoff_duration_seconds{source, target}: from the handoff to
+  the target agent finishing
+
+The ``_count`` series of each histogram doubles as the call counter.
+
+Usage:
+    from metrics import REGISTRY
+    print(REGISTRY.render_prometheus())
+    REGISTRY.write_prometheus("/var/lib/node_exporter/smarter_dog.prom")
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import threading
+from time import perf_counter_ns
+from typing import Any, Awaitable, Callable, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+SUB_BUCKET_BITS = 3
+_LINEAR_LIMIT = 1 << (SUB_BUCKET_BITS + 1)
+MAX_TRACKABLE_NS = (1 << 40) - 1
+BUCKET_COUNT = ((MAX_TRACKABLE_NS.bit_length() - SUB_BUCKET_BITS) << SUB_BUCKET_BITS) + _LINEAR_LIMIT
+
+# Prometheus ``le`` bounds (seconds) the fine buckets are folded into on export.
+EXPORT_BOUNDS = (
+    0.000005,
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+TOOL_DURATION = "smarter_dog_tool_duration_seconds"
+RUN_DURATION = "smarter_dog_run_duration_seconds"
+AGENT_DURATION = "smarter_dog_agent_duration_seconds"
+HANDOFF_DURATION = "smarter_dog_handoff_duration_seconds"
+
+HELP = {
+    TOOL_DURATION: "Time spent in booking tool cores, by tool and outcome.",
+    RUN_DURATION: "Wall time of whole agent runs, by starting agent and outcome.",
+    AGENT_DURATION: "Time each agent held a run before finishing or handing off.",
+    HANDOFF_DURATION: "Time from a handoff until the target agent finished.",
+}
+
+
+def _bucket_index(value: int) -> int:
+    if value < _LINEAR_LIMIT:
+        return value if value > 0 else 0
+    if value > MAX_TRACKABLE_NS:
+        value = MAX_TRACKABLE_NS
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift << SUB_BUCKET_BITS) + (value >> shift)
+
+
+def _bucket_upper_ns(index: int) -> int:
+    """Exclusive upper bound of a bucket in nanoseconds."""
+    if index < _LINEAR_LIMIT:
+        return index + 1
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    mantissa = (index & ((1 << SUB_BUCKET_BITS) - 1)) + (1 << SUB_BUCKET_BITS)
+    return (mantissa + 1) << shift
+
+
+_EXPORT_SLOT = [
+    next((slot for slot, bound in enumerate(EXPORT_BOUNDS) if _bucket_upper_ns(index) - 1 <= bound * 1e9), None)
+    for index in range(BUCKET_COUNT)
+]
+
+
+class Histogram:
+    """Latency histogram for one label set, sharded per thread.
+
+    Each shard is a flat list of bucket counts followed by the running sum in
+    nanoseconds. Only the owning thread writes a shard, so ``observe_ns`` is
+    lock-free; readers merge shards and may see a sample or two in flight.
+    """
+
+    __slots__ = ("labels", "_local", "_shards", "_lock")
+
+    def __init__(self, labels: dict[str, str]):
+        self.labels = labels
+        self._local = threading.local()
+        self._shards: list[list[int]] = []
+        self._lock = threading.Lock()
+
+    def _new_shard(self) -> list[int]:
+        shard = [0] * (BUCKET_COUNT + 1)
+        self._local.shard = shard
+        with self._lock:
+            self._shards.append(shard)
+        return shard
+
+    def observe_ns(self, value: int) -> None:
+        """Record one duration in nanoseconds."""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        # Inlined _bucket_index: this is the hot path.
+        if value < _LINEAR_LIMIT:
+            index = value if value > 0 else 0
+        else:
+            clamped = value if value <= MAX_TRACKABLE_NS else MAX_TRACKABLE_NS
+            shift = clamped.bit_length() - SUB_BUCKET_BITS - 1
+            index = (shift << SUB_BUCKET_BITS) + (clamped >> shift)
+        shard[index] += 1
+        shard[BUCKET_COUNT] += value
+
+    def merged(self) -> tuple[list[int], int]:
+        """Return the bucket counts and sum (ns) across all threads."""
+        counts = [0] * BUCKET_COUNT
+        total_ns = 0
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for index, count in enumerate(shard[:BUCKET_COUNT]):
+                if count:
+                    counts[index] += count
+            total_ns += shard[BUCKET_COUNT]
+        return counts, total_ns
+
+    def percentile(self, pct: float, counts: list[int] | None = None) -> float:
+        """Upper bound (seconds) of the bucket holding the ``pct`` percentile."""
+        if counts is None:
+            counts, _ = self.merged()
+        total = sum(counts)
+        if not total:
+            return 0.0
+        rank = max(1, round(total * pct / 100))
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                return _bucket_upper_ns(index) / 1e9
+        return MAX_TRACKABLE_NS / 1e9
+
+    def reset(self) -> None:
+        with self._lock:
+            for shard in self._shards:
+                shard[:] = [0] * len(shard)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class MetricsRegistry:
+    """Holds histogram series by metric name and label values."""
+
+    def __init__(self) -> None:
+        self._series: dict[str, dict[tuple, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, **labels: str) -> Histogram:
+        """Return the series for ``name`` and ``labels``, creating it on first use."""
+        key = tuple(labels.items())
+        family = self._series.get(name)
+        if family is not None:
+            series = family.get(key)
+            if series is not None:
+                return series
+        with self._lock:
+            family = self._series.setdefault(name, {})
+            return family.setdefault(key, Histogram(dict(labels)))
+
+    def render_prometheus(self) -> str:
+        """Render every series in the Prometheus text exposition format (0.0.4)."""
+        lines = []
+        with self._lock:
+            families = {name: list(family.values()) for name, family in sorted(self._series.items())}
+        for name, series_list in families.items():
+            lines.append(f"# HELP {name} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} histogram")
+            for series in series_list:
+                counts, total_ns = series.merged()
+                folded = [0] * len(EXPORT_BOUNDS)
+                for index, count in enumerate(counts):
+                    slot = _EXPORT_SLOT[index]
+                    if count and slot is not None:
+                        folded[slot] += count
+                cumulative = 0
+                for bound, count in zip(EXPORT_BOUNDS, folded):
+                    cumulative += count
+                    labels = _format_labels({**series.labels, "le": repr(bound)})
+                    lines.append(f"{name}_bucket{labels} {cumulative}")
+                labels = _format_labels(series.labels)
+                lines.append(f"{name}_bucket{_format_labels({**series.labels, 'le': '+Inf'})} {sum(counts)}")
+                lines.append(f"{name}_sum{labels} {total_ns / 1e9:.9f}")
+                lines.append(f"{name}_count{labels} {sum(counts)}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Atomically write the exposition text (for node_exporter's textfile collector)."""
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            handle.write(self.render_prometheus())
+        os.replace(temporary, path)
+
+    def summary(self) -> dict[str, list[dict]]:
+        """Count, mean and p50/p95/p99 in milliseconds for every series."""
+        with self._lock:
+            families = {name: list(family.values()) for name, family in sorted(self._series.items())}
+        report = {}
+        for name, series_list in families.items():
+            rows = []
+            for series in series_list:
+                counts, total_ns = series.merged()
+                count = sum(counts)
+                rows.append(
+                    {
+                        **series.labels,
+                        "count": count,
+                        "mean_ms": round(total_ns / count / 1e6, 4) if count else 0.0,
+                        **{
+                            f"p{pct}_ms": round(series.percentile(pct, counts) * 1000, 4)
+                            for pct in (50, 95, 99)
+                        },
+                    }
+                )
+            report[name] = rows
+        return report
+
+    def reset(self) -> None:
+        """Zero every series (keeps the series themselves)."""
+        with self._lock:
+            series_list = [series for family in self._series.values() for series in family.values()]
+        for series in series_list:
+            series.reset()
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ============================================================================
+# Decorators
+# ============================================================================
+
+
+def timed_tool(tool: str, registry: MetricsRegistry = REGISTRY) -> Callable[[F], F]:
+    """Record the duration and outcome of every call to a tool core.
+
+    ``booking_store.SlotFull`` counts as ``full``; other ValueErrors are
+    ``rejected`` (closed day, bad time); anything else is ``error``. Series
+    are resolved once at decoration time so a call costs two clock reads and
+    two list increments.
+    """
+
+    def decorator(func: F) -> F:
+        from booking_store import SlotFull  # not at the top: booking_store's imports load this module
+
+        record_ok = registry.histogram(TOOL_DURATION, tool=tool, outcome="ok").observe_ns
+        full = registry.histogram(TOOL_DURATION, tool=tool, outcome="full")
+        rejected = registry.histogram(TOOL_DURATION, tool=tool, outcome="rejected")
+        error = registry.histogram(TOOL_DURATION, tool=tool, outcome="error")
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = perf_counter_ns()
+            try:
+                result = func(*args, **kwargs)
+            except ValueError as exc:
+                (full if isinstance(exc, SlotFull) else rejected).observe_ns(perf_counter_ns() - started)
+                raise
+            except Exception:
+                error.observe_ns(perf_counter_ns() - started)
+                raise
+            record_ok(perf_counter_ns() - started)
+            return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def timed_run(
+    run: Callable[..., Awaitable[Any]], registry: MetricsRegistry = REGISTRY
+) -> Callable[..., Awaitable[Any]]:
+    """Wrap a ``Runner.run``-style coroutine function to time whole runs per agent.
+
+    Results marked ``cached`` (``response_cache`` hits) are timed under outcome ``cached``.
+    """
+
+    @functools.wraps(run)
+    async def wrapper(agent: Any, *args: Any, **kwargs: Any) -> Any:
+        started = perf_counter_ns()
+        outcome = "error"
+        try:
+            result = await run(agent, *args, **kwargs)
+            outcome = "cached" if getattr(result, "cached", False) else "ok"
+            return result
+        finally:
+            registry.histogram(RUN_DURATION, agent=agent.name, outcome=outcome).observe_ns(
+                perf_counter_ns() - started
+            )
+
+    return wrapper
@@ -0,0 +1,114 @@
+"""
+Model tiers: a small fast model where it is enough, the large one otherwise.
+
+Every turn used to go to the same model, even one that only relays a
+``get_available_slots`` result. Two tiers are configured:
+- ``small``: the Sheet Logger always (``AGENT_TIERS``), and chat turns that
+  only ask for information: no customer details and nothing to book,
+  cancel or move (the same test ``response_cache`` applies)
+- ``large``: every other chat turn
+
+``smarter_dog_refactored.TieredWorkflow`` builds the agents for both tiers
+and routes each turn with ``tier_for_message``. When a small-tier answer
+fails validation against its ``BookingResponse`` / ``SheetLogResponse``
+output type, the turn is escalated to the large tier:
+- a run that changed nothing (only ``READ_ONLY_TOOLS``) is run again
+- a run that already booked, with only the Sheet Logger's answer invalid,
+  repeats just the logging with the large model, so nobody is booked twice
+- anything else is not retried and ``InvalidOutput`` is raised
+
+Tier runs are accounted in ``token_accounting.USAGE`` (``by_tier``: runs,
+escalations, cost and latency per tier), with each turn priced at its own
+model's rates.
+
+Models and prices come from the environment:
+- SMARTER_DOG_MODEL_SMALL / SMARTER_DOG_MODEL_LARGE (default gpt-4.1-mini /
+  gpt-4.1)
+- SMARTER_DOG_PRICE_SMALL_INPUT_PER_MTOK / ..._OUTPUT_PER_MTOK (default
+  0.40 / 1.60) and SMARTER_DOG_PRICE_LARGE_INPUT_PER_MTOK /
+  ..._OUTPUT_PER_MTOK (default 2.00 / 8.00)
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import response_cache
+import token_accounting
+
+
+class InvalidOutput(RuntimeError):
+    """Raised when an answer fails validation and cannot be escalated safely."""
+
+
+SMALL = "small"
+LARGE = "large"
+
+# Tools that never change the ledger, so a run that used only these can simply be run again.
+READ_ONLY_TOOLS = frozenset({"get_available_slots", "list_bookings", "lookup_customer"})
+
+
+@dataclass(frozen=True)
+class Tier:
+    """A model and what it costs."""
+
+    name: str
+    model: str
+    pricing: token_accounting.Pricing
+
+
+def _tier(name: str, default_model: str, default_input: str, default_output: str) -> Tier:
+    prefix = f"SMARTER_DOG_PRICE_{name.upper()}"
+    return Tier(
+        name,
+        os.environ.get(f"SMARTER_DOG_MODEL_{name.upper()}", default_model),
+        token_accounting.Pricing(
+            float(os.environ.get(f"{prefix}_INPUT_PER_MTOK", default_input)),
+            float(os.environ.get(f"{prefix}_OUTPUT_PER_MTOK", default_output)),
+        ),
+    )
+
+
+TIERS = {
+    tier.name: tier
+    for tier in (_tier(SMALL, "gpt-4.1-mini", "0.40", "1.60"), _tier(LARGE, "gpt-4.1", "2.00", "8.00"))
+}
+
+# Agents that always use one tier, whichever tier the turn was routed to.
+AGENT_TIERS = {"Sheet Logger": SMALL}
+
+for _tier_config in TIERS.values():
+    token_accounting.USAGE.model_pricing.setdefault(_tier_config.model, _tier_config.pricing)
+
+
+def model_for(tier: str) -> str:
+    return TIERS[tier].model
+
+
+def tier_of(model: Any) -> str:
+    """The tier configured with ``model``; empty for any other model."""
+    return next((tier.name for tier in TIERS.values() if tier.model == model), "")
+
+
+def tier_for_message(message: str) -> str:
+    """``small`` for an informational turn, ``large`` for anything that may book, cancel or move."""
+    return SMALL if response_cache.entities(message) is not None else LARGE
+
+
+def output_error(result: Any, output_type: Any) -> Optional[str]:
+    """Why ``result``'s final output is not a valid ``output_type``, or None when it is."""
+    if output_type is None or getattr(result, "cached", False):
+        return None
+    output = result.final_output
+    if isinstance(output, output_type):
+        return None
+    try:
+        if isinstance(output, str):
+            output_type.model_validate_json(output)
+        else:
+            output_type.model_validate(output)
+    except Exception as exc:  # Pydantic ValidationError
+        return f"{type(exc).__name__}: {exc}"
+    return None
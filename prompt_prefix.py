@@ -0,0 +1,150 @@
+"""
+Stable-prefix prompt assembly for the agents, and a check that it holds.
+
+Providers cache the longest prompt prefix they have seen before, so a run
+only gets cache hits if every request for an agent starts with the same
+bytes. Each agent's request therefore puts everything static first:
+- instructions: the fixed text, then ``CONTEXT_HEADER``, then the
+  deployment's dynamic context (sheet name, salon locations), so a change
+  of context only changes the tail
+- tools: in ``ordered_tools`` order (by name), not the order they happen to
+  be listed in
+- model, handoffs and output type: fixed per agent
+
+``static_prefix`` serialises that prefix for one agent (model, instructions
+up to the context, tool schemas, handoff descriptions, output schema) with sorted
+keys, and ``prefix_digests`` hashes it for every agent in the workflow.
+
+The check builds the agents in fresh interpreters with different hash
+seeds, sheet names and location files, and fails when any agent's prefix
+digest differs between them, so it can run as a CI step.
+
+Usage:
+    python prompt_prefix.py
+    python prompt_prefix.py --runs 6 --show
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Any, Iterable, Optional
+
+CONTEXT_HEADER = "\n\nDeployment context:\n"
+_DIGEST_SCRIPT = "import json, prompt_prefix; print(json.dumps(prompt_prefix._workflow_digests()))"
+
+
+def with_context(static: str, *sections: str) -> str:
+    """``static`` instructions followed by the non-empty dynamic ``sections``."""
+    sections = tuple(section.strip() for section in sections if section and section.strip())
+    return static + CONTEXT_HEADER + "\n\n".join(sections) if sections else static
+
+
+def _tool_name(tool: Any) -> str:
+    name = getattr(tool, "name", None) or getattr(tool, "__name__", None)
+    if name:
+        return name
+    config = getattr(tool, "tool_config", {})
+    return f"{config.get('type', 'hosted')}:{config.get('server_label', '')}"
+
+
+def ordered_tools(tools: Iterable[Any]) -> list[Any]:
+    """Tools in a canonical order (by name), so their schemas serialise identically on every run."""
+    return sorted(tools, key=_tool_name)
+
+
+def tool_schema(tool: Any) -> dict:
+    """What the model is sent for ``tool``: its schema with the SDK, its signature and docstring with the stub."""
+    if hasattr(tool, "params_json_schema"):
+        return {"name": tool.name, "description": tool.description, "parameters": tool.params_json_schema}
+    if hasattr(tool, "tool_config"):
+        return {"hosted": tool.tool_config}
+    return {"name": _tool_name(tool), "description": inspect.getdoc(tool), "parameters": str(inspect.signature(tool))}
+
+
+def static_prefix(agent: Any) -> str:
+    """The part of ``agent``'s requests that must not vary between runs, as canonical JSON."""
+    output_type = agent.output_type
+    return json.dumps(
+        {
+            "name": agent.name,
+            "model": agent.model if isinstance(getattr(agent, "model", None), str) else None,
+            "instructions": agent.instructions.split(CONTEXT_HEADER, 1)[0],
+            "tools": [tool_schema(tool) for tool in agent.tools],
+            "handoffs": [
+                {"name": handoff.name, "description": handoff.handoff_description} for handoff in agent.handoffs or []
+            ],
+            "output_type": output_type.model_json_schema() if hasattr(output_type, "model_json_schema") else None,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+
+
+def prefix_digests(agents: Iterable[Any]) -> dict[str, str]:
+    """Agent name -> SHA-256 of its static prefix."""
+    return {agent.name: hashlib.sha256(static_prefix(agent).encode()).hexdigest() for agent in agents}
+
+
+def _workflow_digests() -> dict[str, str]:
+    """Digests of the booking workflow's agents, built as the service builds them."""
+    import smarter_dog_refactored as sd
+
+    sheet_logger = sd.create_sheet_logger_agent()
+    return prefix_digests([sd.create_grooming_agent(sheet_logger), sheet_logger])
+
+
+def _variants(directory: str, runs: int) -> list[dict[str, str]]:
+    """Environments that change every dynamic input between runs."""
+    locations = os.path.join(directory, "locations.json")
+    with open(locations, "w", encoding="utf-8") as handle:
+        json.dump([{"location_id": "main"}, {"location_id": "harbour", "name": "Smarter Dog Harbour"}], handle)
+    variants = []
+    for run in range(runs):
+        env = {"PYTHONHASHSEED": str(run + 1), "SMARTER_DOG_SHEET_NAME": f"Bookings {run}"}
+        if run % 2:
+            env["SMARTER_DOG_LOCATIONS"] = locations
+        variants.append(env)
+    return variants
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check that every agent's prompt prefix is byte-stable.")
+    parser.add_argument("--runs", type=int, default=4, help="Fresh interpreters to compare (dynamic inputs vary)")
+    parser.add_argument("--show", action="store_true", help="Print the first agent's static prefix")
+    args = parser.parse_args(argv)
+
+    seen: dict[str, set[str]] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for env in _variants(directory, args.runs):
+            completed = subprocess.run(
+                [sys.executable, "-c", _DIGEST_SCRIPT],
+                capture_output=True,
+                text=True,
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                env={**os.environ, **env},
+                check=True,
+            )
+            for name, digest in json.loads(completed.stdout.splitlines()[-1]).items():
+                seen.setdefault(name, set()).add(digest)
+
+    failures = 0
+    for name, digests in seen.items():
+        ok = len(digests) == 1
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name:<24} {len(digests)} distinct prefix(es) over {args.runs} runs")
+    if args.show:
+        import smarter_dog_refactored as sd
+
+        print(static_prefix(sd.create_grooming_agent(sd.create_sheet_logger_agent())))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
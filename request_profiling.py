@@ -0,0 +1,172 @@
+"""
+On-demand profiling of individual agent runs.
+
+A profiled run is wrapped in cProfile for call-graph statistics while a
+background thread samples the running thread's stack for flamegraphs. Each
+profile gets an ID and produces two files in the profile directory:
+- ``<id>.pstats``: load with ``python -m pstats`` or snakeviz
+- ``<id>.collapsed``: ``frame;frame;frame count`` lines for flamegraph.pl or
+  speedscope
+
+The ID is written to the ``smarter_dog.profiling`` log line for the run, set
+on the run's trace span, and returned to HTTP clients in ``X-Profile-Id``.
+
+Which runs are profiled:
+- SMARTER_DOG_PROFILE_SAMPLE: percentage of runs to profile (default 0)
+- the ``X-Smarter-Dog-Profile: 1`` request header on the booking service, or
+  ``run_agent(..., profile=True)``, forces one run
+- SMARTER_DOG_PROFILE_DIR: output directory (default ``profiles``)
+- SMARTER_DOG_PROFILE_INTERVAL_MS: stack sampling interval (default 1.0)
+
+Only one run is profiled at a time per process; a run that would overlap an
+active profile is skipped. cProfile records the whole thread, so on a busy
+event loop the profile also contains whatever other tasks ran meanwhile.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import cProfile
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+PROFILE_HEADER = "x-smarter-dog-profile"
+LOGGER = logging.getLogger("smarter_dog.profiling")
+
+_PROFILE_ID: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("smarter_dog_profile_id", default=None)
+
+
+@dataclass(frozen=True)
+class ProfileConfig:
+    """Where profiles go and how often runs are profiled."""
+
+    directory: str = os.environ.get("SMARTER_DOG_PROFILE_DIR", "profiles")
+    sample_percent: float = float(os.environ.get("SMARTER_DOG_PROFILE_SAMPLE", "0"))
+    interval_ms: float = float(os.environ.get("SMARTER_DOG_PROFILE_INTERVAL_MS", "1.0"))
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _StackSampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval into collapsed form."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="smarter-dog-stack-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+
+class RequestProfiler:
+    """Decides which runs to profile and writes their profiles."""
+
+    def __init__(self, config: Optional[ProfileConfig] = None):
+        self.config = config or ProfileConfig()
+        self._busy = threading.Lock()
+
+    def should_profile(self, force: Optional[bool] = None) -> bool:
+        if force is not None:
+            return force
+        return self.config.sample_percent > 0 and random.random() * 100 < self.config.sample_percent
+
+    @contextlib.contextmanager
+    def profile(self, label: str, force: Optional[bool] = None) -> Iterator[Optional[str]]:
+        """Profile the enclosed block if selected; yields the profile ID or None."""
+        _PROFILE_ID.set(None)
+        if not self.should_profile(force):
+            yield None
+            return
+        if not self._busy.acquire(blocking=False):
+            LOGGER.info("profile skipped for %s: another profile is in progress", label)
+            yield None
+            return
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # another profiler (e.g. python -m cProfile) owns this thread
+            self._busy.release()
+            LOGGER.info("profile skipped for %s: a profiler is already active", label)
+            yield None
+            return
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        _PROFILE_ID.set(profile_id)
+        sampler = _StackSampler(threading.get_ident(), self.config.interval_ms / 1000)
+        sampler.start()
+        started = time.perf_counter()
+        try:
+            yield profile_id
+        finally:
+            profiler.disable()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            sampler.stop()
+            self._busy.release()
+            paths = self._write(profile_id, profiler, sampler.samples)
+            LOGGER.info(
+                "profile_id=%s run=%r elapsed_ms=%.2f samples=%d pstats=%s collapsed=%s",
+                profile_id,
+                label,
+                elapsed_ms,
+                sum(sampler.samples.values()),
+                *paths,
+            )
+
+    def _write(self, profile_id: str, profiler: cProfile.Profile, samples: Counter) -> tuple[str, str]:
+        os.makedirs(self.config.directory, exist_ok=True)
+        pstats_path = os.path.join(self.config.directory, f"{profile_id}.pstats")
+        collapsed_path = os.path.join(self.config.directory, f"{profile_id}.collapsed")
+        profiler.dump_stats(pstats_path)
+        with open(collapsed_path, "w", encoding="utf-8") as handle:
+            for stack, count in samples.most_common():
+                handle.write(f"{stack} {count}\n")
+        return pstats_path, collapsed_path
+
+
+PROFILER = RequestProfiler()
+
+
+def configure(config: ProfileConfig) -> RequestProfiler:
+    """Replace the process-wide profiler."""
+    global PROFILER
+    PROFILER = RequestProfiler(config)
+    return PROFILER
+
+
+def current_profile_id() -> Optional[str]:
+    """Profile ID of the latest run started in this task, if it was profiled."""
+    return _PROFILE_ID.get()
+
+
+def header_requests_profile(headers: dict[str, str]) -> Optional[bool]:
+    """Read the profiling header: True forces, absent defers to sampling."""
+    value = headers.get(PROFILE_HEADER)
+    if value is None:
+        return None
+    return value.strip().lower() in {"1", "true", "yes", "on"}
@@ -0,0 +1,278 @@
+"""
+Semantic response cache for informational chat turns.
+
+Much of the chat traffic asks the same questions ("are you open on
+Thursday?", "how many dogs per slot?"), and each costs a full agent run. The
+cache answers a repeat from an earlier run's final output without calling
+the model.
+
+Matching:
+- A message is reduced to entities (the date, time and dog size the
+  extractor finds, services and locations it names) and a hashing-vectorizer
+  embedding of its normalised words (unigrams and bigrams, digits folded,
+  stop words dropped; no model to load). A cached answer is reused only
+  when the entities are equal and the cosine similarity of the embeddings
+  is at least ``min_similarity``
+- Relative dates resolve against today, so "Thursday" stops matching once
+  it means a different day
+
+What is cached:
+- Only messages that carry no customer details (phone number, customer or
+  dog name) and ask for no action (book, cancel, reschedule, waitlist)
+- Only runs that succeeded, handed off to no one and called no tool other
+  than ``get_available_slots``
+
+Invalidation: an entry records the config generation (``booking_core``
+bumps it when a location is added) and, for every day its availability
+answers read, that day's change sequence in every location's store. A
+lookup checks them, so an entry is dropped as soon as a booking, cancel or
+reschedule touches one of its days; a day changed while the run was in
+progress is not cached at all. Entries also carry the agent's name,
+instructions and tools, so a prompt change never serves an old answer.
+
+Size and threshold come from the environment:
+- SMARTER_DOG_RESPONSE_CACHE: entries kept, least recently used evicted
+  (default 1024, 0 disables the cache)
+- SMARTER_DOG_CACHE_SIMILARITY: minimum cosine similarity (default 0.85)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date
+from functools import lru_cache
+from typing import Any, Optional
+
+import booking_core
+from booking_extractor import extract_booking
+
+CACHEABLE_TOOLS = frozenset({"get_available_slots"})
+DIMENSIONS = 1 << 18
+
+_WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_ACTION = re.compile(r"\b(?:book|booking|reserve|cancel|reschedule|move|change|waitlist|wait list)\b")
+_STOPWORDS = frozenset(
+    "a an and are can could do does for hi i is it me my of on please the there to we what would you your".split()
+)
+_PERSONAL_FIELDS = ("contact_number", "customer_name", "dog_name")
+
+Vector = dict[int, float]
+
+
+@lru_cache(maxsize=65536)
+def _hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little") % DIMENSIONS
+
+
+def embed(text: str) -> Vector:
+    """L2-normalised hashing-vectorizer embedding of word unigrams and bigrams."""
+    words = [re.sub(r"\d", "0", word) for word in _WORD.findall(text.lower()) if word not in _STOPWORDS]
+    vector: Vector = {}
+    for feature in [*words, *(f"{first} {second}" for first, second in zip(words, words[1:]))]:
+        index = _hash(feature)
+        vector[index] = vector.get(index, 0.0) + 1.0
+    norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+    return {index: weight / norm for index, weight in vector.items()}
+
+
+def similarity(first: Vector, second: Vector) -> float:
+    """Cosine similarity of two normalised embeddings."""
+    if len(first) > len(second):
+        first, second = second, first
+    return sum(weight * second.get(index, 0.0) for index, weight in first.items())
+
+
+def entities(message: str, reference: Optional[date] = None) -> Optional[tuple]:
+    """The entities an answer depends on, or None when the message must not be cached."""
+    lowered = message.lower()
+    if _ACTION.search(lowered):
+        return None
+    extraction = extract_booking(message, reference)
+    if any(extraction.get(name) for name in _PERSONAL_FIELDS):
+        return None
+    services = {
+        service
+        for partition in booking_core.PARTITIONS.values()
+        for service in partition.salon.services
+        if service.replace("_", " ") in lowered or service in lowered
+    }
+    locations = {
+        location
+        for location, partition in booking_core.PARTITIONS.items()
+        if re.search(rf"\b{re.escape(location)}\b", lowered) or partition.salon.name.lower() in lowered
+    }
+    return (
+        extraction.get("requested_date"),
+        extraction.get("requested_time"),
+        extraction.get("dog_size"),
+        tuple(sorted(services)),
+        tuple(sorted(locations)),
+    )
+
+
+def agent_fingerprint(agent: Any) -> str:
+    """Name, instructions and tools of ``agent``; a cached answer is only reused by the same agent."""
+    instructions = agent.instructions if isinstance(agent.instructions, str) else repr(agent.instructions)
+    tools = [getattr(tool, "name", None) or getattr(tool, "__name__", "tool") for tool in agent.tools]
+    return hashlib.blake2b(json.dumps([agent.name, instructions, tools]).encode(), digest_size=16).hexdigest()
+
+
+def day_versions(days: set[str]) -> tuple[tuple[str, str, int], ...]:
+    """(location, day, change sequence) for ``days`` in every location's store."""
+    versions = []
+    for location, partition in list(booking_core.PARTITIONS.items()):
+        store = partition.store
+        with store.lock:
+            versions.extend((location, day, store.changed.get(day, 0)) for day in sorted(days))
+    return tuple(versions)
+
+
+def _store_sequences() -> dict[str, int]:
+    return {location: partition.store.sequence for location, partition in list(booking_core.PARTITIONS.items())}
+
+
+@dataclass
+class CachedResult:
+    """A cache hit, shaped like the Runner's result."""
+
+    final_output: Any
+    cached: bool = True
+
+    def final_output_as(self, model_class: Any) -> Any:
+        output = self.final_output
+        return model_class.model_validate(json.loads(output) if isinstance(output, str) else output)
+
+
+@dataclass
+class _Entry:
+    vector: Vector
+    final_output: Any
+    generation: int
+    versions: tuple[tuple[str, str, int], ...]
+
+
+@dataclass
+class Recorder:
+    """What one run did that decides whether its answer can be cached; filled by the run's hooks."""
+
+    key: Optional[tuple]
+    vector: Vector
+    generation: int
+    started: dict[str, int]
+    tools: set[str] = field(default_factory=set)
+    days: set[str] = field(default_factory=set)
+    handed_off: bool = False
+    unreadable: bool = False
+
+    def tool_result(self, tool: str, result: Any) -> None:
+        self.tools.add(tool)
+        if tool not in CACHEABLE_TOOLS:
+            return
+        if isinstance(result, str):
+            try:
+                result = json.loads(result)
+            except json.JSONDecodeError:
+                result = None
+        if isinstance(result, dict) and "operating_date" in result:
+            self.days.update({result["operating_date"], result.get("requested_date", result["operating_date"])})
+        else:
+            self.unreadable = True
+
+
+class ResponseCache:
+    """Thread-safe LRU of final outputs, keyed by agent and entities and matched by embedding."""
+
+    def __init__(self, max_entries: int = 1024, min_similarity: float = 0.85) -> None:
+        self.max_entries = max_entries
+        self.min_similarity = min_similarity
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, list[_Entry]] = OrderedDict()
+        self._size = 0
+        self._stats = {"hits": 0, "misses": 0, "stored": 0, "uncacheable": 0, "invalidated": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def lookup(self, agent: Any, message: str) -> tuple[Optional[CachedResult], Optional[Recorder]]:
+        """A cached answer for ``message``, or None and a ``Recorder`` to fill during the run.
+
+        The recorder is None when the message must not be cached.
+        """
+        found = entities(message)
+        if found is None:
+            with self._lock:
+                self._stats["uncacheable"] += 1
+            return None, None
+        key = (agent_fingerprint(agent), found)
+        vector = embed(message)
+        generation = booking_core.CONFIG_GENERATION
+        with self._lock:
+            bucket = self._entries.get(key, [])
+            for entry in list(bucket):
+                if similarity(vector, entry.vector) < self.min_similarity:
+                    continue
+                days = {day for _, day, _ in entry.versions}
+                if entry.generation != generation or day_versions(days) != entry.versions:
+                    bucket.remove(entry)
+                    self._size -= 1
+                    self._stats["invalidated"] += 1
+                    continue
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return CachedResult(entry.final_output), None
+            if not bucket:
+                self._entries.pop(key, None)
+            self._stats["misses"] += 1
+        return None, Recorder(key, vector, generation, _store_sequences())
+
+    def store(self, recorder: Recorder, final_output: Any) -> bool:
+        """Cache a finished run's output if it qualifies; True when stored."""
+        if recorder.handed_off or recorder.unreadable or not recorder.tools <= CACHEABLE_TOOLS:
+            with self._lock:
+                self._stats["uncacheable"] += 1
+            return False
+        versions = day_versions(recorder.days)
+        if any(sequence > recorder.started.get(location, 0) for location, _, sequence in versions):
+            return False  # a day it read changed during the run; the answer may already be stale
+        if booking_core.CONFIG_GENERATION != recorder.generation:
+            return False
+        if hasattr(final_output, "model_dump"):
+            final_output = final_output.model_dump()
+        entry = _Entry(recorder.vector, final_output, recorder.generation, versions)
+        with self._lock:
+            self._entries.setdefault(recorder.key, []).append(entry)
+            self._entries.move_to_end(recorder.key)
+            self._size += 1
+            self._stats["stored"] += 1
+            while self._size > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": self._size,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else None,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+CACHE = ResponseCache(
+    int(os.environ.get("SMARTER_DOG_RESPONSE_CACHE", "1024")),
+    float(os.environ.get("SMARTER_DOG_CACHE_SIMILARITY", "0.85")),
+)
@@ -0,0 +1,148 @@
+"""
+Regression check for the groomer rota kept by the booking ledger.
+
+Books, reschedules and cancels on a three-groomer salon (two all-rounders
+and a small/medium specialist whose shift starts at 09:30) and fails when
+``BookingStore.verify()`` finds the rota out of step with the records:
+- the reschedule case: a booking moves onto slots overlapping its old ones,
+  and local repair has to hand another booking away to make room. The
+  hand-over must never land on the mover's old cells, which the move then
+  releases; cancelling the handed-over booking afterwards used to raise
+  KeyError
+- a random soak of ``--operations`` books, moves and cancels over two days
+
+Runs on its own location in a fresh process. Exits non-zero when a check
+fails, so it can run as a CI step.
+
+Usage:
+    python rota_check.py
+    python rota_check.py --operations 40000 --seed 7
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+from typing import Optional
+
+import booking_core
+from locations import salon_from_dict
+
+LOCATION = "rota-check"
+DAYS = ("2024-07-16", "2024-07-17")
+CONTACT = "555-0100"
+
+
+def _salon_partition() -> booking_core.Partition:
+    everyday = {str(weekday): ["09:30", "13:30"] for weekday in range(7)}
+    salon = salon_from_dict(
+        {
+            "location_id": LOCATION,
+            "capacity_units": 6,
+            "open_weekdays": list(range(7)),
+            "groomers": [
+                {"groomer_id": "amy", "sizes": ["small", "medium", "large"]},
+                {"groomer_id": "zed", "sizes": ["small", "medium", "large"]},
+                {"groomer_id": "cat", "sizes": ["small", "medium"], "shifts": everyday},
+            ],
+        },
+        booking_core.DEFAULT_SALON,
+    )
+    return booking_core.add_location(salon)
+
+
+def _reserve(partition: booking_core.Partition, dog_size: str, time: str, service: str, groomer: str) -> int:
+    """Book straight into the store with a chosen groomer, to set up an exact rota."""
+    salon = partition.salon
+    covered = booking_core._covered_slots(salon, time, salon.services[service][dog_size])
+    record = partition.store.reserve(
+        "Check",
+        dog_size,
+        DAYS[0],
+        time,
+        "Rota Check",
+        CONTACT,
+        salon.dog_size_units[dog_size],
+        salon.capacity_units,
+        service=service,
+        covered=covered,
+        staff=lambda _covered: groomer,
+    )
+    return record.booking_id
+
+
+def check_reschedule(partition: booking_core.Partition) -> list[str]:
+    """Move a large full groom from 09:00 to 09:30 when only a repair makes room, then cancel the repaired booking."""
+    mover = _reserve(partition, "large", "09:00", "full_groom", "amy")  # 09:00-10:30
+    in_the_way = _reserve(partition, "small", "09:30", "standard", "zed")
+    _reserve(partition, "small", "10:30", "standard", "amy")
+    problems = []
+    moved = booking_core.move_booking(mover, DAYS[0], "09:30", CONTACT, LOCATION)
+    handed_to = partition.store.get(in_the_way).groomer
+    if handed_to == "amy":
+        problems.append(f"booking {in_the_way} was handed onto amy's 09:30, which booking {mover} was leaving")
+    problems.extend(partition.store.verify())
+    try:
+        booking_core.release_booking(in_the_way, CONTACT, LOCATION)
+    except KeyError as exc:
+        problems.append(f"cancelling booking {in_the_way} after the move raised KeyError {exc}")
+    problems.extend(partition.store.verify())
+    print(f"reschedule: booking {mover} -> {moved['groomer']}, booking {in_the_way} handed to {handed_to}")
+    return problems
+
+
+def soak(partition: booking_core.Partition, operations: int, seed: int) -> list[str]:
+    """Random books, moves and cancels, verifying the store after each one."""
+    rng = random.Random(seed)
+    salon, store = partition.salon, partition.store
+    for step in range(operations):
+        roll = rng.random()
+        booking_ids = [record.booking_id for day in DAYS for record in store.on_date(day)]
+        try:
+            if roll < 0.5 or not booking_ids:
+                booking_core.commit_booking(
+                    "Check",
+                    rng.choice(("small", "medium", "large")),
+                    rng.choice(DAYS),
+                    rng.choice(salon.slot_times),
+                    "Rota Check",
+                    CONTACT,
+                    LOCATION,
+                    rng.choice(("standard", "full_groom")),
+                )
+            elif roll < 0.8:
+                booking_core.move_booking(
+                    rng.choice(booking_ids), rng.choice(DAYS), rng.choice(salon.slot_times), CONTACT, LOCATION
+                )
+            else:
+                booking_core.release_booking(rng.choice(booking_ids), CONTACT, LOCATION)
+        except ValueError:
+            pass  # full, no groomer free, or a slot past closing: all fine here
+        except KeyError as exc:
+            return [f"step {step}: KeyError {exc}"]
+        problems = store.verify()
+        if problems:
+            return [f"step {step}: {problem}" for problem in problems]
+    print(f"soak: {operations} operations, {len(store)} bookings left, no drift")
+    return []
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check that rescheduling with groomer repair keeps the rota intact.")
+    parser.add_argument("--operations", type=int, default=4000, help="Random operations in the soak")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    partition = _salon_partition()
+    problems = check_reschedule(partition)
+    for record in partition.store.on_date(DAYS[0]):
+        booking_core.release_booking(record.booking_id, CONTACT, LOCATION)
+    problems.extend(soak(partition, args.operations, args.seed))
+    for problem in problems:
+        print(f"FAIL {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
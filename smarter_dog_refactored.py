@@ -15,204 +15,72 @@ Optionally override the sheet name with SMARTER_DOG_SHEET_NAME.
 """
 
 import asyncio
-import calendar
 import json
 import os
-from datetime import date, datetime, timedelta
-from functools import lru_cache
-from threading import RLock
-from typing import Literal
+import time
+from typing import Callable, Literal
 
-from pydantic import BaseModel, Field
+import metrics
+import model_tiers
+import prompt_prefix
+import request_profiling
+import response_cache
+import token_accounting
+import tracing
 
 try:
-    from agents import Agent, HostedMCPTool, Runner, function_tool  # type: ignore
+    from agents import Agent, HostedMCPTool, ModelBehaviorError, RunHooks, Runner, function_tool  # type: ignore
 except (ModuleNotFoundError, TypeError):
     # Fall back to stub if:
     # - SDK not installed (ModuleNotFoundError)
     # - Python < 3.10 (TypeError from union syntax)
-    from agents_stub import Agent, HostedMCPTool, Runner, function_tool
-
-# Constants
-SLOT_TIMES = (
-    "08:30",
-    "09:00",
-    "09:30",
-    "10:00",
-    "10:30",
-    "11:00",
-    "11:30",
-    "12:00",
-    "12:30",
-    "13:00",
+    from agents_stub import Agent, HostedMCPTool, ModelBehaviorError, RunHooks, Runner, function_tool
+
+# The calendar/ledger core and the models import without the SDK; they are
+# re-exported here for callers that only know this module.
+from booking_core import (  # noqa: F401
+    CAPACITY_UNITS,
+    CURRENT_BOOKINGS,
+    DEFAULT_LOCATION,
+    DEFAULT_SALON,
+    DOG_SIZE_UNITS,
+    GROOMERS,
+    OPEN_WEEKDAYS,
+    PARTITIONS,
+    SERVICE_SLOTS,
+    SLOT_TIMES,
+    STORE,
+    SlotFull,
+    _bank_holidays_for_year,
+    _ensure_operating_day,
+    _is_bank_holiday,
+    _is_christmas_shutdown,
+    _last_weekday_of_month,
+    _parse_date,
+    _resolve_operating_day,
+    _shift_bank_holiday,
+    _slot_has_capacity,
+    add_location,
+    check_availability,
+    commit_booking,
+    enqueue_waitlist,
+    find_bookings,
+    find_customers,
+    move_booking,
+    partition_for,
+    release_booking,
+    utilization_report,
+    verify_ledgers,
+)
+from booking_models import (  # noqa: F401
+    BookingRequest,
+    BookingResponse,
+    SheetLogResponse,
+    SlotAvailabilityRequest,
+    SlotAvailabilityResponse,
 )
-OPEN_WEEKDAYS = {0, 1, 2}
-CAPACITY_UNITS = 2
-DOG_SIZE_UNITS: dict[Literal["small", "medium", "large"], int] = {
-    "small": 1,
-    "medium": 1,
-    "large": 2,
-}
-SHEET_NAME = os.environ.get("SMARTER_DOG_SHEET_NAME", "Smarter Dog Bookings")
-
-CURRENT_BOOKINGS: dict[str, dict[str, int]] = {
-    "2024-07-10": {"09:00": 2},
-    "2024-07-17": {"10:30": 1},
-}
-BOOKINGS_LOCK = RLock()
-
-
-# ============================================================================
-# Pydantic Models for Type-Safe Tool Parameters and Outputs
-# ============================================================================
-
-
-class SlotAvailabilityRequest(BaseModel):
-    """Request parameters for checking slot availability."""
-
-    requested_date: str = Field(
-        ...,
-        description="Date in ISO format (YYYY-MM-DD) for which to check availability",
-    )
-    dog_size: Literal["small", "medium", "large"] = Field(
-        ..., description="Size of the dog: small, medium, or large"
-    )
-
-
-class SlotAvailabilityResponse(BaseModel):
-    """Response containing available time slots for grooming."""
-
-    requested_date: str = Field(..., description="Original requested date")
-    operating_date: str = Field(..., description="Actual operating date after adjustments")
-    available_slots: list[str] = Field(..., description="List of available time slots")
-    notes: list[str] = Field(default_factory=list, description="Additional notes or warnings")
-
-
-class BookingRequest(BaseModel):
-    """Request parameters for booking a grooming appointment."""
-
-    dog_name: str = Field(..., description="Name of the dog")
-    dog_size: Literal["small", "medium", "large"] = Field(
-        ..., description="Size of the dog: small, medium, or large"
-    )
-    requested_date: str = Field(..., description="Requested date in ISO format (YYYY-MM-DD)")
-    requested_time: str = Field(..., description="Requested time slot (e.g., '09:00')")
-    customer_name: str = Field(..., description="Name of the customer")
-    contact_number: str = Field(..., description="Customer contact phone number")
-
-
-class BookingResponse(BaseModel):
-    """Confirmed booking details."""
-
-    dog_name: str
-    dog_size: Literal["small", "medium", "large"]
-    date: str
-    time: str
-    customer: str
-    phone: str
-    status: Literal["Booked", "Failed"]
-    notes: list[str] = Field(default_factory=list)
-
-
-class SheetLogResponse(BaseModel):
-    """Response from sheet logging operation."""
-
-    status: Literal["success", "error"]
-    details: str
-
-
-# ============================================================================
-# Business Logic Helpers
-# ============================================================================
-
 
-def _parse_date(value: str) -> date:
-    """Parse ISO date string to date object."""
-    return datetime.fromisoformat(value).date()
-
-
-def _last_weekday_of_month(year: int, month: int, weekday: int) -> date:
-    """Find the last occurrence of a weekday in a given month."""
-    last_day = calendar.monthrange(year, month)[1]
-    candidate = date(year, month, last_day)
-    while candidate.weekday() != weekday:
-        candidate -= timedelta(days=1)
-    return candidate
-
-
-@lru_cache(maxsize=None)
-def _bank_holidays_for_year(year: int) -> set[date]:
-    """Calculate UK bank holidays for a given year."""
-    late_may = _last_weekday_of_month(year, 5, 0)  # Spring bank holiday (last Monday in May)
-    late_august = _last_weekday_of_month(year, 8, 0)  # Summer bank holiday (last Monday in Aug)
-    holidays = {late_may, late_august}
-
-    christmas = date(year, 12, 25)
-    holidays.add(christmas)
-    # Substitute Christmas bank holidays when the 25th falls on a weekend.
-    if christmas.weekday() == 5:  # Saturday
-        holidays.add(christmas + timedelta(days=2))
-    elif christmas.weekday() == 6:  # Sunday
-        holidays.add(christmas + timedelta(days=1))
-    return holidays
-
-
-def _is_bank_holiday(day: date) -> bool:
-    """Check if a date is a UK bank holiday."""
-    return day in _bank_holidays_for_year(day.year)
-
-
-def _is_christmas_shutdown(day: date) -> bool:
-    """Check if a date falls within the Christmas shutdown period."""
-    if day.month == 12 and day.day in {24, 25, 26}:
-        return True
-    dec26 = date(day.year, 12, 26)
-    if day <= dec26:
-        return False
-    first_monday = dec26 + timedelta(days=1)
-    while first_monday.weekday() != 0:
-        first_monday += timedelta(days=1)
-    shutdown_window = {first_monday + timedelta(days=i) for i in range(3)}
-    return day in shutdown_window
-
-
-def _shift_bank_holiday(day: date) -> tuple[date, list[str], bool]:
-    """Shift bank holiday bookings to Thursday if they fall on operating days."""
-    if day.weekday() in OPEN_WEEKDAYS and _is_bank_holiday(day):
-        new_day = day + timedelta(days=3 - day.weekday())
-        return new_day, [
-            f"{day.isoformat()} is a bank holiday, booking moved to {new_day.isoformat()}."
-        ], True
-    return day, [], False
-
-
-def _ensure_operating_day(day: date, force_open: bool = False) -> tuple[date, list[str]]:
-    """Validate that a day is an operating day for the salon."""
-    if force_open and day.weekday() == 3 and not _is_christmas_shutdown(day):
-        return day, []
-    if day.weekday() not in OPEN_WEEKDAYS:
-        return day, [f"{day.isoformat()} falls on {day.strftime('%A')}, salon closed."]
-    if _is_christmas_shutdown(day):
-        return day, [f"{day.isoformat()} is during the Christmas shutdown."]
-    return day, []
-
-
-def _resolve_operating_day(requested_date: str) -> tuple[date, list[str], bool]:
-    """Resolve the actual operating day from a requested date, handling holidays and closures."""
-    requested = _parse_date(requested_date)
-    day, notes, force_open = _shift_bank_holiday(requested)
-    operating_day, closure_notes = _ensure_operating_day(day, force_open)
-    combined_notes = [*notes, *closure_notes]
-    is_open = not closure_notes and (force_open or operating_day.weekday() in OPEN_WEEKDAYS)
-    return operating_day, combined_notes, is_open
-
-
-def _slot_has_capacity(day: date, slot: str, units_needed: int) -> bool:
-    """Check if a time slot has sufficient capacity for the booking."""
-    day_key = day.isoformat()
-    with BOOKINGS_LOCK:
-        used = CURRENT_BOOKINGS.get(day_key, {}).get(slot, 0)
-    return used + units_needed <= CAPACITY_UNITS
+SHEET_NAME = os.environ.get("SMARTER_DOG_SHEET_NAME", "Smarter Dog Bookings")
 
 
 # ============================================================================
@@ -222,7 +90,10 @@ def _slot_has_capacity(day: date, slot: str, units_needed: int) -> bool:
 
 @function_tool
 def get_available_slots(
-    requested_date: str, dog_size: Literal["small", "medium", "large"]
+    requested_date: str,
+    dog_size: Literal["small", "medium", "large"],
+    location: str = "",
+    service: str = "standard",
 ) -> dict:
     """Get available grooming time slots for a specific date and dog size.
 
@@ -234,34 +105,18 @@ def get_available_slots(
         requested_date: The desired booking date in ISO format (YYYY-MM-DD)
         dog_size: The size of the dog - determines capacity units needed
             (small/medium = 1 unit, large = 2 units)
+        location: Salon location ID; empty for the main salon
+        service: 'standard' (one slot) or 'full_groom' (two slots, three for
+            large dogs); long services need every slot they cover free
 
     Returns:
         Dictionary containing:
         - requested_date: Original date requested
         - operating_date: Actual date after holiday adjustments
-        - available_slots: List of available time slots (HH:MM format)
+        - available_slots: Start times (HH:MM) with room for the whole service
         - notes: Any warnings or informational messages
     """
-    operating_day, notes, is_open = _resolve_operating_day(requested_date)
-    if not is_open:
-        reasons = notes or [f"{operating_day.isoformat()} is outside operating days."]
-        return {
-            "requested_date": requested_date,
-            "operating_date": operating_day.isoformat(),
-            "available_slots": [],
-            "notes": reasons,
-        }
-
-    units_needed = DOG_SIZE_UNITS[dog_size]
-    available = [
-        slot for slot in SLOT_TIMES if _slot_has_capacity(operating_day, slot, units_needed)
-    ]
-    return {
-        "requested_date": requested_date,
-        "operating_date": operating_day.isoformat(),
-        "available_slots": available,
-        "notes": notes,
-    }
+    return check_availability(requested_date, dog_size, location, service)
 
 
 @function_tool
@@ -272,6 +127,8 @@ def book_grooming_appointment(
     requested_time: str,
     customer_name: str,
     contact_number: str,
+    location: str = "",
+    service: str = "standard",
 ) -> dict:
     """Book a grooming appointment for a dog at a specific date and time.
 
@@ -286,41 +143,175 @@ def book_grooming_appointment(
         requested_time: Desired time slot (e.g., '09:00', '10:30')
         customer_name: Full name of the customer
         contact_number: Customer's phone number for contact
+        location: Salon location ID; empty for the main salon
+        service: 'standard' (one slot) or 'full_groom' (two slots, three for
+            large dogs); long services need every slot they cover free
 
     Returns:
         Dictionary containing confirmed booking details including:
         - dog_name, dog_size, date, time
         - customer, phone
         - status: 'Booked' if successful
+        - service, slots: the service and every slot it takes
+        - groomer: ID of the groomer assigned to the dog
         - notes: Any relevant messages or warnings
 
     Raises:
         ValueError: If the salon is closed, time is invalid, or slot is full
     """
-    operating_day, notes, is_open = _resolve_operating_day(requested_date)
-    if not is_open:
-        raise ValueError(f"Salon closed on {operating_day.isoformat()}")
-    if requested_time not in SLOT_TIMES:
-        raise ValueError("Requested time is outside operating hours.")
-
-    units_needed = DOG_SIZE_UNITS[dog_size]
-    day_key = operating_day.isoformat()
-    with BOOKINGS_LOCK:
-        ledger = CURRENT_BOOKINGS.setdefault(day_key, {})
-        used = ledger.get(requested_time, 0)
-        if used + units_needed > CAPACITY_UNITS:
-            raise ValueError("Requested slot is full; pick another time.")
-        ledger[requested_time] = used + units_needed
-    return {
-        "dog_name": dog_name,
-        "dog_size": dog_size,
-        "date": operating_day.isoformat(),
-        "time": requested_time,
-        "customer": customer_name,
-        "phone": contact_number,
-        "status": "Booked",
-        "notes": notes,
-    }
+    return commit_booking(
+        dog_name, dog_size, requested_date, requested_time, customer_name, contact_number, location, service
+    )
+
+
+@function_tool
+def join_waitlist(
+    dog_name: str,
+    dog_size: Literal["small", "medium", "large"],
+    requested_date: str,
+    requested_time: str,
+    customer_name: str,
+    contact_number: str,
+    location: str = "",
+    service: str = "standard",
+) -> dict:
+    """Put a customer on the waitlist for a fully booked slot.
+
+    Use this when the customer wants a specific slot that is full and no
+    alternative suits them. When the slot frees up (a cancellation or a
+    reschedule), the longest waiting customer whose dog fits is booked into
+    it automatically. If the slot has room by now, it is booked immediately.
+
+    Args:
+        dog_name: Name of the dog being groomed
+        dog_size: Size of the dog (small, medium, or large)
+        requested_date: Desired appointment date in ISO format (YYYY-MM-DD)
+        requested_time: Desired time slot (e.g., '09:00', '10:30')
+        customer_name: Full name of the customer
+        contact_number: Customer's phone number for contact
+        location: Salon location ID; empty for the main salon
+        service: 'standard' (one slot) or 'full_groom' (two slots, three for
+            large dogs); long services need every slot they cover free
+
+    Returns:
+        Dictionary containing the request details including:
+        - dog_name, dog_size, date, time
+        - customer, phone
+        - status: 'Waitlisted' (with waitlist_id and the position in notes),
+          or 'Booked' (with booking_id) if the slot had room
+        - notes: Any relevant messages or warnings
+
+    Raises:
+        ValueError: If the salon is closed or the time is invalid
+    """
+    return enqueue_waitlist(
+        dog_name, dog_size, requested_date, requested_time, customer_name, contact_number, location, service
+    )
+
+
+@function_tool
+def lookup_customer(contact_number: str = "", customer_name: str = "") -> dict:
+    """Look up a returning customer and their dogs from earlier bookings.
+
+    Matches on the phone number when one is given (any formatting, including
+    +44), otherwise on the customer's full name, which may match several
+    customers.
+
+    Args:
+        contact_number: The customer's phone number, if they gave one
+        customer_name: The customer's full name, if no phone number is known
+
+    Returns:
+        Dictionary containing:
+        - matches: Customers found, each with customer_name, contact_number,
+          dogs (dog_name, dog_size), bookings and last_booking
+        - notes: Guidance when nobody matched
+    """
+    return find_customers(contact_number, customer_name)
+
+
+@function_tool
+def list_bookings(
+    dog_name: str = "", contact_number: str = "", start_date: str = "", end_date: str = "", location: str = ""
+) -> dict:
+    """List confirmed bookings, e.g. to answer "when is Luna booked in?".
+
+    Give at least one filter; filters combine. Dates are inclusive.
+
+    Args:
+        dog_name: Only bookings for this dog (case-insensitive)
+        contact_number: Only bookings made with this phone number
+        start_date: Earliest booking date in ISO format (YYYY-MM-DD)
+        end_date: Latest booking date in ISO format (YYYY-MM-DD)
+        location: Only bookings at this salon location; empty for every location
+
+    Returns:
+        Dictionary containing:
+        - bookings: Matching bookings in date and time order, each with
+          booking_id, dog_name, dog_size, date, time, customer, phone,
+          status, notes and location
+
+    Raises:
+        ValueError: If no filter is given
+    """
+    return find_bookings(dog_name, contact_number, start_date, end_date, location)
+
+
+@function_tool
+def cancel_booking(booking_id: int, contact_number: str = "", location: str = "") -> dict:
+    """Cancel a confirmed booking and free its slot.
+
+    Find the booking ID with list_bookings first. When the customer gave a
+    phone number, pass it so only their own bookings can be cancelled.
+
+    Args:
+        booking_id: ID of the booking to cancel, from list_bookings
+        contact_number: Phone number the booking was made with
+        location: The booking's location, from list_bookings
+
+    Returns:
+        Dictionary containing the cancelled booking details including:
+        - booking_id, dog_name, dog_size, date, time
+        - customer, phone
+        - status: 'Cancelled'
+        - notes: Any relevant messages or warnings
+
+    Raises:
+        ValueError: If there is no such booking or the phone number does not match
+    """
+    return release_booking(booking_id, contact_number, location)
+
+
+@function_tool
+def reschedule_booking(
+    booking_id: int, requested_date: str, requested_time: str, contact_number: str = "", location: str = ""
+) -> dict:
+    """Move a confirmed booking to a new date and time.
+
+    The new slot is claimed and the old one freed in a single step: if the
+    new slot is full the booking stays where it was, so check availability
+    first. Bank holiday dates shift to Thursday as for new bookings. The
+    booking keeps its service, so a long service needs all its new slots free.
+
+    Args:
+        booking_id: ID of the booking to move, from list_bookings
+        requested_date: New appointment date in ISO format (YYYY-MM-DD)
+        requested_time: New time slot (e.g., '09:00', '10:30')
+        contact_number: Phone number the booking was made with
+        location: The booking's location, from list_bookings; it stays there
+
+    Returns:
+        Dictionary containing the updated booking details including:
+        - booking_id, dog_name, dog_size, date, time
+        - customer, phone
+        - status: 'Booked'
+        - notes: Any relevant messages or warnings
+
+    Raises:
+        ValueError: If there is no such booking, the phone number does not
+            match, the salon is closed, the time is invalid, or the slot is full
+    """
+    return move_booking(booking_id, requested_date, requested_time, contact_number, location)
 
 
 # ============================================================================
@@ -343,67 +334,475 @@ def _google_drive_connector() -> HostedMCPTool:
     )
 
 
-def create_sheet_logger_agent() -> Agent:
+def create_sheet_logger_agent(model: str | None = None) -> Agent:
     """Create an agent responsible for logging bookings to Google Sheets.
 
     This agent uses the Google Drive connector to find the booking spreadsheet
-    and append confirmed appointment details.
+    and append confirmed appointment details. It runs on the small model tier
+    unless ``model`` says otherwise.
     """
     return Agent(
         name="Sheet Logger",
         handoff_description="Logs confirmed bookings to the Google Sheets spreadsheet",
-        instructions=(
+        instructions=prompt_prefix.with_context(
             "You log confirmed Smarter Dog grooming appointments to a Google Sheet. "
-            f"Use the Google Drive connector to find the spreadsheet titled '{SHEET_NAME}'. "
+            "Use the Google Drive connector to find the spreadsheet titled as in the deployment context below. "
             "If the sheet exists, append a row with the booking fields in order: "
             "Date, Time, Dog Name, Size, Customer, Phone, Status, Notes. "
             "Always respond with JSON in the format: "
-            '{"status": "success" | "error", "details": "description of what happened"}.'
+            '{"status": "success" | "error", "details": "description of what happened"}.',
+            f"Spreadsheet title: {SHEET_NAME}",
         ),
-        tools=[_google_drive_connector()],
+        tools=prompt_prefix.ordered_tools([_google_drive_connector()]),
         output_type=SheetLogResponse,
+        model=model or model_tiers.model_for(model_tiers.AGENT_TIERS["Sheet Logger"]),
     )
 
 
-def create_grooming_agent(sheet_logger: Agent) -> Agent:
+def _location_instructions() -> str:
+    """Instruction lines naming the salon locations, when there is more than one."""
+    if len(PARTITIONS) == 1:
+        return ""
+    lines = [
+        f"- {location_id}: {partition.salon.name}, slots {partition.salon.slot_times[0]}–"
+        f"{partition.salon.slot_times[-1]}, {partition.salon.capacity_units} capacity units per slot"
+        for location_id, partition in PARTITIONS.items()
+    ]
+    return (
+        "Locations (pass the ID as `location` to every booking tool; the hours above are "
+        f"for {DEFAULT_LOCATION}, the default):\n" + "\n".join(lines)
+    )
+
+
+def create_grooming_agent(sheet_logger: Agent, model: str | None = None) -> Agent:
     """Create the main grooming booking agent with handoff to sheet logger.
 
     This agent handles customer booking requests, checks availability, makes
-    bookings, and hands off to the sheet logger for persistence.
+    bookings, and hands off to the sheet logger for persistence. The
+    instructions and tools keep a byte-stable prefix (see ``prompt_prefix``);
+    the salon locations go in the context at the end.
 
     Args:
         sheet_logger: The agent responsible for logging to Google Sheets
+        model: Model to run on; defaults to the large tier (see ``model_tiers``)
     """
     return Agent(
         name="Smarter Dog Grooming",
-        instructions=(
+        instructions=prompt_prefix.with_context(
             "You are the booking assistant for Smarter Dog Grooming Salon. "
             "Operating hours: Monday–Wednesday, 08:30–15:00, with 30-minute slots from 08:30–13:00. "
             "Each slot supports two small/medium dogs or one large dog. "
+            "A full groom (service 'full_groom') takes two consecutive slots, three for a large dog; "
+            "pass the same service to get_available_slots and the booking tools. "
             "Bank holidays automatically shift appointments to Thursday. "
-            "The salon is closed from Christmas Eve through Boxing Day and the following Monday–Wednesday. "
+            "The salon is closed from Christmas Eve through Boxing Day and the following Monday–Wednesday."
             "\n\n"
             "Workflow:\n"
-            "1. Use get_available_slots to check availability before booking\n"
-            "2. Use book_grooming_appointment to confirm the booking\n"
-            "3. Once booking is confirmed, hand off to the Sheet Logger agent to persist the booking\n"
+            "1. If the customer gives a phone number or name but not every booking detail, "
+            "use lookup_customer; for a returning customer, fill in their name, phone and dog "
+            "from the match and ask for a single confirmation instead of every detail\n"
+            "2. Use get_available_slots to check availability before booking\n"
+            "3. Use book_grooming_appointment to confirm the booking\n"
+            "4. Once booking is confirmed, hand off to the Sheet Logger agent to persist the booking\n"
             "\n"
             "Always check availability first. If the requested slot is unavailable, "
-            "suggest the nearest alternative from the available slots."
+            "suggest the nearest alternative from the available slots; if the customer only wants "
+            "that slot, or nothing is free that day, offer join_waitlist. "
+            "Use list_bookings to answer questions about existing bookings. "
+            "To cancel or move a booking, find its booking ID with list_bookings, then use "
+            "cancel_booking or reschedule_booking (check availability before rescheduling).",
+            _location_instructions(),
+        ),
+        tools=prompt_prefix.ordered_tools(
+            [
+                get_available_slots,
+                book_grooming_appointment,
+                join_waitlist,
+                lookup_customer,
+                list_bookings,
+                cancel_booking,
+                reschedule_booking,
+            ]
         ),
-        tools=[get_available_slots, book_grooming_appointment],
         handoffs=[sheet_logger],
         output_type=BookingResponse,
+        model=model or model_tiers.model_for(model_tiers.LARGE),
     )
 
 
+# ============================================================================
+# Run Observability
+# ============================================================================
+
+
+class HookChain(RunHooks):
+    """Forward every run lifecycle callback to several hook objects in order."""
+
+    def __init__(self, *hooks: RunHooks):
+        self.hooks = hooks
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items) -> None:
+        for hooks in self.hooks:
+            await hooks.on_llm_start(context, agent, system_prompt, input_items)
+
+    async def on_llm_end(self, context, agent, response) -> None:
+        for hooks in self.hooks:
+            await hooks.on_llm_end(context, agent, response)
+
+    async def on_agent_start(self, context, agent) -> None:
+        for hooks in self.hooks:
+            await hooks.on_agent_start(context, agent)
+
+    async def on_agent_end(self, context, agent, output) -> None:
+        for hooks in self.hooks:
+            await hooks.on_agent_end(context, agent, output)
+
+    async def on_handoff(self, context, from_agent, to_agent) -> None:
+        for hooks in self.hooks:
+            await hooks.on_handoff(context, from_agent, to_agent)
+
+    async def on_tool_start(self, context, agent, tool) -> None:
+        for hooks in self.hooks:
+            await hooks.on_tool_start(context, agent, tool)
+
+    async def on_tool_end(self, context, agent, tool, result) -> None:
+        for hooks in self.hooks:
+            await hooks.on_tool_end(context, agent, tool, result)
+
+
+class MetricsHooks(RunHooks):
+    """Record per-agent and handoff timings into ``metrics.REGISTRY``.
+
+    One instance can serve concurrent runs: timings are keyed by the run's
+    context wrapper. An agent's time ends when it finishes or hands off; a
+    handoff's time runs until the target agent finishes.
+    """
+
+    def __init__(self, registry: metrics.MetricsRegistry = metrics.REGISTRY):
+        self.registry = registry
+        self._runs: dict[int, dict] = {}
+
+    def _close_agent(self, run: dict, agent_name: str, now: int) -> None:
+        started = run["agents"].pop(agent_name, None)
+        if started is not None:
+            self.registry.histogram(metrics.AGENT_DURATION, agent=agent_name).observe_ns(now - started)
+
+    async def on_agent_start(self, context, agent) -> None:
+        run = self._runs.setdefault(id(context), {"agents": {}, "handoffs": {}})
+        run["agents"][agent.name] = time.perf_counter_ns()
+
+    async def on_handoff(self, context, from_agent, to_agent) -> None:
+        now = time.perf_counter_ns()
+        run = self._runs.setdefault(id(context), {"agents": {}, "handoffs": {}})
+        self._close_agent(run, from_agent.name, now)
+        run["handoffs"][to_agent.name] = (from_agent.name, now)
+
+    async def on_agent_end(self, context, agent, output) -> None:
+        now = time.perf_counter_ns()
+        run = self._runs.get(id(context))
+        if run is None:
+            return
+        self._close_agent(run, agent.name, now)
+        handoff = run["handoffs"].pop(agent.name, None)
+        if handoff is not None:
+            source, started = handoff
+            self.registry.histogram(
+                metrics.HANDOFF_DURATION, source=source, target=agent.name
+            ).observe_ns(now - started)
+        if not run["agents"]:
+            del self._runs[id(context)]
+
+
+class TracingHooks(RunHooks):
+    """Open an ``agent <name>`` span per agent turn and a ``handoff`` span per handoff.
+
+    Spans join the trace started by ``run_agent``; outside a sampled trace
+    the hooks do nothing. Each span becomes current while it is open, so tool
+    and ledger spans nest under the agent that called them and the Sheet
+    Logger's turn nests under its handoff.
+    """
+
+    def __init__(self) -> None:
+        self._runs: dict[str, dict] = {}
+
+    async def on_agent_start(self, context, agent) -> None:
+        parent = tracing.current_span()
+        if parent is None:
+            return
+        run = self._runs.setdefault(parent.trace_id, {"root": parent, "agents": {}, "handoffs": {}})
+        span = tracing.TRACER.start_span(f"agent {agent.name}", parent, **{"agent.name": agent.name})
+        run["agents"][agent.name] = span
+        tracing.set_current_span(span)
+
+    async def on_handoff(self, context, from_agent, to_agent) -> None:
+        current = tracing.current_span()
+        run = self._runs.get(current.trace_id) if current else None
+        if run is None:
+            return
+        source = run["agents"].pop(from_agent.name, None)
+        if source is not None:
+            tracing.TRACER.end_span(source)
+        span = tracing.TRACER.start_span(
+            "handoff", run["root"], **{"handoff.source": from_agent.name, "handoff.target": to_agent.name}
+        )
+        run["handoffs"][to_agent.name] = span
+        tracing.set_current_span(span)
+
+    async def on_agent_end(self, context, agent, output) -> None:
+        current = tracing.current_span()
+        run = self._runs.get(current.trace_id) if current else None
+        if run is None:
+            return
+        for span in (run["agents"].pop(agent.name, None), run["handoffs"].pop(agent.name, None)):
+            if span is not None:
+                tracing.TRACER.end_span(span)
+        tracing.set_current_span(run["root"])
+        if not run["agents"]:
+            del self._runs[current.trace_id]
+
+    def abandon(self, trace_id: str, exc: BaseException) -> None:
+        """End the spans a failed run left open, marking them as errors."""
+        run = self._runs.pop(trace_id, None)
+        if run is None:
+            return
+        for span in [*run["agents"].values(), *run["handoffs"].values()]:
+            span.record_error(exc)
+            tracing.TRACER.end_span(span)
+
+
+class UsageHooks(RunHooks):
+    """Fill one run's ``RunUsage`` from model responses and enforce its budget.
+
+    Create one per run. The budget check runs before each model call, so a
+    runaway conversation is stopped without paying for another turn.
+    """
+
+    def __init__(self, usage: token_accounting.RunUsage):
+        self.usage = usage
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items) -> None:
+        self.usage.check_before_turn()
+
+    async def on_llm_end(self, context, agent, response) -> None:
+        model = agent.model if isinstance(agent.model, str) else ""
+        self.usage.record_turn(agent.name, response.usage.input_tokens, response.usage.output_tokens, model)
+
+    async def on_tool_start(self, context, agent, tool) -> None:
+        self.usage.record_tool(getattr(tool, "name", None) or getattr(tool, "__name__", "tool"))
+
+
+class CacheHooks(RunHooks):
+    """Tell a run's ``response_cache.Recorder`` which tools ran, what they returned and any handoff."""
+
+    def __init__(self, recorder: response_cache.Recorder):
+        self.recorder = recorder
+
+    async def on_tool_end(self, context, agent, tool, result) -> None:
+        self.recorder.tool_result(getattr(tool, "name", None) or getattr(tool, "__name__", "tool"), result)
+
+    async def on_handoff(self, context, from_agent, to_agent) -> None:
+        self.recorder.handed_off = True
+
+
+METRICS_HOOKS = MetricsHooks()
+TRACING_HOOKS = TracingHooks()
+RUN_HOOKS = HookChain(METRICS_HOOKS, TRACING_HOOKS)
+
+
+@metrics.timed_run
+async def run_agent(
+    agent: Agent,
+    prompt: str,
+    *,
+    budget: token_accounting.RunBudget | None = None,
+    profile: bool | None = None,
+    cache: response_cache.ResponseCache | None = None,
+    on_event: Callable[[object], None] | None = None,
+    **kwargs,
+):
+    """Runner.run (or run_streamed) with metrics, tracing, token accounting, on-demand profiling and response caching.
+
+    Records run, agent and handoff timings in ``metrics.REGISTRY``; when
+    tracing is configured and the run is sampled, an ``agent.run`` trace; and
+    the run's model turns and tokens in ``token_accounting.USAGE``. The run
+    is profiled when ``profile`` is True, or at the configured sample rate
+    when it is None; ``request_profiling.current_profile_id()`` then returns
+    its profile ID.
+
+    With a ``cache``, a repeat of an informational question is answered from
+    it without a model call (a ``response_cache.CachedResult``, accounted
+    under outcome ``cached``), and a qualifying run's answer is stored.
+
+    With ``on_event``, the run is streamed: each ``Runner.run_streamed``
+    event is passed to it as it arrives, and the finished streaming result
+    is returned. A cache hit produces no events.
+
+    Raises:
+        token_accounting.BudgetExceeded: If the run goes over ``budget``
+            (defaults from the environment)
+    """
+    usage = token_accounting.RunUsage(agent.name, budget or token_accounting.RunBudget())
+    usage.tier = model_tiers.tier_of(agent.model)
+    started = time.perf_counter()
+    recorder = None
+    if cache is not None and cache.enabled:
+        hit, recorder = cache.lookup(agent, prompt)
+        if hit is not None:
+            usage.outcome, usage.seconds = "cached", time.perf_counter() - started
+            token_accounting.USAGE.record(usage)
+            return hit
+    hooks = [UsageHooks(usage), kwargs.get("hooks") or RUN_HOOKS]
+    if recorder is not None:
+        hooks.insert(1, CacheHooks(recorder))
+    kwargs["hooks"] = HookChain(*hooks)
+    with request_profiling.PROFILER.profile(f"run_agent {agent.name}", profile) as profile_id:
+        with tracing.root_span("agent.run", **{"agent.name": agent.name}) as span:
+            if span is not None and profile_id is not None:
+                span.set_attribute("profile.id", profile_id)
+            try:
+                if on_event is None:
+                    result = await Runner.run(agent, prompt, **kwargs)
+                else:
+                    result = Runner.run_streamed(agent, prompt, **kwargs)
+                    async for event in result.stream_events():
+                        on_event(event)
+                usage.outcome = "ok"
+                if recorder is not None and model_tiers.output_error(result, agent.output_type) is None:
+                    cache.store(recorder, result.final_output)
+                return result
+            except Exception as exc:
+                usage.outcome = token_accounting.classify_outcome(exc)
+                if span is not None:
+                    TRACING_HOOKS.abandon(span.trace_id, exc)
+                raise
+            finally:
+                usage.seconds = time.perf_counter() - started
+                if usage.outcome != "running":  # cancelled runs are not accounted
+                    token_accounting.USAGE.record(usage)
+                if span is not None:
+                    span.set_attribute("llm.turns", len(usage.turns))
+                    span.set_attribute("llm.input_tokens", usage.input_tokens)
+                    span.set_attribute("llm.output_tokens", usage.output_tokens)
+
+
+class TierHooks(RunHooks):
+    """Note which tools a run called, the bookings it confirmed and whether it handed off."""
+
+    def __init__(self) -> None:
+        self.tools: set[str] = set()
+        self.bookings: list[dict] = []
+        self.handed_off = False
+
+    async def on_tool_end(self, context, agent, tool, result) -> None:
+        self.tools.add(getattr(tool, "name", None) or getattr(tool, "__name__", "tool"))
+        if isinstance(result, str):
+            try:
+                result = json.loads(result)
+            except json.JSONDecodeError:
+                return
+        if isinstance(result, dict) and result.get("status") == "Booked":
+            self.bookings.append(result)
+
+    async def on_handoff(self, context, from_agent, to_agent) -> None:
+        self.handed_off = True
+
+
+class TieredWorkflow:
+    """The booking workflow on both model tiers: routes each turn and escalates invalid answers.
+
+    See ``model_tiers`` for the routing and escalation rules.
+    """
+
+    def __init__(self) -> None:
+        self.sheet_logger = create_sheet_logger_agent()
+        self.agents = {
+            tier: create_grooming_agent(self.sheet_logger, model_tiers.model_for(tier)) for tier in model_tiers.TIERS
+        }
+        self.large_sheet_logger = create_sheet_logger_agent(model_tiers.model_for(model_tiers.LARGE))
+
+    async def run(self, prompt: str, **kwargs):
+        """``run_agent`` on the turn's tier, escalating to the large tier when the answer is invalid.
+
+        Raises:
+            model_tiers.InvalidOutput: If the answer is invalid and cannot safely be redone
+        """
+        tier = model_tiers.tier_for_message(prompt)
+        result, error, seen = await self._attempt(self.agents[tier], prompt, **kwargs)
+        if error is None:
+            return result
+        if tier != model_tiers.LARGE and seen.tools <= model_tiers.READ_ONLY_TOOLS:
+            token_accounting.USAGE.record_escalation(tier)
+            result, error, _ = await self._attempt(self.agents[model_tiers.LARGE], prompt, **kwargs)
+        elif seen.handed_off and seen.bookings and self.sheet_logger.model != self.large_sheet_logger.model:
+            # Booked already; only the small model's sheet log failed, so redo just the logging.
+            token_accounting.USAGE.record_escalation(model_tiers.tier_of(self.sheet_logger.model))
+            payload = f"Booking payload:\n{json.dumps(seen.bookings[-1])}"
+            result, error, _ = await self._attempt(self.large_sheet_logger, payload, **kwargs)
+        if error is not None:
+            raise model_tiers.InvalidOutput(f"Invalid answer from the {tier} model tier: {error}")
+        return result
+
+    @staticmethod
+    async def _attempt(agent: Agent, prompt: str, **kwargs):
+        """One run: its result (None if the model misbehaved), the validation error and what it did."""
+        seen = TierHooks()
+        kwargs["hooks"] = HookChain(seen, kwargs.get("hooks") or RUN_HOOKS)
+        try:
+            result = await run_agent(agent, prompt, **kwargs)
+        except ModelBehaviorError as exc:
+            return None, f"{type(exc).__name__}: {exc}", seen
+        final_agent = getattr(result, "last_agent", agent)
+        return result, model_tiers.output_error(result, final_agent.output_type), seen
+
+
+# ============================================================================
+# Streaming Progress
+# ============================================================================
+
+
+def describe_stream_event(event: object) -> str | None:
+    """Turn a streaming run event into a one-line progress message.
+
+    Works with events from both the real SDK and the stub. Returns None for
+    events that carry no user-facing progress (raw model deltas, tool calls
+    whose result is reported separately).
+    """
+    event_type = getattr(event, "type", None)
+    if event_type == "agent_updated_stream_event":
+        return f"{event.new_agent.name} is working on the request"
+    if event_type != "run_item_stream_event":
+        return None
+
+    item = event.item
+    if event.name == "tool_output":
+        output = item.output
+        if isinstance(output, str):
+            try:
+                output = json.loads(output)
+            except json.JSONDecodeError:
+                return None
+        if isinstance(output, dict) and "available_slots" in output:
+            slots = output["available_slots"]
+            return f"Availability: {len(slots)} slot(s) open on {output['operating_date']}"
+        if isinstance(output, dict) and output.get("status") == "Booked":
+            return f"Booking committed: {output['dog_name']} on {output['date']} at {output['time']}"
+        if isinstance(output, dict) and output.get("status") == "Waitlisted":
+            return f"Waitlisted: {output['dog_name']} for {output['date']} at {output['time']}"
+        return None
+    if event.name == "handoff_requested":
+        return "Handoff started: passing the booking to the Sheet Logger"
+    if event.name == "message_output_created" and item.agent.name == "Sheet Logger":
+        return "Logging done: booking recorded in the spreadsheet"
+    return None
+
+
 # ============================================================================
 # Main Workflow
 # ============================================================================
 
 
 async def main() -> None:
-    """Run the Smarter Dog booking workflow with agent handoffs."""
+    """Run the Smarter Dog booking workflow with agent handoffs, streaming progress."""
     # Create agents with handoff relationship
     sheet_logger = create_sheet_logger_agent()
     grooming_agent = create_grooming_agent(sheet_logger)
@@ -416,7 +815,18 @@ async def main() -> None:
     )
 
     print("Starting booking request...")
-    result = await Runner.run(grooming_agent, request)
+    started = time.perf_counter()
+    first_event_at: float | None = None
+    result = Runner.run_streamed(grooming_agent, request)
+    async for event in result.stream_events():
+        if first_event_at is None:
+            first_event_at = time.perf_counter() - started
+        message = describe_stream_event(event)
+        if message:
+            print(f"  [{(time.perf_counter() - started) * 1000:7.1f} ms] {message}")
+    total = time.perf_counter() - started
+    if first_event_at is not None:
+        print(f"Time to first event: {first_event_at * 1000:.1f} ms; total run time: {total * 1000:.1f} ms")
 
     # With output_type, we can use type-safe extraction
     try:
@@ -0,0 +1,284 @@
+"""
+Token and model-call accounting for booking runs.
+
+Every run started through ``run_agent`` gets a ``RunUsage`` record filled in
+by ``UsageHooks`` (in smarter_dog_refactored): model turns, input and output
+tokens per agent, and which tool each turn's decision led to. Finished
+records are folded into ``USAGE``, which aggregates by agent, tool, run
+outcome and model tier and reports cost and latency per successful booking.
+
+Each turn records the model that served it, and is priced at that model's
+rates when ``UsageLedger.model_pricing`` has them (``model_tiers`` registers
+its tiers there). Runs carry the tier they were routed to; the tier report
+shows runs, escalations to a larger tier, cost and latency per tier.
+
+A ``RunBudget`` caps turns and tokens per run. When a run would exceed it,
+the hooks raise ``BudgetExceeded`` and the run is aborted before the next
+model call is made.
+
+Prices and budgets come from the environment:
+- SMARTER_DOG_PRICE_INPUT_PER_MTOK / SMARTER_DOG_PRICE_OUTPUT_PER_MTOK:
+  USD per million tokens for models without their own pricing (default
+  0.40 / 1.60)
+- SMARTER_DOG_MAX_TURNS: model turns per run (default 12)
+- SMARTER_DOG_MAX_TOKENS: input + output tokens per run (default 50000)
+
+Turns that are not followed by a tool call are attributed to ``respond``.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Optional
+
+import metrics
+from booking_store import SlotFull
+
+RESPOND = "respond"
+
+
+@dataclass(frozen=True)
+class Pricing:
+    """USD per million input and output tokens."""
+
+    input_per_million: float = float(os.environ.get("SMARTER_DOG_PRICE_INPUT_PER_MTOK", "0.40"))
+    output_per_million: float = float(os.environ.get("SMARTER_DOG_PRICE_OUTPUT_PER_MTOK", "1.60"))
+
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        return (input_tokens * self.input_per_million + output_tokens * self.output_per_million) / 1_000_000
+
+
+@dataclass(frozen=True)
+class RunBudget:
+    """Per-run ceilings; ``None`` disables a limit."""
+
+    max_turns: Optional[int] = int(os.environ.get("SMARTER_DOG_MAX_TURNS", "12"))
+    max_tokens: Optional[int] = int(os.environ.get("SMARTER_DOG_MAX_TOKENS", "50000"))
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised from run hooks to abort a run that went over its ``RunBudget``."""
+
+
+@dataclass
+class TurnUsage:
+    agent: str
+    input_tokens: int
+    output_tokens: int
+    tool: str = RESPOND
+    model: str = ""
+
+
+@dataclass
+class RunUsage:
+    """Model usage of one run."""
+
+    agent: str
+    budget: RunBudget = field(default_factory=RunBudget)
+    turns: list[TurnUsage] = field(default_factory=list)
+    tool_calls: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    outcome: str = "running"
+    seconds: float = 0.0
+    tier: str = ""  # model tier of the run's first agent (see model_tiers)
+
+    @property
+    def input_tokens(self) -> int:
+        return sum(turn.input_tokens for turn in self.turns)
+
+    @property
+    def output_tokens(self) -> int:
+        return sum(turn.output_tokens for turn in self.turns)
+
+    def check_before_turn(self) -> None:
+        """Raise ``BudgetExceeded`` if one more model turn is not allowed."""
+        if self.budget.max_turns is not None and len(self.turns) >= self.budget.max_turns:
+            raise BudgetExceeded(f"Run used its {self.budget.max_turns} model turns without finishing.")
+
+    def record_turn(self, agent: str, input_tokens: int, output_tokens: int, model: str = "") -> None:
+        self.turns.append(TurnUsage(agent, input_tokens, output_tokens, model=model))
+        total = self.input_tokens + self.output_tokens
+        if self.budget.max_tokens is not None and total > self.budget.max_tokens:
+            raise BudgetExceeded(f"Run used {total} tokens, over its budget of {self.budget.max_tokens}.")
+
+    def record_tool(self, tool: str) -> None:
+        """Attribute the latest turn to ``tool`` (the turn decided to call it)."""
+        self.tool_calls[tool] += 1
+        if self.turns and self.turns[-1].tool == RESPOND:
+            self.turns[-1].tool = tool
+
+
+def classify_outcome(exc: Optional[BaseException]) -> str:
+    """Map a run's exception (or None) to ok, budget_exceeded, conflict or error."""
+    if exc is None:
+        return "ok"
+    if isinstance(exc, BudgetExceeded):
+        return "budget_exceeded"
+    if isinstance(exc, SlotFull) or "No slots available" in str(exc):
+        return "conflict"
+    return "error"
+
+
+class UsageLedger:
+    """Thread-safe aggregate of finished runs."""
+
+    def __init__(self, pricing: Optional[Pricing] = None):
+        self.pricing = pricing or Pricing()
+        self.model_pricing: dict[str, Pricing] = {}
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            # Rows: agent [turns, in, out, cost]; tool [calls, turns, in, out, cost];
+            # outcome [runs, turns, in, out, seconds, cost]; tier [runs, escalations, turns, in, out, cost].
+            self._by_agent: dict[str, list[float]] = defaultdict(lambda: [0, 0, 0, 0.0])
+            self._by_tool: dict[str, list[float]] = defaultdict(lambda: [0, 0, 0, 0, 0.0])
+            self._by_outcome: dict[str, list[float]] = defaultdict(lambda: [0, 0, 0, 0, 0.0, 0.0])
+            self._by_tier: dict[str, list[float]] = defaultdict(lambda: [0, 0, 0, 0, 0, 0.0])
+            self._latency = metrics.Histogram({})
+            self._tier_latency: dict[str, metrics.Histogram] = defaultdict(lambda: metrics.Histogram({}))
+
+    def turn_cost(self, turn: TurnUsage) -> float:
+        """USD for one turn, at its model's pricing when known."""
+        return self.model_pricing.get(turn.model, self.pricing).cost(turn.input_tokens, turn.output_tokens)
+
+    def record(self, run: RunUsage) -> None:
+        with self._lock:
+            run_cost = 0.0
+            for turn in run.turns:
+                cost = self.turn_cost(turn)
+                run_cost += cost
+                agent = self._by_agent[turn.agent]
+                agent[0] += 1
+                agent[1] += turn.input_tokens
+                agent[2] += turn.output_tokens
+                agent[3] += cost
+                tool = self._by_tool[turn.tool]
+                tool[1] += 1
+                tool[2] += turn.input_tokens
+                tool[3] += turn.output_tokens
+                tool[4] += cost
+            for name, calls in run.tool_calls.items():
+                self._by_tool[name][0] += calls
+            outcome = self._by_outcome[run.outcome]
+            outcome[0] += 1
+            outcome[1] += len(run.turns)
+            outcome[2] += run.input_tokens
+            outcome[3] += run.output_tokens
+            outcome[4] += run.seconds
+            outcome[5] += run_cost
+            if run.tier:
+                tier = self._by_tier[run.tier]
+                tier[0] += 1
+                tier[2] += len(run.turns)
+                tier[3] += run.input_tokens
+                tier[4] += run.output_tokens
+                tier[5] += run_cost
+                tier_latency = self._tier_latency[run.tier]
+        if run.outcome == "ok":
+            self._latency.observe_ns(int(run.seconds * 1e9))
+        if run.tier:
+            tier_latency.observe_ns(int(run.seconds * 1e9))
+
+    def record_escalation(self, tier: str) -> None:
+        """Count a ``tier`` run whose answer failed validation and was redone on a larger tier."""
+        with self._lock:
+            self._by_tier[tier][1] += 1
+
+    def report(self) -> dict:
+        """Aggregates plus cost and latency per successful booking and per model tier."""
+        with self._lock:
+            by_agent = {
+                name: {
+                    "turns": turns,
+                    "input_tokens": tin,
+                    "output_tokens": tout,
+                    "cost_usd": round(cost, 6),
+                }
+                for name, (turns, tin, tout, cost) in sorted(self._by_agent.items())
+            }
+            by_tool = {
+                name: {
+                    "calls": calls,
+                    "turns": turns,
+                    "input_tokens": tin,
+                    "output_tokens": tout,
+                    "cost_usd": round(cost, 6),
+                }
+                for name, (calls, turns, tin, tout, cost) in sorted(self._by_tool.items())
+            }
+            by_outcome = {
+                name: {
+                    "runs": int(runs),
+                    "turns": int(turns),
+                    "input_tokens": int(tin),
+                    "output_tokens": int(tout),
+                    "cost_usd": round(cost, 6),
+                    "seconds": round(seconds, 3),
+                }
+                for name, (runs, turns, tin, tout, seconds, cost) in sorted(self._by_outcome.items())
+            }
+            by_tier = {}
+            for name, (runs, escalations, turns, tin, tout, cost) in sorted(self._by_tier.items()):
+                latency = self._tier_latency[name]
+                counts, total_ns = latency.merged()
+                by_tier[name] = {
+                    "runs": int(runs),
+                    "escalations": int(escalations),
+                    "turns": int(turns),
+                    "input_tokens": int(tin),
+                    "output_tokens": int(tout),
+                    "cost_usd": round(cost, 6),
+                    "cost_per_run_usd": round(cost / runs, 6) if runs else None,
+                    "latency_mean_ms": round(total_ns / runs / 1e6, 3) if runs else None,
+                    "latency_p50_ms": round(latency.percentile(50, counts) * 1000, 3),
+                    "latency_p95_ms": round(latency.percentile(95, counts) * 1000, 3),
+                }
+        total_cost = sum(row["cost_usd"] for row in by_outcome.values())
+        successes = by_outcome.get("ok", {}).get("runs", 0)
+        counts, total_ns = self._latency.merged()
+        per_booking = {
+            "successful_bookings": successes,
+            # All spend, including failed and aborted runs, is carried by the bookings that succeeded.
+            "cost_usd": round(total_cost / successes, 6) if successes else None,
+            "turns": round(by_outcome["ok"]["turns"] / successes, 2) if successes else None,
+            "latency_mean_ms": round(total_ns / successes / 1e6, 3) if successes else None,
+            "latency_p50_ms": round(self._latency.percentile(50, counts) * 1000, 3) if successes else None,
+            "latency_p95_ms": round(self._latency.percentile(95, counts) * 1000, 3) if successes else None,
+        }
+        return {
+            "pricing": {
+                "input_per_million": self.pricing.input_per_million,
+                "output_per_million": self.pricing.output_per_million,
+            },
+            "total_cost_usd": round(total_cost, 6),
+            "per_successful_booking": per_booking,
+            "by_agent": by_agent,
+            "by_tool": by_tool,
+            "by_outcome": by_outcome,
+            "by_tier": by_tier,
+        }
+
+
+def format_report(report: dict) -> str:
+    """Render ``UsageLedger.report()`` as a short text summary."""
+    per = report["per_successful_booking"]
+    lines = [f"Model usage: total ${report['total_cost_usd']:.6f}"]
+    if per["successful_bookings"]:
+        lines.append(
+            f"  Per successful booking ({per['successful_bookings']}): ${per['cost_usd']:.6f}, "
+            f"{per['turns']} turns, latency mean {per['latency_mean_ms']:.3f}ms "
+            f"p50 {per['latency_p50_ms']:.3f}ms p95 {per['latency_p95_ms']:.3f}ms"
+        )
+    for section in ("by_agent", "by_tool", "by_outcome", "by_tier"):
+        lines.append(f"  {section.replace('_', ' ').capitalize()}:")
+        for name, row in report[section].items():
+            fields = "  ".join(f"{key}={value}" for key, value in row.items())
+            lines.append(f"    {name:<28} {fields}")
+    return "\n".join(lines)
+
+
+USAGE = UsageLedger()
@@ -0,0 +1,369 @@
+"""
+OpenTelemetry-compatible tracing for the Smarter Dog booking workflow.
+
+Spans are recorded around whole agent runs, each agent's turn, the Sheet
+Logger handoff, every tool core call and the ledger lock sections inside
+them, then exported as OTLP/JSON: one ``{"resourceSpans": [...]}`` export
+request per line, the format the OpenTelemetry Collector's file exporter
+writes and its ``otlpjsonfile`` receiver reads.
+
+Configuration (environment, or ``configure()`` at runtime):
+- SMARTER_DOG_TRACE_FILE: where to append spans (tracing is off when unset)
+- SMARTER_DOG_TRACE_SAMPLE: fraction of traces to keep, 0.0-1.0 (default 1.0)
+
+Sampling is decided once per trace at the root span and inherited by every
+child. Code outside a sampled trace pays one context-variable read per span
+site, so tracing can stay configured at full traffic with a low ratio.
+
+The per-stage breakdown of an exported file is printed by:
+    python tracing.py traces.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import contextvars
+import functools
+import json
+import os
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+SERVICE_NAME = "smarter-dog"
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+@dataclass
+class Span:
+    """One timed operation; field names follow the OTLP span model."""
+
+    trace_id: str
+    span_id: str
+    parent_span_id: str
+    name: str
+    kind: int = SPAN_KIND_INTERNAL
+    attributes: dict[str, Any] = field(default_factory=dict)
+    start_unix_ns: int = 0
+    end_unix_ns: int = 0
+    status_code: int = STATUS_OK
+    status_message: str = ""
+    _started: int = 0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, exc: BaseException) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = f"{type(exc).__name__}: {exc}"
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_unix_ns),
+            "endTimeUnixNano": str(self.end_unix_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": self.status_code},
+        }
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class OtlpJsonFileExporter:
+    """Buffers finished spans and appends them to a file as OTLP/JSON lines."""
+
+    def __init__(self, path: str, batch_size: int = 512):
+        self.path = path
+        self.batch_size = batch_size
+        self._buffer: list[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._buffer.append(span)
+            if len(self._buffer) < self.batch_size:
+                return
+            batch, self._buffer = self._buffer, []
+        self._write(batch)
+
+    def flush(self) -> None:
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch: list[Span]) -> None:
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                    "scopeSpans": [{"scope": {"name": __name__}, "spans": [span.to_otlp() for span in batch]}],
+                }
+            ]
+        }
+        line = json.dumps(request, separators=(",", ":"), default=str) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(line)
+
+
+# The active span for the current task or thread. ``_UNSAMPLED`` marks code
+# running inside a trace that sampling dropped, so its children stay dropped.
+_UNSAMPLED = object()
+_CURRENT: contextvars.ContextVar[Any] = contextvars.ContextVar("smarter_dog_span", default=None)
+
+
+class _NoopScope:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+
+_NOOP = _NoopScope()
+
+
+class _SpanScope:
+    """Context manager that makes a span current for its duration."""
+
+    __slots__ = ("tracer", "span", "_token")
+
+    def __init__(self, tracer: Tracer, span: Span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self._token = _CURRENT.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type: Any, exc: Optional[BaseException], tb: Any) -> None:
+        if exc is not None:
+            self.span.record_error(exc)
+        _CURRENT.reset(self._token)
+        self.tracer.end_span(self.span)
+
+
+class _UnsampledScope:
+    __slots__ = ("_token",)
+
+    def __enter__(self) -> None:
+        self._token = _CURRENT.set(_UNSAMPLED)
+
+    def __exit__(self, *exc_info: object) -> None:
+        _CURRENT.reset(self._token)
+
+
+class Tracer:
+    """Creates spans, applies head sampling and hands finished spans to an exporter."""
+
+    def __init__(self, exporter: Optional[OtlpJsonFileExporter] = None, sample_rate: float = 1.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate if exporter is not None else 0.0
+
+    def start_span(
+        self, name: str, parent: Optional[Span] = None, kind: int = SPAN_KIND_INTERNAL, **attributes: Any
+    ) -> Span:
+        """Start a span (not made current); finish it with ``end_span``."""
+        return Span(
+            trace_id=parent.trace_id if parent else f"{random.getrandbits(128):032x}",
+            span_id=f"{random.getrandbits(64):016x}",
+            parent_span_id=parent.span_id if parent else "",
+            name=name,
+            kind=kind,
+            attributes=attributes,
+            start_unix_ns=time.time_ns(),
+            _started=time.perf_counter_ns(),
+        )
+
+    def end_span(self, span: Span) -> None:
+        # Wall-clock start plus a monotonic duration, so clock steps cannot skew spans.
+        span.end_unix_ns = span.start_unix_ns + (time.perf_counter_ns() - span._started)
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+    def root_span(self, name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any) -> Any:
+        """Scope for a new trace, or a child scope when a trace is already active.
+
+        The sampling decision is made here for new traces.
+        """
+        parent = _CURRENT.get()
+        if parent is _UNSAMPLED:
+            return _NOOP
+        if parent is None:
+            if not self.sample_rate or random.random() >= self.sample_rate:
+                return _UnsampledScope() if self.sample_rate else _NOOP
+        return _SpanScope(self, self.start_span(name, parent, kind, **attributes))
+
+    def span(self, name: str, **attributes: Any) -> Any:
+        """Scope for a child span; records nothing outside a sampled trace."""
+        parent = _CURRENT.get()
+        if parent is None or parent is _UNSAMPLED:
+            return _NOOP
+        return _SpanScope(self, self.start_span(name, parent, **attributes))
+
+    def flush(self) -> None:
+        if self.exporter is not None:
+            self.exporter.flush()
+
+
+def _tracer_from_environment() -> Tracer:
+    path = os.environ.get("SMARTER_DOG_TRACE_FILE")
+    rate = float(os.environ.get("SMARTER_DOG_TRACE_SAMPLE", "1.0"))
+    return Tracer(OtlpJsonFileExporter(path) if path else None, rate)
+
+
+TRACER = _tracer_from_environment()
+
+
+def configure(path: Optional[str], sample_rate: float = 1.0) -> Tracer:
+    """Replace the global tracer (``path=None`` turns tracing off)."""
+    global TRACER
+    TRACER.flush()
+    TRACER = Tracer(OtlpJsonFileExporter(path) if path else None, sample_rate)
+    return TRACER
+
+
+def current_span() -> Optional[Span]:
+    span = _CURRENT.get()
+    return None if span is _UNSAMPLED else span
+
+
+def set_current_span(span: Any) -> None:
+    """Make ``span`` current for the rest of the running task (used by run hooks)."""
+    _CURRENT.set(span)
+
+
+def root_span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any) -> Any:
+    """Root (or joined) span scope on the global tracer."""
+    return TRACER.root_span(name, kind, **attributes)
+
+
+def span(name: str, **attributes: Any) -> Any:
+    """Child span of the current trace on the global tracer."""
+    return TRACER.span(name, **attributes)
+
+
+def traced_tool(tool: str) -> Callable[[F], F]:
+    """Wrap a tool core in a ``tool <name>`` span.
+
+    Inside an agent run the span joins the run's trace; a direct call (HTTP
+    or batch fast path) starts its own trace, subject to sampling.
+    """
+
+    def decorator(func: F) -> F:
+        name = f"tool {tool}"
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not TRACER.sample_rate:
+                return func(*args, **kwargs)
+            with TRACER.root_span(name, **{"tool.name": tool}):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+atexit.register(lambda: TRACER.flush())
+
+
+# ============================================================================
+# Stage breakdown
+# ============================================================================
+
+
+def load_spans(path: str) -> list[dict]:
+    """Read every span from an OTLP/JSON lines file."""
+    spans = []
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            for resource in json.loads(line).get("resourceSpans", []):
+                for scope in resource.get("scopeSpans", []):
+                    spans.extend(scope.get("spans", []))
+    return spans
+
+
+def stage_breakdown(spans: list[dict]) -> list[dict]:
+    """Count, mean and p50/p95 duration per span name, plus self time.
+
+    Self time is a span's duration minus its direct children, which is where
+    the time actually went.
+    """
+    durations: dict[str, list[float]] = defaultdict(list)
+    self_times: dict[str, float] = defaultdict(float)
+    child_ms: dict[str, float] = defaultdict(float)
+    for item in spans:
+        if item.get("parentSpanId"):
+            child_ms[item["parentSpanId"]] += (int(item["endTimeUnixNano"]) - int(item["startTimeUnixNano"])) / 1e6
+    for item in spans:
+        duration = (int(item["endTimeUnixNano"]) - int(item["startTimeUnixNano"])) / 1e6
+        durations[item["name"]].append(duration)
+        self_times[item["name"]] += max(0.0, duration - child_ms.get(item["spanId"], 0.0))
+
+    rows = []
+    for name, values in sorted(durations.items(), key=lambda entry: -sum(entry[1])):
+        values.sort()
+        rows.append(
+            {
+                "name": name,
+                "count": len(values),
+                "mean_ms": round(statistics.fmean(values), 4),
+                "p50_ms": round(values[len(values) // 2], 4),
+                "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))], 4),
+                "self_ms_total": round(self_times[name], 3),
+            }
+        )
+    return rows
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Per-stage latency breakdown of an OTLP/JSON trace file")
+    parser.add_argument("path", help="File written via SMARTER_DOG_TRACE_FILE")
+    parser.add_argument("--json", action="store_true", help="Emit the breakdown as JSON")
+    args = parser.parse_args(argv)
+    spans = load_spans(args.path)
+    rows = stage_breakdown(spans)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    traces = len({item["traceId"] for item in spans})
+    print(f"{len(spans)} spans in {traces} traces")
+    print(f"{'stage':<40}{'count':>8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'self ms':>12}")
+    for row in rows:
+        print(
+            f"{row['name']:<40}{row['count']:>8}{row['mean_ms']:>10.4f}{row['p50_ms']:>10.4f}"
+            f"{row['p95_ms']:>10.4f}{row['self_ms_total']:>12.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
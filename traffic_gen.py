@@ -0,0 +1,388 @@
+"""
+Synthetic booking traffic for capacity planning.
+
+Generates a reproducible stream of booking and availability requests shaped
+like real demand:
+- date skew: most requests are for next week, with interest decaying for
+  each week further out (``lead_decay``; 1.0 spreads evenly)
+- dog-size mix (``size_weights``)
+- repeat customers, who come back with the same dog and phone number
+  (``repeat_rate``)
+- a share of awkward dates: bank holidays on operating days, which
+  ``_shift_bank_holiday`` moves to Thursday (``holiday_fraction``), and
+  closed dates, split between the Christmas shutdown and non-operating
+  weekdays (``closed_fraction``)
+
+Each ``TrafficEvent`` carries both a natural-language prompt and the
+structured tool call it stands for, so one stream can drive:
+- the load harness (``--format prompts`` or ``load_harness.py --synthetic``)
+- the batch CLI (``--format batch``; booking requests only)
+- the tool cores directly (``replay``; used by the ``synthetic_mix``
+  microbenchmark)
+
+Dates are rendered explicitly (ISO, "17 July 2024", "July 17th, 2024",
+"17/07/2024"), or as "Wednesday" / "next Wednesday" when they resolve
+against ``start``, which defaults to the stub's reference date.
+
+Usage:
+    python traffic_gen.py --count 5000 > traffic.jsonl
+    python traffic_gen.py --count 2000 --format prompts > corpus.txt
+    python traffic_gen.py --count 2000 --format batch --repeat-rate 0.6 > partner.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from typing import Iterator, Optional
+
+import smarter_dog_refactored as sd
+
+FIRST_NAMES = (
+    "Sarah", "Tom", "Priya", "Owen", "Grace", "Amir", "Hannah", "Liam", "Chloe", "Raj",
+    "Megan", "Dylan", "Fatima", "George", "Isla", "Kwame", "Lucy", "Niamh", "Oscar", "Zara",
+)
+SURNAMES = (
+    "Chen", "Hughes", "Patel", "Davies", "Kim", "Khan", "Evans", "Murphy", "Jones", "Shah",
+    "Williams", "Roberts", "Okafor", "Taylor", "Wright", "Singh", "Lewis", "Walsh", "Brown", "Reid",
+)
+DOG_NAMES = (
+    "Luna", "Bella", "Max", "Charlie", "Daisy", "Milo", "Coco", "Rosie", "Teddy", "Bailey",
+    "Bruno", "Poppy", "Archie", "Willow", "Biscuit", "Maple", "Otis", "Pepper", "Ziggy", "Nala",
+)
+
+OPEN = "open"
+BANK_HOLIDAY = "bank_holiday"
+CHRISTMAS_SHUTDOWN = "christmas_shutdown"
+CLOSED_WEEKDAY = "closed_weekday"
+
+BOOKING_TEMPLATES = (
+    "I'd like to book {dog}, a {size} dog, for {day} at {time}. "
+    "Customer name is {customer}, phone number is {phone}.",
+    "Hi, this is {customer}. Can you book in {dog} (a {size} dog) on {day} at {time}? Phone number is {phone}.",
+    "Booking for {dog}, {size} dog, {day} {time}. My name is {customer}, phone: {phone}.",
+)
+REPEAT_TEMPLATES = (
+    "Hi again, this is {customer}. Could you book in {dog}, our {size} dog, on {day} at {time}? "
+    "Phone number is {phone}.",
+)
+AVAILABILITY_TEMPLATES = (
+    "Do you have any slots for a {size} dog on {day}?",
+    "What times are free on {day} for {dog}, a {size} dog?",
+)
+
+
+def _default_start() -> date:
+    # The stub pins a reference date for relative dates; the real SDK has none.
+    return getattr(sd.Runner, "reference_date", None) or date.today()
+
+
+@dataclass(frozen=True)
+class TrafficProfile:
+    """Shape of the generated demand."""
+
+    start: date = field(default_factory=_default_start)
+    horizon_days: int = 56
+    lead_decay: float = 0.5
+    size_weights: tuple[tuple[str, float], ...] = (("small", 4), ("medium", 4), ("large", 2))
+    repeat_rate: float = 0.35
+    holiday_fraction: float = 0.03
+    closed_fraction: float = 0.05
+    availability_fraction: float = 0.3
+    seed: int = 7
+
+
+@dataclass
+class TrafficEvent:
+    """One synthetic request: the prompt a customer would send and the tool call it maps to."""
+
+    kind: str  # "booking" or "availability"
+    prompt: str
+    tool: str
+    arguments: dict
+    date_class: str
+    customer_id: int
+    repeat_customer: bool
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class _Customer:
+    customer_id: int
+    name: str
+    phone: str
+    dog: str
+    size: str
+
+
+# ============================================================================
+# Date Pools
+# ============================================================================
+
+
+def classify_date(day: date) -> str:
+    """Say how the booking rules treat ``day``: open, bank_holiday, christmas_shutdown or closed_weekday."""
+    if sd._shift_bank_holiday(day)[2]:
+        return BANK_HOLIDAY
+    if sd._is_christmas_shutdown(day):
+        return CHRISTMAS_SHUTDOWN
+    if day.weekday() not in sd.OPEN_WEEKDAYS:
+        return CLOSED_WEEKDAY
+    return OPEN
+
+
+def _date_pools(profile: TrafficProfile) -> dict[str, tuple[list[date], Optional[list[float]]]]:
+    """Candidate dates per class, with cumulative weights for the open pool.
+
+    Open dates come from the horizon. Holidays and shutdown days are rare, so
+    they are drawn from the year after ``start`` to keep those pools non-empty.
+    """
+    this_monday = profile.start - timedelta(days=profile.start.weekday())
+    pools: dict[str, list[date]] = {OPEN: [], BANK_HOLIDAY: [], CHRISTMAS_SHUTDOWN: [], CLOSED_WEEKDAY: []}
+    weights: list[float] = []
+    for offset in range(1, 367):
+        day = profile.start + timedelta(days=offset)
+        kind = classify_date(day)
+        if kind in (OPEN, CLOSED_WEEKDAY) and offset > profile.horizon_days:
+            continue
+        pools[kind].append(day)
+        if kind == OPEN:
+            week = (day - this_monday).days // 7
+            weights.append(profile.lead_decay ** abs(week - 1))
+    cumulative = []
+    total = 0.0
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    return {kind: (days, cumulative if kind == OPEN else None) for kind, days in pools.items()}
+
+
+# ============================================================================
+# Rendering
+# ============================================================================
+
+
+def _ordinal(day: int) -> str:
+    suffix = "th" if 11 <= day <= 13 else {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+    return f"{day}{suffix}"
+
+
+def render_date(day: date, start: date, rng: random.Random) -> str:
+    """Phrase ``day`` in one of the forms the booking extractor reads back exactly."""
+    forms = [
+        day.isoformat(),
+        f"{day.day} {day:%B} {day.year}",
+        f"{day:%B} {_ordinal(day.day)}, {day.year}",
+        f"{day:%d/%m/%Y}",
+    ]
+    next_monday = start + timedelta(days=7 - start.weekday())
+    if 0 < (day - start).days < 7:
+        forms.append(f"{day:%A}")
+    elif 0 <= (day - next_monday).days < 7:
+        forms.append(f"next {day:%A}")
+    return rng.choice(forms)
+
+
+def render_time(slot: str, rng: random.Random) -> str:
+    """Phrase an HH:MM slot as 24-hour or am/pm time."""
+    hour, minute = (int(part) for part in slot.split(":"))
+    if rng.random() < 0.5:
+        return slot
+    meridiem = "pm" if hour >= 12 else "am"
+    hour = hour % 12 or 12
+    return f"{hour} {meridiem}" if minute == 0 else f"{hour}:{minute:02d} {meridiem}"
+
+
+# ============================================================================
+# Generation
+# ============================================================================
+
+
+def generate(count: int, profile: Optional[TrafficProfile] = None) -> Iterator[TrafficEvent]:
+    """Yield ``count`` events; the same profile (and seed) always yields the same stream."""
+    profile = profile or TrafficProfile()
+    rng = random.Random(profile.seed)
+    pools = _date_pools(profile)
+    sizes = [size for size, _ in profile.size_weights]
+    size_weights = [weight for _, weight in profile.size_weights]
+    customers: list[_Customer] = []
+
+    def pick_date() -> tuple[date, str]:
+        roll = rng.random()
+        if roll < profile.holiday_fraction and pools[BANK_HOLIDAY][0]:
+            kind = BANK_HOLIDAY
+        elif roll < profile.holiday_fraction + profile.closed_fraction:
+            kind = CHRISTMAS_SHUTDOWN if rng.random() < 0.5 and pools[CHRISTMAS_SHUTDOWN][0] else CLOSED_WEEKDAY
+        else:
+            kind = OPEN
+        days, cumulative = pools[kind]
+        if not days:
+            days, cumulative, kind = *pools[OPEN], OPEN
+        if cumulative:
+            return rng.choices(days, cum_weights=cumulative)[0], kind
+        return rng.choice(days), kind
+
+    for _ in range(count):
+        repeat = bool(customers) and rng.random() < profile.repeat_rate
+        if repeat:
+            customer = rng.choice(customers)
+        else:
+            number = len(customers)
+            customer = _Customer(
+                customer_id=number,
+                name=f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)}",
+                phone=f"555-{number % 10000:04d}",
+                dog=rng.choice(DOG_NAMES),
+                size=rng.choices(sizes, size_weights)[0],
+            )
+            customers.append(customer)
+
+        day, date_class = pick_date()
+        slot = rng.choice(sd.SLOT_TIMES)
+        values = {
+            "customer": customer.name,
+            "phone": customer.phone,
+            "dog": customer.dog,
+            "size": customer.size,
+            "day": render_date(day, profile.start, rng),
+            "time": render_time(slot, rng),
+        }
+        if rng.random() < profile.availability_fraction:
+            yield TrafficEvent(
+                kind="availability",
+                prompt=rng.choice(AVAILABILITY_TEMPLATES).format(**values),
+                tool="get_available_slots",
+                arguments={"requested_date": day.isoformat(), "dog_size": customer.size},
+                date_class=date_class,
+                customer_id=customer.customer_id,
+                repeat_customer=repeat,
+            )
+            continue
+        templates = REPEAT_TEMPLATES + BOOKING_TEMPLATES if repeat else BOOKING_TEMPLATES
+        yield TrafficEvent(
+            kind="booking",
+            prompt=rng.choice(templates).format(**values),
+            tool="book_grooming_appointment",
+            arguments={
+                "dog_name": customer.dog,
+                "dog_size": customer.size,
+                "requested_date": day.isoformat(),
+                "requested_time": slot,
+                "customer_name": customer.name,
+                "contact_number": customer.phone,
+            },
+            date_class=date_class,
+            customer_id=customer.customer_id,
+            repeat_customer=repeat,
+        )
+
+
+def prompts(count: int, profile: Optional[TrafficProfile] = None) -> list[str]:
+    """Just the prompts, e.g. as a load harness corpus."""
+    return [event.prompt for event in generate(count, profile)]
+
+
+def replay(event: TrafficEvent) -> dict:
+    """Call the tool core behind ``event`` (raises ValueError like the core does)."""
+    if event.tool == "get_available_slots":
+        return sd.check_availability(**event.arguments)
+    return sd.commit_booking(**event.arguments)
+
+
+def summarise(events: list[TrafficEvent]) -> dict:
+    """Share of each kind, date class and dog size, and the repeat-customer rate."""
+    total = len(events) or 1
+
+    def shares(counter: Counter) -> dict[str, float]:
+        return {name: round(count / total, 4) for name, count in sorted(counter.items())}
+
+    return {
+        "events": len(events),
+        "customers": len({event.customer_id for event in events}),
+        "repeat_rate": round(sum(event.repeat_customer for event in events) / total, 4),
+        "kind": shares(Counter(event.kind for event in events)),
+        "date_class": shares(Counter(event.date_class for event in events)),
+        "dog_size": shares(Counter(event.arguments["dog_size"] for event in events)),
+    }
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+
+def _batch_record(index: int, event: TrafficEvent, style: str, rng: random.Random) -> dict:
+    if style == "prompt" or (style == "mixed" and rng.random() < 0.5):
+        return {"id": f"syn-{index}", "prompt": event.prompt}
+    return {"id": f"syn-{index}", **event.arguments}
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic booking traffic.")
+    parser.add_argument("--count", type=int, default=1000, help="Events to generate")
+    parser.add_argument(
+        "--format",
+        choices=("events", "prompts", "batch"),
+        default="events",
+        help="events: full JSONL records; prompts: one prompt per line; batch: batch CLI input",
+    )
+    parser.add_argument(
+        "--batch-style",
+        choices=("structured", "prompt", "mixed"),
+        default="mixed",
+        help="Batch records as structured fields, free text, or half of each",
+    )
+    parser.add_argument("--start", type=date.fromisoformat, help="Date the traffic is generated on (ISO)")
+    parser.add_argument("--horizon-days", type=int, default=56, help="How far ahead open dates are drawn")
+    parser.add_argument("--lead-decay", type=float, default=0.5, help="Demand ratio per week away from next week")
+    parser.add_argument("--sizes", default="small=4,medium=4,large=2", help="Dog-size weights")
+    parser.add_argument("--repeat-rate", type=float, default=0.35, help="Share of requests from returning customers")
+    parser.add_argument("--holiday-fraction", type=float, default=0.03, help="Share of dates on bank holidays")
+    parser.add_argument("--closed-fraction", type=float, default=0.05, help="Share of dates when the salon is closed")
+    parser.add_argument(
+        "--availability-fraction", type=float, default=0.3, help="Share of availability-only requests"
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    size_weights = []
+    for item in args.sizes.split(","):
+        size, _, weight = item.partition("=")
+        if size not in sd.DOG_SIZE_UNITS:
+            parser.error(f"Unknown dog size: {size}")
+        size_weights.append((size, float(weight or 1)))
+    profile = TrafficProfile(
+        start=args.start or _default_start(),
+        horizon_days=args.horizon_days,
+        lead_decay=args.lead_decay,
+        size_weights=tuple(size_weights),
+        repeat_rate=args.repeat_rate,
+        holiday_fraction=args.holiday_fraction,
+        closed_fraction=args.closed_fraction,
+        availability_fraction=args.availability_fraction,
+        seed=args.seed,
+    )
+
+    events = list(generate(args.count, profile))
+    rng = random.Random(args.seed)
+    out = sys.stdout
+    for index, event in enumerate(events):
+        if args.format == "prompts":
+            out.write(event.prompt + "\n")
+        elif args.format == "batch":
+            if event.kind == "booking":
+                out.write(json.dumps(_batch_record(index, event, args.batch_style, rng)) + "\n")
+        else:
+            out.write(json.dumps(event.to_dict()) + "\n")
+    print(json.dumps(summarise(events)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
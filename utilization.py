@@ -0,0 +1,84 @@
+"""
+Utilization rollups by day, ISO week and month, per dog size.
+
+Dashboards ask "how full were we in week 29, and with which dogs?". Scanning
+the ledger for that on every request does not scale, so each booking store
+keeps a ``Rollups`` and updates it in the same critical section as its units
+ledger: every claim adds the booking to its day, week and month, every
+release subtracts it. A query is then a dict lookup.
+
+Per period and dog size the rollups hold:
+- ``unit_slots``: capacity units times slots covered, which divided by the
+  period's capacity (``booking_core.utilization`` works that out from the
+  salon's calendar) gives utilization
+- ``bookings``: how many bookings start in the period
+
+Like the units ledger, rollups are derived data: ``BookingStore.verify()``
+recomputes them from the records and reports any drift, and the booking
+service runs that check periodically (``--verify-interval``).
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:  # booking_store imports this module
+    from booking_store import BookingRecord
+
+PERIODS = ("day", "week", "month")
+
+
+@lru_cache(maxsize=4096)
+def period_keys(day: str) -> tuple[str, str, str]:
+    """The day, ISO week (``2024-W29``) and month (``2024-07``) keys of an ISO date."""
+    year, week, _ = date.fromisoformat(day).isocalendar()
+    return day, f"{year}-W{week:02d}", day[:7]
+
+
+class Rollups:
+    """Running totals per (period, key) and dog size; guarded by the owning store's lock."""
+
+    def __init__(self) -> None:
+        self._totals: dict[tuple[str, str], dict[str, list[int]]] = {}  # -> size -> [unit_slots, bookings]
+
+    def apply(self, record: BookingRecord, sign: int) -> None:
+        """Add (``sign=1``) or remove (``sign=-1``) a booking from its day, week and month."""
+        unit_slots = sign * record.units * len(record.slots)
+        for period, key in zip(PERIODS, period_keys(record.date)):
+            sizes = self._totals.setdefault((period, key), {})
+            totals = sizes.setdefault(record.dog_size, [0, 0])
+            totals[0] += unit_slots
+            totals[1] += sign
+            if not totals[0] and not totals[1]:
+                del sizes[record.dog_size]
+                if not sizes:
+                    del self._totals[(period, key)]
+
+    def get(self, period: str, key: str) -> dict[str, dict[str, int]]:
+        """Dog size -> ``{"unit_slots": ..., "bookings": ...}`` for one period."""
+        return {
+            size: {"unit_slots": unit_slots, "bookings": bookings}
+            for size, (unit_slots, bookings) in self._totals.get((period, key), {}).items()
+        }
+
+    def clear(self) -> None:
+        self._totals.clear()
+
+    def diff(self, records: Iterable[BookingRecord]) -> list[str]:
+        """Compare with rollups recomputed from ``records``; returns the differences."""
+        expected = Rollups()
+        for record in records:
+            expected.apply(record, 1)
+        problems = []
+        for period, key in sorted(set(self._totals) | set(expected._totals)):
+            actual_sizes, expected_sizes = self._totals.get((period, key), {}), expected._totals.get((period, key), {})
+            for size in sorted(set(actual_sizes) | set(expected_sizes)):
+                actual, wanted = actual_sizes.get(size, [0, 0]), expected_sizes.get(size, [0, 0])
+                if actual != wanted:
+                    problems.append(
+                        f"{period} {key} {size}: rollup has {actual[0]} unit-slots in {actual[1]} bookings, "
+                        f"records add up to {wanted[0]} in {wanted[1]}"
+                    )
+        return problems
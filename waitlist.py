@@ -0,0 +1,259 @@
+"""
+Per-slot waitlist for fully booked grooming slots.
+
+A customer turned away by a full slot can join its waitlist. When capacity
+in that slot is freed (a cancellation, or a booking rescheduled away),
+``booking_core`` books waiting entries into it straight away: the longest
+waiting entry that now fits goes first, and promotion repeats until nothing
+else fits. An entry for a long service fits when every slot it covers has
+room, so freed capacity is also offered to entries starting a little
+earlier whose appointment runs into the freed slots.
+
+Entries are grouped by (date, start slot), with one heap per (dog size,
+slots) class ordered by request sequence, so first fit compares one head per
+class (a handful: three sizes times the service lengths) at each candidate
+start, and each promotion costs O(log n) however long the waitlist grows.
+Classes are by dog size rather than units because groomers' skills differ
+by size.
+Leaving the waitlist marks the entry removed; removed entries are dropped
+lazily when they reach the head of their heap.
+
+Every salon location has its own waitlist, next to its ledger partition in
+``booking_core``. Promotions from all of them are delivered as ``Promotion``
+events to listeners registered with ``subscribe()``, after the ledger lock
+is released, and logged on the ``smarter_dog.waitlist`` logger.
+
+Lock order: a partition's store lock before its waitlist lock. Waitlist
+locks are registered with ``lock_profiling`` as ``waitlist.<location>``.
+"""
+
+from __future__ import annotations
+
+import copy
+import heapq
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
+
+LOGGER = logging.getLogger("smarter_dog.waitlist")
+
+
+@dataclass
+class WaitlistEntry:
+    """A customer waiting for a slot."""
+
+    entry_id: int
+    dog_name: str
+    dog_size: str
+    date: str
+    time: str
+    customer_name: str
+    contact_number: str
+    units: int
+    requested_at: float
+    notes: list[str] = field(default_factory=list)
+    location: str = ""
+    service: str = "standard"
+    slots: int = 1  # consecutive slots the service takes from ``time``
+    removed: bool = False
+
+    def to_dict(self, position: Optional[int] = None) -> dict:
+        """The entry in ``BookingResponse`` shape, with status ``Waitlisted``."""
+        notes = list(self.notes)
+        if position is not None:
+            notes.append(f"Position {position} on the waitlist for {self.date} {self.time}.")
+        return {
+            "waitlist_id": self.entry_id,
+            "dog_name": self.dog_name,
+            "dog_size": self.dog_size,
+            "date": self.date,
+            "time": self.time,
+            "customer": self.customer_name,
+            "phone": self.contact_number,
+            "status": "Waitlisted",
+            "notes": notes,
+            "location": self.location,
+            "service": self.service,
+        }
+
+
+@dataclass(frozen=True)
+class Promotion:
+    """A waitlist entry that was booked into freed capacity."""
+
+    entry: WaitlistEntry
+    booking: dict
+
+
+Listener = Callable[[Promotion], None]
+_LISTENERS: list[Listener] = []
+
+
+def subscribe(listener: Listener) -> None:
+    """Call ``listener`` with every future promotion, at any location."""
+    _LISTENERS.append(listener)
+
+
+def unsubscribe(listener: Listener) -> None:
+    _LISTENERS.remove(listener)
+
+
+def emit(promotions: Iterable[Promotion]) -> None:
+    """Deliver promotions to the log and the listeners; a failing listener does not stop the rest."""
+    for promotion in promotions:
+        LOGGER.info(
+            "waitlist_id=%d promoted booking_id=%s location=%s dog=%r date=%s time=%s",
+            promotion.entry.entry_id,
+            promotion.booking.get("booking_id"),
+            promotion.booking.get("location"),
+            promotion.entry.dog_name,
+            promotion.entry.date,
+            promotion.entry.time,
+        )
+        for listener in list(_LISTENERS):
+            try:
+                listener(promotion)
+            except Exception:
+                LOGGER.exception("waitlist listener %r failed", listener)
+
+
+class Waitlist:
+    """One location's waiting entries: per (date, start slot), a heap per (dog size, slots) class."""
+
+    def __init__(self, location_id: str = "") -> None:
+        self.location_id = location_id
+        self.lock = threading.Lock()
+        self._heaps: dict[tuple[str, str], dict[tuple[str, int], list[tuple[int, WaitlistEntry]]]] = {}
+        self._entries: dict[int, WaitlistEntry] = {}
+        self._waiting: dict[tuple[str, str], int] = {}  # live entries per start slot
+        self._next_id = 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(
+        self,
+        dog_name: str,
+        dog_size: str,
+        date: str,
+        time_slot: str,
+        customer_name: str,
+        contact_number: str,
+        units: int,
+        notes: Iterable[str] = (),
+        service: str = "standard",
+        slots: int = 1,
+    ) -> tuple[WaitlistEntry, int]:
+        """Queue a request for a start slot; returns the entry and its position in that slot's waitlist."""
+        with self.lock:
+            entry = WaitlistEntry(
+                self._next_id,
+                dog_name,
+                dog_size,
+                date,
+                time_slot,
+                customer_name,
+                contact_number,
+                units,
+                time.time(),
+                list(notes),
+                self.location_id,
+                service,
+                slots,
+            )
+            self._next_id += 1
+            self._entries[entry.entry_id] = entry
+            classes = self._heaps.setdefault((date, time_slot), {})
+            heapq.heappush(classes.setdefault((dog_size, slots), []), (entry.entry_id, entry))
+            position = self._waiting[(date, time_slot)] = self._waiting.get((date, time_slot), 0) + 1
+            return entry, position
+
+    def remove(self, entry_id: int) -> WaitlistEntry:
+        """Take an entry off the waitlist.
+
+        Raises:
+            ValueError: If there is no such entry waiting
+        """
+        with self.lock:
+            entry = self._entries.pop(entry_id, None)
+            if entry is None:
+                raise ValueError(f"No waitlist entry with ID {entry_id}.")
+            entry.removed = True
+            self._uncount(entry)
+            return entry
+
+    def pop_fitting(
+        self, date: str, starts: Iterable[str], fits: Callable[[str, str, int], bool]
+    ) -> Optional[WaitlistEntry]:
+        """Remove and return the longest waiting entry that fits now.
+
+        Looks at the head of every (dog size, slots) class at each of
+        ``starts``; ``fits(start, dog_size, slots)`` says whether that booking
+        has room (and a groomer).
+        """
+        with self.lock:
+            best: Optional[list[tuple[int, WaitlistEntry]]] = None
+            for start in starts:
+                classes = self._heaps.get((date, start))
+                if classes is None:
+                    continue
+                for (dog_size, slots), heap in list(classes.items()):
+                    while heap and heap[0][1].removed:
+                        heapq.heappop(heap)
+                    if not heap:
+                        del classes[(dog_size, slots)]
+                    elif (best is None or heap[0][0] < best[0][0]) and fits(start, dog_size, slots):
+                        best = heap
+                if not classes:
+                    del self._heaps[(date, start)]
+            if best is None:
+                return None
+            _, entry = heapq.heappop(best)
+            if not best:
+                classes = self._heaps[(date, entry.time)]
+                del classes[(entry.dog_size, entry.slots)]
+                if not classes:
+                    del self._heaps[(date, entry.time)]
+            del self._entries[entry.entry_id]
+            self._uncount(entry)
+            return entry
+
+    def _uncount(self, entry: WaitlistEntry) -> None:
+        key = (entry.date, entry.time)
+        remaining = self._waiting[key] - 1
+        if remaining:
+            self._waiting[key] = remaining
+        else:
+            del self._waiting[key]
+
+    def waiting(self, date: str, time_slot: Optional[str] = None) -> list[WaitlistEntry]:
+        """Live entries for a date (optionally one start slot), in promotion order within each slot."""
+        with self.lock:
+            entries = [
+                entry
+                for (day, slot), classes in self._heaps.items()
+                if day == date and time_slot in (None, slot)
+                for heap in classes.values()
+                for _, entry in heap
+                if not entry.removed
+            ]
+        entries.sort(key=lambda entry: (entry.time, entry.entry_id))
+        return entries
+
+    def snapshot(self) -> tuple:
+        with self.lock:
+            return copy.deepcopy((self._heaps, self._entries, self._waiting, self._next_id))
+
+    def restore(self, snapshot: tuple) -> None:
+        """Return to a ``snapshot()``."""
+        heaps, entries, waiting, next_id = copy.deepcopy(snapshot)
+        with self.lock:
+            self._heaps, self._entries, self._waiting, self._next_id = heaps, entries, waiting, next_id
+
+    def reset(self) -> None:
+        with self.lock:
+            self._heaps.clear()
+            self._entries.clear()
+            self._waiting.clear()